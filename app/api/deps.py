@@ -2,15 +2,47 @@
 API Dependencies
 Provides authentication and authorization dependencies using ATAMS factory pattern
 """
-from atams.sso import create_atlas_client, create_auth_dependencies
+from fastapi import Header
+from atams.exceptions import ForbiddenException, BadRequestException
+from atams.sso import create_auth_dependencies
+from app.core.atlas_client import CachingAtlasClient
 from app.core.config import settings
 
-# Initialize Atlas SSO client using factory
-atlas_client = create_atlas_client(settings)
+# Atlas SSO client that caches validated identities (see app/core/atlas_client.py)
+atlas_client = CachingAtlasClient.from_settings(settings)
 
 # Create auth dependencies using factory
 get_current_user, require_auth, require_min_role_level, require_role_level = create_auth_dependencies(atlas_client)
 
+
+def verify_cron_api_key(x_api_key: str = Header(None)):
+    """Verify CRON_API_KEY for scheduled and operational endpoints"""
+    if not settings.CRON_API_KEY:
+        raise BadRequestException(
+            "CRON_API_KEY is not configured. Please set it in environment variables."
+        )
+
+    if not x_api_key or x_api_key != settings.CRON_API_KEY:
+        raise ForbiddenException(
+            "Invalid or missing API key. Access denied."
+        )
+    return True
+
+
+def verify_metrics_api_key(x_api_key: str = Header(None)):
+    """Verify METRICS_API_KEY for the Prometheus scrape endpoint"""
+    if not settings.METRICS_API_KEY:
+        raise BadRequestException(
+            "METRICS_API_KEY is not configured. Please set it in environment variables."
+        )
+
+    if not x_api_key or x_api_key != settings.METRICS_API_KEY:
+        raise ForbiddenException(
+            "Invalid or missing API key. Access denied."
+        )
+    return True
+
+
 # Export for use in endpoints
 __all__ = [
     "atlas_client",
@@ -18,4 +50,6 @@ __all__ = [
     "require_auth",
     "require_min_role_level",
     "require_role_level",
+    "verify_cron_api_key",
+    "verify_metrics_api_key",
 ]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from app.api.v1.endpoints import (
     master_status,
     master_priority,
@@ -8,10 +8,13 @@ from app.api.v1.endpoints import (
     task_attachment,
     label,
     users,
-    notification
+    notification,
+    diagnostics
 )
+from app.db.query_budget import apply_route_budget
 
-api_router = APIRouter()
+# Every route gets its DB_ROUTE_BUDGETS timeouts/query cap (if listed)
+api_router = APIRouter(dependencies=[Depends(apply_route_budget)])
 
 # Master Data Endpoints
 api_router.include_router(
@@ -69,3 +72,10 @@ api_router.include_router(
     prefix="/notifications",
     tags=["Notifications"]
 )
+
+# Diagnostics Endpoints
+api_router.include_router(
+    diagnostics.router,
+    prefix="/diagnostics",
+    tags=["Diagnostics"]
+)
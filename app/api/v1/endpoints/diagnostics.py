@@ -0,0 +1,56 @@
+"""
+Diagnostics Endpoints
+Operational views for maintainers (protected by CRON_API_KEY)
+"""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.api.deps import verify_cron_api_key
+from app.core.slow_query import get_slow_query_log
+from app.schemas.common import DataResponse
+
+router = APIRouter(dependencies=[Depends(verify_cron_api_key)])
+
+
+@router.get(
+    "/slow-queries",
+    status_code=status.HTTP_200_OK
+)
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200, description="Maximum shapes to return"),
+    order_by: Literal["total_ms", "max_ms", "count"] = Query("total_ms", description="Ranking of the shapes"),
+):
+    """
+    Slowest statement shapes of this worker since start (or the last reset)
+
+    **Security:** Requires valid CRON_API_KEY in X-Api-Key header
+
+    Each shape lists count, total/avg/max duration, the redacted parameters
+    of its last slow execution and, when sampled, its
+    `EXPLAIN (ANALYZE, BUFFERS)` plan.
+    """
+    slow_query_log = get_slow_query_log()
+    if slow_query_log is None:
+        return DataResponse(success=True, message="Slow query log is disabled", data=[])
+    return DataResponse(
+        success=True,
+        message="Slow queries retrieved successfully",
+        data=slow_query_log.top(limit, order_by)
+    )
+
+
+@router.delete(
+    "/slow-queries",
+    status_code=status.HTTP_200_OK
+)
+async def reset_slow_queries():
+    """
+    Clear the slow query aggregates of this worker
+
+    **Security:** Requires valid CRON_API_KEY in X-Api-Key header
+    """
+    slow_query_log = get_slow_query_log()
+    if slow_query_log is not None:
+        slow_query_log.reset()
+    return DataResponse(success=True, message="Slow query log cleared")
@@ -5,16 +5,17 @@ Complete CRUD operations with Atlas SSO authentication
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.label_service import LabelService
 from app.schemas.label_schema import Label, LabelCreate, LabelUpdate
 from app.schemas.common import DataResponse, PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
+from app.core.responses import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
 
 router = APIRouter()
-label_service = LabelService()
+label_service = container.lazy(LabelService)
 
 
 @router.get(
@@ -26,7 +27,7 @@ label_service = LabelService()
 async def get_labels(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get list of labels with pagination"""
@@ -59,7 +60,7 @@ async def get_labels(
 )
 async def get_label(
     lbl_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get single label by ID"""
@@ -2,19 +2,20 @@
 Master Priority Endpoints
 Complete CRUD operations with Atlas SSO authentication
 """
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.services.master_priority_service import MasterPriorityService
 from app.schemas.master_priority_schema import MasterPriority
 from app.schemas.common import PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
+from app.core.responses import conditional_json_response, encrypt_response_data
 
 router = APIRouter()
-master_priority_service = MasterPriorityService()
+master_priority_service = container.lazy(MasterPriorityService)
 
 
 @router.get(
@@ -24,12 +25,18 @@ master_priority_service = MasterPriorityService()
     dependencies=[Depends(require_min_role_level(10))]
 )
 async def get_master_priorities(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
-    """Get list of master priorities with pagination"""
+    """
+    Get list of master priorities with pagination
+
+    Responses carry a weak ETag (hash of the body); send it back as
+    If-None-Match to get 304 while the list is unchanged
+    """
     master_priorities = master_priority_service.get_master_priorities(
         db,
         skip=skip,
@@ -48,7 +55,7 @@ async def get_master_priorities(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return conditional_json_response(request, response)
 
 
 # @router.get(
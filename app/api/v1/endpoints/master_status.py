@@ -2,19 +2,20 @@
 Master Status Endpoints
 Complete CRUD operations with Atlas SSO authentication
 """
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.services.master_status_service import MasterStatusService
 from app.schemas.master_status_schema import MasterStatus
 from app.schemas.common import PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
+from app.core.responses import conditional_json_response, encrypt_response_data
 
 router = APIRouter()
-master_status_service = MasterStatusService()
+master_status_service = container.lazy(MasterStatusService)
 
 
 @router.get(
@@ -24,12 +25,18 @@ master_status_service = MasterStatusService()
     dependencies=[Depends(require_min_role_level(10))]
 )
 async def get_master_statuses(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
-    """Get list of master statuses with pagination"""
+    """
+    Get list of master statuses with pagination
+
+    Responses carry a weak ETag (hash of the body); send it back as
+    If-None-Match to get 304 while the list is unchanged
+    """
     master_statuses = master_status_service.get_master_statuses(
         db,
         skip=skip,
@@ -48,7 +55,7 @@ async def get_master_statuses(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return conditional_json_response(request, response)
 
 
 # @router.get(
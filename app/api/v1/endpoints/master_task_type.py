@@ -2,19 +2,20 @@
 Master Task Type Endpoints
 Complete CRUD operations with Atlas SSO authentication
 """
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.services.master_task_type_service import MasterTaskTypeService
 from app.schemas.master_task_type_schema import MasterTaskType
 from app.schemas.common import PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
+from app.core.responses import conditional_json_response, encrypt_response_data
 
 router = APIRouter()
-master_task_type_service = MasterTaskTypeService()
+master_task_type_service = container.lazy(MasterTaskTypeService)
 
 
 @router.get(
@@ -24,12 +25,18 @@ master_task_type_service = MasterTaskTypeService()
     dependencies=[Depends(require_min_role_level(10))]
 )
 async def get_master_task_types(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
-    """Get list of master task types with pagination"""
+    """
+    Get list of master task types with pagination
+
+    Responses carry a weak ETag (hash of the body); send it back as
+    If-None-Match to get 304 while the list is unchanged
+    """
     master_task_types = master_task_type_service.get_master_task_types(
         db,
         skip=skip,
@@ -48,7 +55,7 @@ async def get_master_task_types(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return conditional_json_response(request, response)
 
 
 # @router.get(
@@ -2,31 +2,18 @@
 Notification Endpoints
 Handles daily task reminder notifications
 """
-from fastapi import APIRouter, Depends, Header, status
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.services.task_notification_service import TaskNotificationService
 from app.schemas.common import DataResponse
 from app.core.config import settings
-from atams.exceptions import ForbiddenException, BadRequestException
+from app.core.container import container
+from app.api.deps import verify_cron_api_key
 
 router = APIRouter()
-notification_service = TaskNotificationService()
-
-
-def verify_cron_api_key(x_api_key: str = Header(None)):
-    """Verify CRON_API_KEY for scheduled endpoints"""
-    if not settings.CRON_API_KEY:
-        raise BadRequestException(
-            "CRON_API_KEY is not configured. Please set it in environment variables."
-        )
-
-    if not x_api_key or x_api_key != settings.CRON_API_KEY:
-        raise ForbiddenException(
-            "Invalid or missing API key. Access denied."
-        )
-    return True
+notification_service = container.lazy(TaskNotificationService)
 
 
 @router.post(
@@ -3,20 +3,27 @@ Project Endpoints
 Complete CRUD operations with Atlas SSO authentication
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.project_service import ProjectService
 from app.schemas.project_schema import Project, ProjectCreate, ProjectUpdate
 from app.schemas.common import DataResponse, PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
+from app.core.responses import (
+    ModelJSONResponse,
+    conditional_json_response,
+    encrypt_response_data,
+    not_modified_response,
+)
+from app.core.etag import etag_matches
 
 router = APIRouter()
-project_service = ProjectService()
+project_service = container.lazy(ProjectService)
 
 
 @router.get(
@@ -28,7 +35,7 @@ project_service = ProjectService()
 async def get_projects(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get list of projects with pagination"""
@@ -50,7 +57,7 @@ async def get_projects(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
 
 
 @router.get(
@@ -61,10 +68,20 @@ async def get_projects(
 )
 async def get_project(
     prj_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
-    """Get single project by ID"""
+    """
+    Get single project by ID
+
+    Responses carry a weak ETag; send it back as If-None-Match to get 304
+    while the project is unchanged
+    """
+    etag = project_service.get_project_etag(db, prj_id, current_user_role_level=current_user["role_level"])
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+
     project = project_service.get_project(
         db,
         prj_id,
@@ -78,7 +95,7 @@ async def get_project(
         data=project
     )
 
-    return encrypt_response_data(response, settings)
+    return conditional_json_response(request, response, etag=etag)
 
 
 @router.post(
@@ -198,7 +215,7 @@ class ProjectStatistics(BaseModel):
 )
 async def get_project_statistics(
     prj_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get project statistics"""
@@ -3,36 +3,50 @@ Task Endpoints
 Complete CRUD operations with Atlas SSO authentication
 """
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query, status, File, UploadFile
+from fastapi import APIRouter, Depends, Query, Request, status, File, UploadFile
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from datetime import date
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.task_service import TaskService
 from app.services.task_comment_service import TaskCommentService
 from app.services.task_attachment_service import TaskAttachmentService
+from app.services.attachment_download_service import AttachmentDownloadService
 from app.services.task_history_service import TaskHistoryService
 from app.services.task_label_service import TaskLabelService
 from app.services.task_watcher_service import TaskWatcherService
-from app.schemas.task_schema import Task, TaskCreate, TaskUpdate
+from app.schemas.task_schema import Task, TaskCreate, TaskUpdate, TaskTreeNode
 from app.schemas.task_comment_schema import TaskComment, TaskCommentCreate
-from app.schemas.task_attachment_schema import TaskAttachment
+from app.schemas.task_attachment_schema import (
+    TaskAttachment,
+    TaskAttachmentUploadRequest,
+    TaskAttachmentUploadSignature,
+    TaskAttachmentUploadConfirm,
+)
 from app.schemas.task_history_schema import TaskHistory
 from app.schemas.task_label_schema import TaskLabel, TaskLabelCreate
 from app.schemas.task_watcher_schema import TaskWatcher, TaskWatcherCreate
 from app.schemas.common import DataResponse, PaginationResponse
-from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
+from app.api.deps import require_auth, require_min_role_level, verify_cron_api_key
 from app.core.config import settings
+from app.core.container import container
+from app.core.responses import (
+    ModelJSONResponse,
+    conditional_json_response,
+    encrypt_response_data,
+    not_modified_response,
+)
+from app.core.etag import etag_matches
 
 router = APIRouter()
-task_service = TaskService()
-task_comment_service = TaskCommentService()
-task_attachment_service = TaskAttachmentService()
-task_history_service = TaskHistoryService()
-task_label_service = TaskLabelService()
-task_watcher_service = TaskWatcherService()
+task_service = container.lazy(TaskService)
+task_comment_service = container.lazy(TaskCommentService)
+task_attachment_service = container.lazy(TaskAttachmentService)
+attachment_download_service = container.lazy(AttachmentDownloadService)
+task_history_service = container.lazy(TaskHistoryService)
+task_label_service = container.lazy(TaskLabelService)
+task_watcher_service = container.lazy(TaskWatcherService)
 
 
 # Request schemas for nested endpoints
@@ -77,7 +91,7 @@ class AdvancedSearchRequest(BaseModel):
 async def get_tasks(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get list of tasks with pagination"""
@@ -99,7 +113,7 @@ async def get_tasks(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
 
 
 @router.get(
@@ -110,10 +124,20 @@ async def get_tasks(
 )
 async def get_task(
     tsk_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
-    """Get single task by ID"""
+    """
+    Get single task by ID
+
+    Responses carry a weak ETag; send it back as If-None-Match to get 304
+    while the task is unchanged
+    """
+    etag = task_service.get_task_etag(db, tsk_id, current_user_role_level=current_user["role_level"])
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+
     task = task_service.get_task(
         db,
         tsk_id,
@@ -127,7 +151,36 @@ async def get_task(
         data=task
     )
 
-    return encrypt_response_data(response, settings)
+    return conditional_json_response(request, response, etag=etag)
+
+
+@router.get(
+    "/{tsk_id}/tree",
+    response_model=DataResponse[TaskTreeNode],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_min_role_level(10))]
+)
+async def get_task_tree(
+    tsk_id: int,
+    max_depth: Optional[int] = Query(None, ge=0, description="Subtask levels to include (default and cap: TASK_TREE_MAX_DEPTH)"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_auth)
+):
+    """Get a task with all its subtasks as a nested tree, with rollups per node"""
+    tree = task_service.get_task_tree(
+        db,
+        tsk_id,
+        current_user_role_level=current_user["role_level"],
+        max_depth=max_depth
+    )
+
+    response = DataResponse(
+        success=True,
+        message="Task tree retrieved successfully",
+        data=tree
+    )
+
+    return ModelJSONResponse(response)
 
 
 @router.post(
@@ -252,7 +305,7 @@ async def get_task_comments(
     tsk_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get all comments for task"""
@@ -269,8 +322,7 @@ async def get_task_comments(
     # Populate joined data for each comment
     comments = []
     for db_comment in db_comments:
-        comment_dict = task_comment_service._populate_comment_joins(db, db_comment)
-        comments.append(TaskComment.model_validate(comment_dict))
+        comments.append(task_comment_service._populate_comment_joins(db, db_comment))
 
     response = PaginationResponse(
         success=True,
@@ -282,7 +334,7 @@ async def get_task_comments(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
 
 
 # ==================== TASK ATTACHMENTS ENDPOINTS ====================
@@ -338,6 +390,125 @@ async def upload_task_attachments(
     )
 
 
+@router.post(
+    "/{tsk_id}/attachments/upload-signature",
+    response_model=DataResponse[TaskAttachmentUploadSignature],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_min_role_level(10))]
+)
+async def create_attachment_upload_signature(
+    tsk_id: int,
+    upload: TaskAttachmentUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_auth)
+):
+    """
+    Get a signed direct upload to Cloudinary (step 1 of 2)
+
+    **Required role level:** 10 (User)
+
+    The file is uploaded by the client straight to `upload_url`
+    (multipart/form-data with `file`, `api_key`, `timestamp`, `signature`
+    and every entry of `params`). The signature is valid for one file with
+    the server-chosen `public_id` in the task's folder and must be used
+    within UPLOAD_SIGNATURE_MAX_AGE seconds (see `expires_at`). Finish with
+    `POST /api/v1/tasks/{tsk_id}/attachments/confirm`; unconfirmed uploads
+    are deleted after UPLOAD_UNCONFIRMED_TTL seconds.
+
+    **Example:**
+    ```json
+    {
+        "file_name": "spec.pdf",
+        "content_type": "application/pdf",
+        "file_size": 1048576
+    }
+    ```
+    """
+    signature = task_attachment_service.create_upload_signature(
+        db,
+        task_id=tsk_id,
+        upload=upload,
+        current_user_role_level=current_user["role_level"]
+    )
+
+    return DataResponse(
+        success=True,
+        message="Upload signature created successfully",
+        data=signature
+    )
+
+
+@router.post(
+    "/{tsk_id}/attachments/confirm",
+    response_model=DataResponse[TaskAttachment],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_min_role_level(10))]
+)
+async def confirm_attachment_upload(
+    tsk_id: int,
+    confirm: TaskAttachmentUploadConfirm,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_auth)
+):
+    """
+    Register a file uploaded directly to Cloudinary as task attachment (step 2 of 2)
+
+    **Required role level:** 10 (User)
+
+    Only the `public_id` issued with the upload signature is accepted. Size
+    and type are verified from Cloudinary's metadata with the same limits as
+    the multipart upload; rejected files are deleted from Cloudinary.
+    Confirming the same upload twice returns 409.
+
+    **Example:**
+    ```json
+    {
+        "public_id": "atask/task-123/1735732800-3f9a1c2b7d4e5f60-9b2e4c7a1d3f5e8b0a6c4d2e1f3b5a7c.pdf",
+        "resource_type": "raw",
+        "file_name": "spec.pdf"
+    }
+    ```
+    """
+    attachment = task_attachment_service.confirm_upload(
+        db,
+        task_id=tsk_id,
+        confirm=confirm,
+        current_user_role_level=current_user["role_level"],
+        current_user_id=current_user["user_id"]
+    )
+
+    return DataResponse(
+        success=True,
+        message="Attachment uploaded successfully",
+        data=attachment
+    )
+
+
+@router.post(
+    "/attachments/cleanup-unconfirmed",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(verify_cron_api_key)]
+)
+async def cleanup_unconfirmed_uploads(
+    db: Session = Depends(get_db)
+):
+    """
+    Delete direct uploads that were never confirmed
+
+    **Security:** Requires valid CRON_API_KEY in X-Api-Key header
+
+    **Schedule:** Trigger hourly; uploads still pending UPLOAD_UNCONFIRMED_TTL
+    seconds after they were made are deleted from Cloudinary
+    """
+    summary = task_attachment_service.cleanup_unconfirmed_uploads(db)
+
+    return DataResponse(
+        success=True,
+        message=f"Unconfirmed uploads cleaned up: {summary['deleted']} deleted",
+        data=summary
+    )
+
+
 class TaskAttachmentsResponse(BaseModel):
     attachments: List[TaskAttachment]
     total_size: int
@@ -351,7 +522,7 @@ class TaskAttachmentsResponse(BaseModel):
 )
 async def get_task_attachments(
     tsk_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get all attachments for specific task"""
@@ -378,6 +549,70 @@ async def get_task_attachments(
     return encrypt_response_data(response, settings)
 
 
+@router.get(
+    "/{tsk_id}/attachments/archive",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_min_role_level(10))],
+    responses={200: {"content": {"application/zip": {}}, "description": "ZIP archive"}}
+)
+async def download_task_attachments_archive(
+    tsk_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_auth)
+):
+    """
+    Download all attachments of a task as one ZIP file
+
+    **Required role level:** 10 (User)
+
+    The archive is streamed while the files are fetched from Cloudinary.
+    PDFs and images are stored without recompression; duplicate file names
+    get a " (2)" suffix. Files that could not be fetched are listed in
+    `ERRORS.txt` inside the archive.
+    """
+    return attachment_download_service.archive(
+        db,
+        tsk_id=tsk_id,
+        current_user_role_level=current_user["role_level"]
+    )
+
+
+@router.get(
+    "/{tsk_id}/attachments/{ta_id}/download",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_min_role_level(10))],
+    responses={
+        200: {"description": "File content"},
+        206: {"description": "Partial content (Range request)"},
+        304: {"description": "Not modified (If-None-Match matched)"},
+        416: {"description": "Requested range not satisfiable"},
+    }
+)
+async def download_task_attachment(
+    tsk_id: int,
+    ta_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(require_auth)
+):
+    """
+    Download attachment file (streamed from Cloudinary through the API)
+
+    **Required role level:** 10 (User)
+
+    - Supports `Range` for resumable downloads (206 Partial Content)
+    - Supports `If-None-Match` with the returned `ETag` (304 Not Modified)
+    - `Content-Disposition` uses the original file name
+    """
+    return await attachment_download_service.download(
+        db,
+        tsk_id=tsk_id,
+        ta_id=ta_id,
+        current_user_role_level=current_user["role_level"],
+        request_headers=request.headers
+    )
+
+
 @router.delete(
     "/{tsk_id}/attachments/{ta_id}",
     status_code=status.HTTP_200_OK,
@@ -422,7 +657,7 @@ async def get_task_history(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
     field_name: Optional[str] = Query(None, description="Filter by field name"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get task history"""
@@ -443,8 +678,7 @@ async def get_task_history(
     # Populate joined data for each history
     histories = []
     for db_history in db_histories:
-        history_dict = task_history_service._populate_history_joins(db, db_history)
-        histories.append(TaskHistory.model_validate(history_dict))
+        histories.append(task_history_service._populate_history_joins(db, db_history))
 
     response = PaginationResponse(
         success=True,
@@ -456,7 +690,7 @@ async def get_task_history(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
 
 
 # ==================== TASK LABELS ENDPOINTS ====================
@@ -505,7 +739,7 @@ class TaskLabelsResponse(BaseModel):
 )
 async def get_task_labels(
     tsk_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get all labels for task"""
@@ -518,8 +752,7 @@ async def get_task_labels(
     # Populate joined data for each label
     labels = []
     for db_label in db_labels:
-        label_dict = task_label_service._populate_label_joins(db, db_label)
-        labels.append(TaskLabel.model_validate(label_dict))
+        labels.append(task_label_service._populate_label_joins(db, db_label))
 
     response_data = {
         "labels": labels
@@ -613,7 +846,7 @@ class TaskWatchersResponse(BaseModel):
 )
 async def get_task_watchers(
     tsk_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get all watchers for task"""
@@ -626,8 +859,7 @@ async def get_task_watchers(
     # Populate joined data for each watcher
     watchers = []
     for db_watcher in db_watchers:
-        watcher_dict = task_watcher_service._populate_watcher_joins(db, db_watcher)
-        watchers.append(TaskWatcher.model_validate(watcher_dict))
+        watchers.append(task_watcher_service._populate_watcher_joins(db, db_watcher))
 
     response_data = {
         "watchers": watchers
@@ -713,7 +945,7 @@ async def bulk_update_task_status(
 )
 async def advanced_task_search(
     request: AdvancedSearchRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Advanced task search with multiple filters"""
@@ -739,12 +971,14 @@ async def advanced_task_search(
         filters["date_to"] = request.date_to
 
     # Execute advanced search
-    tasks = task_service.repository.advanced_search(
+    rows = task_service.repository.advanced_search(
         db,
         filters=filters,
         skip=request.skip,
         limit=request.limit
     )
+    # Validate once here; ModelJSONResponse bypasses response_model validation
+    tasks = [Task.model_validate(row) for row in rows]
 
     total = task_service.repository.count_advanced_search(db, filters=filters)
 
@@ -758,7 +992,7 @@ async def advanced_task_search(
         pages=(total + request.limit - 1) // request.limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
 
 
 # ==================== TASK THUMBNAIL ENDPOINTS ====================
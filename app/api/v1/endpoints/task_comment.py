@@ -5,16 +5,17 @@ Complete CRUD operations with Atlas SSO authentication
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.task_comment_service import TaskCommentService
 from app.schemas.task_comment_schema import TaskComment, TaskCommentCreate, TaskCommentUpdate
 from app.schemas.common import DataResponse, PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
+from app.core.responses import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
 
 router = APIRouter()
-task_comment_service = TaskCommentService()
+task_comment_service = container.lazy(TaskCommentService)
 
 
 @router.get(
@@ -25,7 +26,7 @@ task_comment_service = TaskCommentService()
 async def get_task_comments(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get list of task comments with pagination"""
@@ -57,7 +58,7 @@ async def get_task_comments(
 )
 async def get_task_comment(
     tc_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get single task comment by ID"""
@@ -5,16 +5,17 @@ Complete CRUD operations with Atlas SSO authentication
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.task_history_service import TaskHistoryService
 from app.schemas.task_history_schema import TaskHistory, TaskHistoryCreate, TaskHistoryUpdate
 from app.schemas.common import DataResponse, PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
+from app.core.responses import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
 
 router = APIRouter()
-task_history_service = TaskHistoryService()
+task_history_service = container.lazy(TaskHistoryService)
 
 
 @router.get(
@@ -25,7 +26,7 @@ task_history_service = TaskHistoryService()
 async def get_task_histories(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get list of task histories with pagination"""
@@ -57,7 +58,7 @@ async def get_task_histories(
 )
 async def get_task_history(
     th_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get single task history by ID"""
@@ -6,19 +6,20 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.repositories.user_repository import UserRepository
 from app.repositories.task_watcher_repository import TaskWatcherRepository
 from app.services.task_service import TaskService
 from app.schemas.common import DataResponse, PaginationResponse
 from app.api.deps import require_auth, require_min_role_level
-from atams.encryption import encrypt_response_data
 from app.core.config import settings
+from app.core.container import container
+from app.core.responses import ModelJSONResponse, encrypt_response_data
 
 router = APIRouter()
 user_repository = UserRepository()
 task_watcher_repository = TaskWatcherRepository()
-task_service = TaskService()
+task_service = container.lazy(TaskService)
 
 
 @router.get(
@@ -30,7 +31,7 @@ async def get_users(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
     search: Optional[str] = Query(None, description="Search by username, email, or full name"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get list of users from pt_atams_indonesia.users table"""
@@ -52,7 +53,7 @@ async def get_users(
         pages=(total + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
 
 
 @router.get(
@@ -62,7 +63,7 @@ async def get_users(
 )
 async def get_user_dashboard(
     u_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get user task dashboard with statistics"""
@@ -91,7 +92,7 @@ async def get_watched_tasks(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
     status_id: Optional[int] = Query(None, description="Filter by status ID"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(require_auth)
 ):
     """Get all tasks watched by user"""
@@ -119,4 +120,4 @@ async def get_watched_tasks(
         pages=(count_result + limit - 1) // limit
     )
 
-    return encrypt_response_data(response, settings)
+    return ModelJSONResponse(response)
@@ -0,0 +1,192 @@
+"""
+Caching Atlas Client
+AtlasClient that remembers validated identities so a request does not
+need a round trip to Atlas SSO /auth/me
+
+Identities are cached per worker in a TTLCache keyed by the sha256 of the
+access token (tokens are never stored), for SSO_CACHE_TTL seconds and
+never past the token's own `exp`. Concurrent requests with the same
+uncached token share one /auth/me call. /auth/me goes through the shared
+pooled HTTP client instead of a new connection per call.
+
+When SSO_JWT_KEY is set and PyJWT is installed, tokens are also verified
+locally first: a bad signature or an expired token is rejected without
+contacting Atlas.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from atams.logging import get_logger
+from atams.sso import AtlasClient
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.core.metrics import SSO_CACHE_LOOKUPS, SSO_REQUEST_DURATION, track
+
+try:  # optional dependency, used only when SSO_JWT_KEY is configured
+    import jwt
+except ImportError:  # pragma: no cover - depends on the environment
+    jwt = None
+
+logger = get_logger(__name__)
+
+# Stop trusting a cached identity this many seconds before the token expires
+EXP_LEEWAY = 5
+
+
+def token_key(access_token: str) -> str:
+    """Cache key of a token (the token itself is never kept in memory)"""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def token_expiry(access_token: str) -> Optional[float]:
+    """
+    `exp` claim of a JWT without verifying it, None if absent/unreadable
+
+    Only ever used to shorten how long an identity Atlas already accepted
+    stays cached, never to accept a token.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        exp = claims.get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class CachingAtlasClient(AtlasClient):
+    """
+    AtlasClient with a TTL cache of /auth/me results
+
+    Example:
+        atlas_client = CachingAtlasClient.from_settings(settings)
+        get_current_user, require_auth, ... = create_auth_dependencies(atlas_client)
+    """
+
+    def __init__(
+        self,
+        *args,
+        cache_ttl: float = 60.0,
+        cache_max_entries: int = 10000,
+        jwt_key: Optional[str] = None,
+        jwt_algorithms: Optional[List[str]] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.cache_ttl = cache_ttl
+        self.cache = TTLCache(maxsize=cache_max_entries, ttl=cache_ttl) if cache_ttl > 0 else None
+        self.jwt_key = jwt_key
+        self.jwt_algorithms = jwt_algorithms or ["RS256"]
+        self._inflight: Dict[str, asyncio.Future] = {}
+        if jwt_key and jwt is None:
+            logger.warning("SSO_JWT_KEY is set but PyJWT is not installed; local token verification is off")
+
+    @classmethod
+    def from_settings(cls, app_settings=settings) -> "CachingAtlasClient":
+        return cls(
+            base_url=app_settings.ATLAS_SSO_URL,
+            app_code=app_settings.ATLAS_APP_CODE,
+            encryption_key=app_settings.ATLAS_ENCRYPTION_KEY,
+            encryption_iv=app_settings.ATLAS_ENCRYPTION_IV,
+            cache_ttl=app_settings.SSO_CACHE_TTL,
+            cache_max_entries=app_settings.SSO_CACHE_MAX_ENTRIES,
+            jwt_key=app_settings.SSO_JWT_KEY,
+            jwt_algorithms=app_settings.SSO_JWT_ALGORITHMS,
+        )
+
+    def _verify_locally(self, access_token: str) -> bool:
+        """False if local verification is configured and rejects the token"""
+        if not self.jwt_key or jwt is None:
+            return True
+        try:
+            jwt.decode(
+                access_token,
+                self.jwt_key,
+                algorithms=self.jwt_algorithms,
+                options={"verify_aud": False},
+            )
+            return True
+        except jwt.PyJWTError:
+            return False
+
+    async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
+        """
+        /auth/me user info, from the cache when this token was seen recently
+
+        Returns None for invalid tokens (those are not cached).
+        """
+        if not access_token or not self._verify_locally(access_token):
+            return None
+
+        key = token_key(access_token)
+        if self.cache is not None:
+            user_info = self.cache.get(key)
+            if user_info is not None:
+                SSO_CACHE_LOOKUPS.labels("hit").inc()
+                return user_info
+            SSO_CACHE_LOOKUPS.labels("miss").inc()
+
+        # Share one /auth/me call between concurrent requests with this token
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this request was cancelled
+                # The request that was fetching went away; fetch for ourselves
+            user_info = await self._fetch_user_info(access_token)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                user_info = await self._fetch_user_info(access_token)
+            except BaseException:
+                future.cancel()
+                raise
+            else:
+                future.set_result(user_info)
+            finally:
+                self._inflight.pop(key, None)
+
+        if user_info is not None and self.cache is not None:
+            ttl = self.cache_ttl
+            exp = token_expiry(access_token)
+            if exp is not None:
+                ttl = min(ttl, exp - time.time() - EXP_LEEWAY)
+            if ttl > 0:
+                self.cache.set(key, user_info, ttl=ttl)
+        return user_info
+
+    async def _fetch_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
+        """Atlas /auth/me over the shared client (same parsing as AtlasClient)"""
+        try:
+            with track(SSO_REQUEST_DURATION):
+                response = await get_http_client().get(
+                    f"{self.base_url}/auth/me",
+                    headers={"Authorization": f"Bearer {access_token}"},
+                    timeout=10.0,
+                )
+            if response.status_code != 200:
+                return None
+            response_data = response.json()
+            if response_data.get("encrypted"):
+                return self._decrypt_atlas_response(response_data.get("data")).get("data")
+            return response_data.get("data")
+        except httpx.HTTPError:
+            # Connection error to Atlas
+            return None
+        except Exception:
+            return None
+
+    def invalidate(self, access_token: str) -> None:
+        """Forget a token's identity (e.g. after logout)"""
+        if self.cache is not None:
+            self.cache.delete(token_key(access_token))
@@ -0,0 +1,251 @@
+"""
+Response Compression
+gzip/brotli ASGI middleware with a size threshold, a content-type allowlist
+and a cache of precompressed bodies for responses that carry an ETag
+"""
+import gzip
+import zlib
+from typing import Iterable, Optional, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+
+try:  # optional dependency, gzip is used when it is missing
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Media types worth compressing (prefix match on the Content-Type header)
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+# Body prefix of the atams encryption envelope; AES output is random, so
+# compressing its base64 text is not worth the CPU
+ENCRYPTED_BODY_PREFIX = b'{"encrypted":true'
+
+# Bodies above this size are compressed in a worker thread
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+# Streamed bodies are held up to this size before compression starts
+# chunk by chunk (anything that ends earlier is treated as a complete body)
+BUFFER_LIMIT = 1024 * 1024
+
+# Precompressed bodies are keyed by ETag; this only bounds how long an
+# unused entry lingers
+PRECOMPRESSED_CACHE_TTL = 3600
+
+
+def choose_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header (None if neither is acceptable)
+
+    Honors q-values; brotli wins ties when the brotli package is installed.
+
+    Example:
+        choose_encoding("gzip, deflate, br")  # "br" (or "gzip" without brotli)
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+
+    def quality(coding: str) -> float:
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    candidates = (["br"] if brotli_available else []) + ["gzip"]
+    best = max(candidates, key=quality)  # max keeps the first on ties
+    return best if quality(best) > 0 else None
+
+
+def _is_compressible(content_type: str, allowlist: Iterable[str]) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return any(media_type.startswith(allowed) for allowed in allowlist)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli (when installed) or gzip
+
+    Skips responses that are small, not in the content-type allowlist,
+    already encoded, or encrypted (see ENCRYPTED_BODY_PREFIX). Complete
+    bodies that carry an ETag (task/project details, master-data lists) are
+    compressed once and served from an in-process LRU afterwards; streamed
+    bodies are compressed incrementally.
+
+    Example:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_max_entries: int = 256,
+        content_types: Tuple[str, ...] = COMPRESSIBLE_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = content_types
+        self.cache = TTLCache(maxsize=cache_max_entries, ttl=PRECOMPRESSED_CACHE_TTL) if cache_max_entries > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressionResponder(self, encoding)(scope, receive, send)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """One-shot compression of a complete body"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compressor(self, encoding: str):
+        """Incremental compressor for streamed bodies: (compress(chunk), flush())"""
+        if encoding == "br":
+            stream = brotli.Compressor(quality=self.brotli_quality)
+            return stream.process, stream.finish
+        stream = zlib.compressobj(self.gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        return stream.compress, stream.flush
+
+
+class _CompressionResponder:
+    """Per-request state: holds the start message until the body decides"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.buffer = bytearray()
+        self.compress_chunk = None
+        self.flush = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if (
+                message["status"] < 200
+                or message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or not _is_compressible(headers.get("content-type", ""), self.middleware.content_types)
+            ):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.compress_chunk is not None:
+            await self._send_streamed(message)
+            return
+
+        # Buffer so that bodies split into chunks (e.g. by BaseHTTPMiddleware)
+        # still get the size check and the precompressed cache
+        self.buffer += message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not more_body:
+            await self._send_complete(bytes(self.buffer))
+            return
+
+        if len(self.buffer) < BUFFER_LIMIT:
+            return
+
+        body = bytes(self.buffer)
+        if body.startswith(ENCRYPTED_BODY_PREFIX):
+            await self._send_identity()
+            await self.send({"type": "http.response.body", "body": body, "more_body": True})
+            return
+
+        # Long stream: compress chunk by chunk, length unknown up front
+        self.compress_chunk, self.flush = self.middleware.compressor(self.encoding)
+        headers = self._encoded_headers()
+        del headers["content-length"]
+        await self.send(self.start_message)
+        await self._send_streamed({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def _send_identity(self) -> None:
+        self.passthrough = True
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        await self.send(self.start_message)
+
+    async def _send_complete(self, body: bytes) -> None:
+        if len(body) < self.middleware.minimum_size or body.startswith(ENCRYPTED_BODY_PREFIX):
+            await self._send_identity()
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        headers = self._encoded_headers()
+        compressed = self._cached(headers.get("etag"))
+        if compressed is None:
+            if len(body) >= THREAD_MINIMUM_SIZE:
+                compressed = await anyio.to_thread.run_sync(self.middleware.compress, body, self.encoding)
+            else:
+                compressed = self.middleware.compress(body, self.encoding)
+            self._store(headers.get("etag"), compressed)
+
+        headers["content-length"] = str(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _send_streamed(self, message: Message) -> None:
+        chunk = self.compress_chunk(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            chunk += self.flush()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    def _cached(self, etag: Optional[str]) -> Optional[bytes]:
+        if self.middleware.cache is None or not etag:
+            return None
+        return self.middleware.cache.get((etag, self.encoding))
+
+    def _store(self, etag: Optional[str], compressed: bytes) -> None:
+        if self.middleware.cache is not None and etag:
+            self.middleware.cache.set((etag, self.encoding), compressed)
@@ -1,5 +1,5 @@
 from atams import AtamsBaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(AtamsBaseSettings):
@@ -25,6 +25,10 @@ class Settings(AtamsBaseSettings):
     CLOUDINARY_API_KEY: Optional[str] = None
     CLOUDINARY_API_SECRET: Optional[str] = None
     CLOUDINARY_FOLDER: str = "atask"  # Default folder in Cloudinary
+    UPLOAD_SIGNATURE_MAX_AGE: int = 300  # seconds a direct upload signature may be used
+    UPLOAD_UNCONFIRMED_TTL: int = 3600  # seconds before an unconfirmed direct upload is deleted
+    # Square thumbnail derivatives (px) generated at upload via eager transformations
+    THUMBNAIL_SIZES: List[int] = [64, 128, 256]
 
     # Email Configuration
     MAIL_USERNAME: Optional[str] = None
@@ -42,5 +46,91 @@ class Settings(AtamsBaseSettings):
     # Frontend URL for tracking links
     APP_URL: Optional[str] = None
 
+    # Atlas SSO identity cache (app/core/atlas_client.py), per worker
+    # Logouts and role changes take up to SSO_CACHE_TTL seconds to apply; 0 disables the cache
+    SSO_CACHE_TTL: float = 60.0
+    SSO_CACHE_MAX_ENTRIES: int = 10000
+    # Optional local JWT verification (requires PyJWT): HMAC secret or PEM public key of Atlas
+    SSO_JWT_KEY: Optional[str] = None
+    SSO_JWT_ALGORITHMS: List[str] = ["RS256"]
+
+    # Database engine (app/db/session.py), one per process
+    # Max connections per process = DB_POOL_SIZE + DB_MAX_OVERFLOW; DB_POOL_RECYCLE/TIMEOUT/PRE_PING come from atams
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # Serverless mode: NullPool (or a small pool without overflow), PgBouncer-safe
+    # None: auto-detect from VERCEL / AWS_LAMBDA_FUNCTION_NAME
+    DB_SERVERLESS: Optional[bool] = None
+    DB_SERVERLESS_POOL_SIZE: int = 0  # 0 uses NullPool
+    # Per-request database budgets (app/db/query_budget.py), 0 disables a limit
+    # Timeouts are applied with SET LOCAL in each transaction; timed-out statements return 504/503
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_LOCK_TIMEOUT_MS: int = 5000
+    DB_MAX_QUERIES_PER_REQUEST: int = 1000
+    # Overrides per "METHOD /route/template": statement_timeout_ms, lock_timeout_ms, max_queries
+    DB_ROUTE_BUDGETS: Dict[str, Dict[str, int]] = {
+        "POST /api/v1/tasks/search": {"statement_timeout_ms": 5000},
+        "GET /api/v1/projects/{prj_id}/statistics": {"statement_timeout_ms": 10000},
+        "GET /api/v1/users/{u_id}/dashboard": {"statement_timeout_ms": 10000},
+        "GET /api/v1/tasks/{tsk_id}/tree": {"statement_timeout_ms": 10000},
+    }
+
+    # Run the hottest registered statements (app/repositories/statements.py) as
+    # server-side prepared statements; psycopg 3 driver only, off in serverless mode
+    DB_PREPARE_HOT_STATEMENTS: bool = True
+
+    # Optional read replica for read-only endpoints (same pool settings as the primary)
+    DATABASE_READ_URL: Optional[str] = None
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0  # a client that wrote reads from the primary this long, 0 disables
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # fall back to the primary above this replication lag
+    DB_REPLICA_CHECK_INTERVAL: float = 10.0  # seconds between replica health/lag checks
+
+    # Shared outbound HTTP client (app/core/http_client.py)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_TIMEOUT: float = 30.0  # seconds, per read/write/pool wait
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 5.0
+
+    # Attachment download proxy
+    DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # bytes per streamed chunk
+    DOWNLOAD_CACHE_ENABLED: Optional[bool] = None  # local disk cache of proxied downloads; default: off in serverless mode
+    DOWNLOAD_CACHE_DIR: Optional[str] = None  # default: <system temp dir>/atask-download-cache
+    DOWNLOAD_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    ARCHIVE_CONCURRENCY: int = 4  # attachments fetched in parallel for ZIP downloads
+    ARCHIVE_PREFETCH_CHUNKS: int = 4  # chunks buffered per attachment ahead of the ZIP writer
+
+    # Response compression (brotli when the package is installed, else gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes, smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256  # precompressed bodies of ETag'd responses, 0 disables
+
+    # Prometheus metrics at /metrics (per worker process)
+    METRICS_ENABLED: bool = True
+    METRICS_API_KEY: Optional[str] = None  # /metrics requires it in the X-Api-Key header (unset: access denied)
+
+    # Per-request SQL instrumentation (statement count/time, N+1 warnings, Server-Timing header)
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # warn when one request runs the same statement shape more often
+    SQL_SERVER_TIMING_ENABLED: bool = True
+
+    # Slow query log (aggregated by shape at /api/v1/diagnostics/slow-queries)
+    SLOW_QUERY_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # share of slow SELECTs re-run under EXPLAIN ANALYZE, 0 disables
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = 300.0  # seconds between plans of the same shape
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 10000  # statement_timeout for the EXPLAIN run
+    SLOW_QUERY_MAX_SHAPES: int = 200
+
+    # GET /tasks/{tsk_id}/tree: deepest subtask level returned and largest subtree served
+    TASK_TREE_MAX_DEPTH: int = 10
+    TASK_TREE_MAX_NODES: int = 10000
+
+    # User dashboard cache (per process, invalidated on task writes)
+    # TTL also bounds staleness of time-based counters (overdue) and of writes made by other workers
+    DASHBOARD_CACHE_TTL: int = 300  # seconds, 0 disables caching
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 10000
+
 
 settings = Settings()
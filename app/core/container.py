@@ -0,0 +1,93 @@
+"""
+Service Container
+Process-wide singletons created on first use instead of at import time
+
+Endpoint modules hold lazy handles (container.lazy(TaskService)), so
+importing app.main constructs no services and does not import the
+Cloudinary SDK or Jinja2; the first request that needs a service builds
+it once per worker. Services share one CloudinaryService and one
+EmailService through get_cloudinary_service()/get_email_service().
+"""
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Type, TypeVar, cast
+
+if TYPE_CHECKING:
+    from app.services.cloudinary_service import CloudinaryService
+    from app.services.email_service import EmailService
+
+T = TypeVar("T")
+
+
+class _LazyService:
+    """Stand-in that forwards attribute access to the container's instance"""
+    __slots__ = ("_container", "_cls")
+
+    def __init__(self, container: "Container", cls: type):
+        object.__setattr__(self, "_container", container)
+        object.__setattr__(self, "_cls", cls)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._container.get(self._cls), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._container.get(self._cls), name, value)
+
+    def __repr__(self) -> str:
+        return f"<lazy {self._cls.__name__}>"
+
+
+class Container:
+    """
+    Lazily created singletons keyed by class
+
+    Example:
+        task_service = container.lazy(TaskService)   # nothing built yet
+        task_service.get_tasks(db, ...)             # TaskService() on first use
+        container.override(CloudinaryService, fake)  # e.g. in tests
+    """
+
+    def __init__(self):
+        self._instances: Dict[type, Any] = {}
+        self._lock = threading.RLock()  # reentrant: a factory may ask for its own dependencies
+
+    def get(self, cls: Type[T]) -> T:
+        """The instance of cls, created on first call"""
+        instance = self._instances.get(cls)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(cls)
+                if instance is None:
+                    instance = cls()
+                    self._instances[cls] = instance
+        return instance
+
+    def lazy(self, cls: Type[T]) -> T:
+        """Handle for module-level use that builds the instance on first attribute access"""
+        return cast(T, _LazyService(self, cls))
+
+    def override(self, cls: type, instance: Any) -> None:
+        """Use an existing instance for cls"""
+        with self._lock:
+            self._instances[cls] = instance
+
+    def reset(self) -> None:
+        """Drop all instances (they are rebuilt on next use)"""
+        with self._lock:
+            self._instances.clear()
+
+
+container = Container()
+
+
+def get_cloudinary_service() -> "CloudinaryService":
+    """Shared CloudinaryService (configures the SDK on first use)"""
+    from app.services.cloudinary_service import CloudinaryService
+
+    return container.get(CloudinaryService)
+
+
+def get_email_service() -> "EmailService":
+    """Shared EmailService"""
+    from app.services.email_service import EmailService
+
+    return container.get(EmailService)
@@ -0,0 +1,342 @@
+"""
+Download Cache
+Size-bounded on-disk LRU cache for proxied attachment downloads
+
+Files are keyed by the sha256 of their storage path (Cloudinary public_id).
+Entries are written to a temp file while the download streams to the
+client and only become visible through an atomic rename once complete.
+
+The directory is shared by all workers on a host, and so is the bound:
+every publish rescans the directory under an exclusive lock file and
+evicts the least recently used files (hits touch the entry's metadata
+file) until the whole directory fits in max_bytes. Lookups take the lock
+shared and hand out a hard link ("pin") of the file, so an eviction by
+another worker cannot remove a file between the lookup and the response
+reading it; the pin is released after the response. Without fcntl
+(Windows) the lock only covers the threads of one worker.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from atams.logging import get_logger
+
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+_PART_SUFFIX = ".part"
+_META_SUFFIX = ".json"
+_PIN_SUFFIX = ".pin"
+_LOCK_FILE = ".lock"
+_STALE_PART_AGE = 60 * 60  # seconds; older temp files and pins are leftovers of killed workers
+
+
+def _pin_created_at(name: str) -> Optional[float]:
+    """Creation time encoded in a pin's name (a hard link shares the data file's mtime)"""
+    try:
+        return float(name[:-len(_PIN_SUFFIX)].rsplit(".", 1)[1].split("-", 1)[0])
+    except (IndexError, ValueError):
+        return None
+
+
+@dataclass
+class CachedFile:
+    """A complete cached download, pinned until release() is called"""
+    path: str
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    pinned: bool = False
+
+    def release(self) -> None:
+        """Drop the pin once the response no longer needs the file"""
+        if self.pinned:
+            self.pinned = False
+            DownloadCache._unlink(self.path)
+
+
+class CacheWriter:
+    """Temp file receiving a download; commit() publishes it to the cache"""
+
+    def __init__(self, cache: "DownloadCache", key: str, expected_size: Optional[int]):
+        self._cache = cache
+        self._key = key
+        self._expected_size = expected_size
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=_PART_SUFFIX)
+        self._file = os.fdopen(fd, "wb")
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Publish the file (dropped if truncated)"""
+        self._file.close()
+        if self._expected_size is not None and self.size != self._expected_size:
+            self.abort()
+            return
+        self._cache._publish(self._key, self._tmp_path, self.size, etag, last_modified)
+
+    def abort(self) -> None:
+        """Discard the partial file"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class DownloadCache:
+    """
+    On-disk LRU cache with hit/miss counters
+
+    Example:
+        cache = DownloadCache("/tmp/atask-download-cache", max_bytes=512 * 1024 * 1024)
+        cached = cache.get(public_id)
+        if cached is None:
+            writer = cache.open_writer(public_id, expected_size=content_length)
+            ...
+        else:
+            ...  # serve cached.path, then cached.release()
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, _LOCK_FILE), "a+")
+        with self._locked():
+            self._enforce_bound()
+
+    @staticmethod
+    def key_for(file_path: str) -> str:
+        return hashlib.sha256(file_path.encode("utf-8")).hexdigest()
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    @contextmanager
+    def _locked(self, shared: bool = False) -> Iterator[None]:
+        """Thread lock plus the directory lock file (flock is per open file, not per thread)"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """(last use, key, size) of every published file, removing stale leftovers"""
+        found = []
+        now = time.time()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name == _LOCK_FILE or name.endswith(_META_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if name.endswith(_PIN_SUFFIX):
+                    created_at = _pin_created_at(name)
+                    if created_at is None:
+                        created_at = stat.st_ctime  # link() updates the inode's ctime
+                    if now - created_at > _STALE_PART_AGE:
+                        self._unlink(entry.path)
+                    continue
+                if name.endswith(_PART_SUFFIX):
+                    if now - stat.st_mtime > _STALE_PART_AGE:
+                        self._unlink(entry.path)
+                    continue
+                try:
+                    last_used = os.stat(entry.path + _META_SUFFIX).st_mtime
+                except OSError:
+                    last_used = stat.st_mtime
+                found.append((last_used, name, stat.st_size))
+        return found
+
+    def _enforce_bound(self) -> None:
+        """Evict least recently used files until the directory fits (exclusive lock held)"""
+        found = self._scan()
+        total = sum(size for _, _, size in found)
+        for _, key, size in sorted(found):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.evictions += 1
+
+    def get(self, file_path: str) -> Optional[CachedFile]:
+        """
+        Look up a download, counting the hit or miss
+
+        A hit is pinned (see CachedFile.release), so it stays readable even
+        if another worker evicts it meanwhile.
+        """
+        key = self.key_for(file_path)
+        path = self._data_path(key)
+        # Pins are aged by the time in their name: as hard links they share
+        # the data file's mtime, which is the (possibly old) publish time
+        pin_path = f"{path}.{int(time.time())}-{uuid.uuid4().hex}{_PIN_SUFFIX}"
+        with self._locked(shared=True):
+            try:
+                os.link(path, pin_path)
+                pinned = True
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except OSError:
+                # No hard links on this filesystem: serve the entry itself
+                if not os.path.isfile(path):
+                    self.misses += 1
+                    return None
+                pin_path, pinned = path, False
+            try:
+                size = os.path.getsize(pin_path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            # The metadata file's mtime is the entry's last use (LRU order)
+            try:
+                os.utime(path + _META_SUFFIX)
+            except OSError:
+                pass
+            self.hits += 1
+
+        meta = self._read_meta(key)
+        return CachedFile(
+            path=pin_path,
+            size=size,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            pinned=pinned,
+        )
+
+    def open_writer(self, file_path: str, expected_size: Optional[int] = None) -> Optional[CacheWriter]:
+        """Start caching a download, or None if it can never fit"""
+        if expected_size is not None and expected_size > self.max_bytes:
+            return None
+        try:
+            return CacheWriter(self, self.key_for(file_path), expected_size)
+        except OSError as e:
+            logger.warning(f"Download cache write failed: {str(e)}")
+            return None
+
+    def invalidate(self, file_path: str) -> None:
+        """Remove a download from the cache (all workers, the files are shared)"""
+        with self._locked():
+            self._remove(self.key_for(file_path))
+
+    def stats(self) -> Dict:
+        """Lookup counters of this worker since start, size of the shared directory"""
+        with self._locked(shared=True):
+            found = self._scan()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(found),
+            "bytes": sum(size for _, _, size in found),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _publish(
+        self,
+        key: str,
+        tmp_path: str,
+        size: int,
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ) -> None:
+        if size > self.max_bytes:
+            self._unlink(tmp_path)
+            return
+
+        path = self._data_path(key)
+        try:
+            with self._locked():
+                # Metadata first, so a visible data file always has it
+                with open(path + _META_SUFFIX, "w") as meta_file:
+                    json.dump({"etag": etag, "last_modified": last_modified}, meta_file)
+                os.replace(tmp_path, path)
+                self._enforce_bound()
+        except OSError as e:
+            logger.warning(f"Download cache publish failed: {str(e)}")
+            self._unlink(tmp_path)
+
+    def _remove(self, key: str) -> None:
+        self._unlink(self._data_path(key))
+        self._unlink(self._data_path(key) + _META_SUFFIX)
+
+    def _read_meta(self, key: str) -> Dict:
+        try:
+            with open(self._data_path(key) + _META_SUFFIX) as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+_download_cache: Optional[DownloadCache] = None
+_download_cache_failed = False
+_init_lock = threading.Lock()
+
+
+def download_cache_enabled() -> bool:
+    """DOWNLOAD_CACHE_ENABLED, or off by default in serverless mode (small, per-instance /tmp)"""
+    if settings.DOWNLOAD_CACHE_ENABLED is not None:
+        return settings.DOWNLOAD_CACHE_ENABLED
+    from app.db.session import is_serverless
+    return not is_serverless()
+
+
+def get_download_cache() -> Optional[DownloadCache]:
+    """Process-wide cache (created on first use), or None when disabled/unusable"""
+    global _download_cache, _download_cache_failed
+    if not download_cache_enabled() or _download_cache_failed:
+        return None
+    if _download_cache is None:
+        with _init_lock:
+            if _download_cache is None:
+                directory = settings.DOWNLOAD_CACHE_DIR or os.path.join(
+                    tempfile.gettempdir(), "atask-download-cache"
+                )
+                try:
+                    _download_cache = DownloadCache(directory, settings.DOWNLOAD_CACHE_MAX_BYTES)
+                except OSError as e:
+                    logger.warning(f"Download cache disabled, cannot use {directory}: {str(e)}")
+                    _download_cache_failed = True
+                    return None
+    return _download_cache
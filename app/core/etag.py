@@ -0,0 +1,38 @@
+"""
+ETag Helpers
+Weak validators for conditional GET (If-None-Match -> 304)
+"""
+import hashlib
+from typing import Any, Optional
+
+from app.core.config import settings
+
+# Anything that changes the body for the same data (serialization, encryption,
+# thumbnail sizes) must change the ETag too
+_ETAG_SALT = (settings.APP_VERSION, settings.ENCRYPTION_ENABLED, tuple(settings.THUMBNAIL_SIZES))
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag from version parts (ids, timestamps, joined names, ...)
+
+    Example:
+        make_etag("task", 5, created_at, updated_at)  # 'W/"3f1c..."'
+    """
+    digest = hashlib.sha1(repr((_ETAG_SALT, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def make_content_etag(body: bytes) -> str:
+    """Weak ETag from a rendered response body (lists without a cheap version probe)"""
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -4,9 +4,10 @@ Enhanced error messages for better debugging
 """
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, OperationalError, TimeoutError as PoolTimeoutError
 import re
 
+from atams.exceptions import sqlalchemy_exception_handler
 from atams.logging import get_logger
 
 logger = get_logger(__name__)
@@ -90,3 +91,74 @@ async def custom_integrity_exception_handler(request: Request, exc: IntegrityErr
             "details": details
         }
     )
+
+
+# PostgreSQL SQLSTATEs raised by statement_timeout and lock_timeout
+QUERY_CANCELED = "57014"
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def _request_id(request: Request) -> str:
+    return getattr(request.state, "request_id", None) or "N/A"
+
+
+async def operational_exception_handler(request: Request, exc: OperationalError):
+    """
+    Statement timeout (504) and lock timeout (503) with a clean message
+
+    Other operational errors (lost connection, ...) keep the generic
+    database error response.
+    """
+    sqlstate = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    if sqlstate == QUERY_CANCELED:
+        status_code = status.HTTP_504_GATEWAY_TIMEOUT
+        user_message = "The database query took too long and was cancelled"
+    elif sqlstate == LOCK_NOT_AVAILABLE:
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        user_message = "The requested data is locked by another operation, please try again"
+    else:
+        return await sqlalchemy_exception_handler(request, exc)
+
+    logger.warning(
+        f"[{_request_id(request)}] {user_message}: {request.method} {request.url.path}",
+        extra={
+            'request_id': _request_id(request),
+            'extra_data': {
+                'path': request.url.path,
+                'method': request.method,
+                'sqlstate': sqlstate,
+                'statement': (exc.statement or "")[:500]
+            }
+        }
+    )
+
+    headers = {"Retry-After": "1"} if status_code == status.HTTP_503_SERVICE_UNAVAILABLE else None
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "success": False,
+            "message": user_message,
+            "details": {"sqlstate": sqlstate}
+        },
+        headers=headers
+    )
+
+
+async def pool_timeout_exception_handler(request: Request, exc: PoolTimeoutError):
+    """No database connection became free within DB_POOL_TIMEOUT (503)"""
+    logger.warning(
+        f"[{_request_id(request)}] Database connection pool exhausted: {request.method} {request.url.path}",
+        extra={
+            'request_id': _request_id(request),
+            'extra_data': {'path': request.url.path, 'method': request.method}
+        }
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "success": False,
+            "message": "The database is busy, please try again",
+            "details": {}
+        },
+        headers={"Retry-After": "1"}
+    )
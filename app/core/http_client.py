@@ -0,0 +1,43 @@
+"""
+Shared HTTP Client
+One pooled httpx.AsyncClient per worker process for outbound calls
+(attachment downloads from Cloudinary, ...)
+"""
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared AsyncClient, creating it on first use
+
+    Reusing one client keeps TCP/TLS connections to the same hosts alive
+    across requests instead of paying a handshake per download.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_CLIENT_TIMEOUT,
+                connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,340 @@
+"""
+Metrics
+In-process counters, gauges and histograms rendered in the Prometheus text
+exposition format (version 0.0.4) at /metrics
+
+Each labelled series keeps its own small lock, so recording never contends
+on a registry-wide lock. Values are per worker process; scrape every worker
+(or run one worker per container) to get totals.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.pool import connection_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+# Label for requests that matched no route (keeps 404 scans from adding series)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Series for these label values (created on first use)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose series are read from a callback at scrape time"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: List[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = []
+
+    def add_callback(self, callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> None:
+        """callback() yields (label values, value) pairs"""
+        self._callbacks.append(callback)
+
+    def _samples(self):
+        for callback in self._callbacks:
+            for key, value in callback():
+                yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Registry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if not metric.labelnames:
+            metric.labels()  # unlabelled series are exported as 0 from the start
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "atask_http_request_duration_seconds", "Request latency by route template", ("method", "route"),
+))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "atask_http_requests_total", "Requests by route template and status code", ("method", "route", "status"),
+))
+DB_POOL_CONNECTIONS = REGISTRY.register(CallbackGauge(
+    "atask_db_pool_connections", "Connection pool state (size, checked_in, checked_out, overflow, open)", ("engine", "state"),
+))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "atask_db_pool_wait_seconds", "Time to get a connection from the pool (queue wait and connect)", ("engine",),
+    buckets=FAST_BUCKETS + (0.25, 0.5, 1.0, 5.0, 30.0),
+))
+DB_READ_SESSIONS = REGISTRY.register(Counter(
+    "atask_db_read_sessions_total", "Read-only sessions by target (replica or primary and why)", ("target",),
+))
+CLOUDINARY_DURATION = REGISTRY.register(Histogram(
+    "atask_cloudinary_request_duration_seconds", "Cloudinary API call latency", ("operation",),
+))
+CLOUDINARY_ERRORS = REGISTRY.register(Counter(
+    "atask_cloudinary_errors_total", "Failed Cloudinary API calls", ("operation",),
+))
+SMTP_SEND_DURATION = REGISTRY.register(Histogram(
+    "atask_smtp_send_duration_seconds", "SMTP delivery latency (connect, login, send)",
+))
+SMTP_SEND_FAILURES = REGISTRY.register(Counter(
+    "atask_smtp_send_failures_total", "Failed SMTP deliveries",
+))
+SSO_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "atask_sso_request_duration_seconds", "Atlas SSO /auth/me latency",
+))
+SSO_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "atask_sso_cache_lookups_total", "Validated identity cache lookups", ("result",),
+))
+RESPONSE_ENCRYPTION_DURATION = REGISTRY.register(Histogram(
+    "atask_response_encryption_seconds", "Time spent encrypting response bodies", buckets=FAST_BUCKETS,
+))
+
+
+@contextmanager
+def track(histogram: Histogram, errors: Optional[Counter] = None, *labels: str) -> Iterator[None]:
+    """
+    Observe the duration of the block; count it in `errors` if it raises
+
+    Example:
+        with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "upload"):
+            cloudinary.uploader.upload(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        if errors is not None:
+            errors.labels(*labels).inc()
+        raise
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - start)
+
+
+def instrument_engine_pool(engine: Engine, name: str) -> None:
+    """
+    Export pool gauges and time connection checkouts of an engine
+
+    Pools without size accounting (NullPool) only report open connections
+    (when tracked with app.db.pool.track_connections) and the wait histogram.
+    """
+    pool = engine.pool
+    if getattr(pool, "_atask_metrics", False):
+        return
+    pool._atask_metrics = True
+
+    original_connect = pool.connect
+    wait = DB_POOL_WAIT.labels(name)
+
+    def connect():
+        start = time.perf_counter()
+        try:
+            return original_connect()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    pool.connect = connect
+
+    def pool_state():
+        current = engine.pool
+        for state, method in (("size", "size"), ("checked_in", "checkedin"),
+                              ("checked_out", "checkedout"), ("overflow", "overflow")):
+            reader = getattr(current, method, None)
+            if reader is not None:
+                yield (name, state), max(reader(), 0)  # QueuePool.overflow() is negative below pool size
+        stats = connection_stats(engine)
+        if stats is not None:  # counted from pool events, so NullPool reports it too
+            yield (name, "open"), stats.open
+
+    DB_POOL_CONNECTIONS.add_callback(pool_state)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Matched route path with the mount/include prefix, e.g. /api/v1/tasks/{tsk_id}
+
+    The route only knows its own path (/{tsk_id}) when it was included from
+    a router, so its segments replace the tail of the request path.
+    """
+    route_path = getattr(scope.get("route"), "path", None)
+    if route_path is None:
+        return UNMATCHED_ROUTE
+    route_segments = route_path.split("/")[1:]
+    path_segments = scope["path"].split("/")
+    prefix = path_segments[:len(path_segments) - len(route_segments)]
+    return "/".join(prefix + route_segments) or "/"
+
+
+class MetricsMiddleware:
+    """
+    Record latency and status of each request by route template
+
+    Requests are labelled with the matched route path (e.g.
+    /api/v1/tasks/{tsk_id}), never the raw URL, so series stay bounded.
+    Latency runs until the last body chunk is sent.
+
+    Example:
+        app.add_middleware(MetricsMiddleware)
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: Sequence[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route_path = route_template(scope)
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, route_path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route_path, str(status)).inc()
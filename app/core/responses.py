@@ -0,0 +1,133 @@
+"""
+Response Classes
+Fast JSON path for endpoints that already hold validated Pydantic models
+"""
+import base64
+import json
+from typing import Any, Mapping, Optional
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import Response
+
+from atams.encryption import ResponseEncryption
+from atams.encryption import encrypt_response_data as _atams_encrypt_response_data
+from app.core.config import settings
+from app.core.etag import etag_matches, make_content_etag
+from app.core.metrics import RESPONSE_ENCRYPTION_DURATION, track
+
+# Clients may reuse a 200 only after revalidating it (If-None-Match)
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+class _BytesResponseEncryption(ResponseEncryption):
+    """ResponseEncryption that accepts already-encoded JSON bytes"""
+
+    def encrypt_bytes(self, data: bytes) -> str:
+        cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
+        encrypted = cipher.encrypt(pad(data, AES.block_size))
+        return base64.b64encode(encrypted).decode("ascii")
+
+
+_encryption: Optional[_BytesResponseEncryption] = None
+
+
+def _get_encryption() -> _BytesResponseEncryption:
+    """Build the AES helper once per process (key/IV never change at runtime)"""
+    global _encryption
+    if _encryption is None:
+        _encryption = _BytesResponseEncryption(settings)
+    return _encryption
+
+
+def render_json(content: Any) -> bytes:
+    """Serialize content to compact JSON bytes in a single pass"""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encrypt_json_body(body: bytes) -> bytes:
+    """
+    Wrap JSON bytes in the encrypted envelope
+
+    Produces the same payload as atams encrypt_response_data rendered by
+    FastAPI: {"encrypted":true,"data":"<base64 AES-256-CBC>"}
+    """
+    with track(RESPONSE_ENCRYPTION_DURATION):
+        encrypted = _get_encryption().encrypt_bytes(body)
+    return b'{"encrypted":true,"data":"' + encrypted.encode("ascii") + b'"}'
+
+
+def encrypt_response_data(response_data: Any, app_settings=settings) -> Any:
+    """atams encrypt_response_data, timed in the response encryption metric"""
+    if not app_settings.ENCRYPTION_ENABLED:
+        return response_data
+    with track(RESPONSE_ENCRYPTION_DURATION):
+        return _atams_encrypt_response_data(response_data, app_settings)
+
+
+class ModelJSONResponse(Response):
+    """
+    Opt-in JSON response for hot endpoints
+
+    Serializes the (already validated) response model once with Pydantic's
+    Rust serializer straight to bytes and, when ENCRYPTION_ENABLED and
+    encrypt=True, feeds those bytes directly to the encryption step.
+    Because the endpoint returns a Response instance, FastAPI skips the
+    response_model re-validation and jsonable_encoder pass; response_model
+    on the route is still used for the OpenAPI schema.
+
+    Example:
+        response = PaginationResponse(success=True, message="...", data=tasks, ...)
+        return ModelJSONResponse(response)
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        encrypt: bool = True,
+    ) -> None:
+        self.encrypt = encrypt
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        body = render_json(content)
+        if self.encrypt and settings.ENCRYPTION_ENABLED:
+            body = encrypt_json_body(body)
+        return body
+
+
+def not_modified_response(etag: str) -> Response:
+    """304 for a client whose copy is still current"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL})
+
+
+def conditional_json_response(request: Request, content: Any, etag: Optional[str] = None) -> Response:
+    """
+    ModelJSONResponse carrying an ETag, or 304 if If-None-Match already matches
+
+    When etag is None it is derived from the rendered (possibly encrypted)
+    body; encryption uses a fixed key/IV, so equal content gives equal bodies.
+    Endpoints with a cheap version probe should check it before loading data
+    and pass the probe's etag here.
+
+    Example:
+        return conditional_json_response(request, DataResponse(...), etag=etag)
+    """
+    response = ModelJSONResponse(content)
+    if etag is None:
+        etag = make_content_etag(response.body)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CONDITIONAL_CACHE_CONTROL
+    return response
@@ -0,0 +1,258 @@
+"""
+Slow Query Log
+Logs statements slower than a threshold with their normalized shape and
+redacted parameters, aggregates them by shape and captures a sampled
+EXPLAIN (ANALYZE, BUFFERS) plan on a separate connection
+
+Only SELECT/WITH statements are explained: ANALYZE runs the statement
+again, which must never repeat a write. Plans are captured in one
+background thread (at most one pending at a time) with a statement
+timeout, so a slow request is never made slower by its own diagnostics.
+"""
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from atams.logging import get_logger
+
+from app.core.config import settings
+from app.core.sql_instrumentation import current_query_stats, statement_shape
+
+logger = get_logger(__name__)
+
+# Execution option that keeps a connection's statements out of the log
+# (set on the EXPLAIN connection so plans do not report themselves)
+SKIP_OPTION = "slow_query_log"
+
+_START_KEY = "slow_query_start_time"
+_EXPLAINABLE_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(insert|update|delete|merge)\b|\bfor\s+(update|share)\b", re.IGNORECASE)
+_SHAPE_LOG_LIMIT = 500  # chars of a shape kept in log messages
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    Parameters with every text/bytes value replaced by its type and length
+
+    Numbers, booleans, dates and None are kept: they identify the filter
+    combination without exposing search keywords, names or emails.
+    """
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > 10:
+            return f"<{len(parameters)} values>"
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    if isinstance(parameters, (date, datetime)):
+        return parameters.isoformat()
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return f"<bytes len={len(parameters)}>"
+    return f"<{type(parameters).__name__} len={len(str(parameters))}>"
+
+
+def is_explainable(statement: str) -> bool:
+    """Read-only statements that are safe to run again under EXPLAIN ANALYZE"""
+    return bool(_EXPLAINABLE_RE.match(statement)) and not _WRITE_RE.search(statement)
+
+
+@dataclass
+class SlowQueryShape:
+    """Aggregated slow executions of one statement shape"""
+    shape: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    last_parameters: Any = None
+    plan: Optional[str] = None
+    plan_captured_at: Optional[float] = None
+    _explain_pending: bool = field(default=False, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_seen": datetime.fromtimestamp(self.last_seen).isoformat() if self.last_seen else None,
+            "last_parameters": self.last_parameters,
+            "plan": self.plan,
+            "plan_captured_at": (
+                datetime.fromtimestamp(self.plan_captured_at).isoformat() if self.plan_captured_at else None
+            ),
+        }
+
+
+class SlowQueryLog:
+    """
+    Cursor listeners and per-shape aggregates for one or more engines
+
+    Example:
+        slow_query_log = SlowQueryLog(threshold_ms=500, explain_sample_rate=0.1)
+        slow_query_log.install(engine)
+        slow_query_log.top(10)
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 500.0,
+        explain_sample_rate: float = 0.1,
+        explain_interval: float = 300.0,
+        explain_timeout_ms: int = 10000,
+        max_shapes: int = 200,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_shapes = max_shapes
+        self._shapes: Dict[str, SlowQueryShape] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._explain_slot = threading.Lock()
+
+    def install(self, engine: Engine) -> None:
+        """Attach the listeners to an engine (idempotent)"""
+        if event.contains(engine, "after_cursor_execute", self._after_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get(_START_KEY) if conn is not None else None
+        if starts:
+            starts.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if duration < self.threshold or conn.get_execution_options().get(SKIP_OPTION) is False:
+            return
+        self.record(conn.engine, statement, parameters, duration, executemany)
+
+    def record(self, engine: Engine, statement: str, parameters: Any, duration: float, executemany: bool = False) -> None:
+        """Aggregate and log one slow execution, maybe scheduling an EXPLAIN"""
+        shape = statement_shape(statement)
+        redacted = redact_parameters(parameters)
+        duration_ms = duration * 1000
+        now = time.time()
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # Forget the shape that cost the least so far
+                    del self._shapes[min(self._shapes.values(), key=lambda e: e.total_ms).shape]
+                entry = self._shapes[shape] = SlowQueryShape(shape=shape)
+            entry.count += 1
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.last_seen = now
+            entry.last_parameters = redacted
+            explain = (
+                not executemany
+                and not entry._explain_pending
+                and (entry.plan_captured_at is None or now - entry.plan_captured_at >= self.explain_interval)
+                and engine.dialect.name == "postgresql"
+                and is_explainable(statement)
+                and random.random() < self.explain_sample_rate
+            )
+            if explain:
+                entry._explain_pending = True
+
+        stats = current_query_stats()
+        request_id = (stats.request_id if stats else None) or "N/A"
+        logger.warning(
+            f"[{request_id}] Slow query ({duration_ms:.0f}ms): {shape[:_SHAPE_LOG_LIMIT]}",
+            extra={
+                "request_id": request_id,
+                "extra_data": {"duration_ms": round(duration_ms, 1), "statement": shape, "parameters": redacted},
+            },
+        )
+        if explain and not self._submit_explain(engine, entry, statement, parameters):
+            with self._lock:
+                entry._explain_pending = False
+
+    def _submit_explain(self, engine: Engine, entry: SlowQueryShape, statement: str, parameters: Any) -> bool:
+        # One plan at a time; samples that arrive meanwhile are skipped
+        if not self._explain_slot.acquire(blocking=False):
+            return False
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(self._explain, engine, entry, statement, parameters)
+        return True
+
+    def _explain(self, engine: Engine, entry: SlowQueryShape, statement: str, parameters: Any) -> None:
+        plan = None
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(**{SKIP_OPTION: False})
+                with conn.begin() as transaction:
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    explain_sql = f"EXPLAIN (ANALYZE, BUFFERS) {statement}"
+                    if parameters:
+                        result = conn.exec_driver_sql(explain_sql, parameters)
+                    else:
+                        result = conn.exec_driver_sql(explain_sql)
+                    plan = "\n".join(row[0] for row in result)
+                    transaction.rollback()
+        except Exception as e:
+            logger.warning(f"EXPLAIN of slow query failed: {e}", extra={"extra_data": {"statement": entry.shape}})
+        finally:
+            with self._lock:
+                entry._explain_pending = False
+                if plan is not None:
+                    entry.plan = plan
+                    entry.plan_captured_at = time.time()
+            self._explain_slot.release()
+        if plan is not None:
+            logger.info(f"Captured plan for slow query: {entry.shape[:_SHAPE_LOG_LIMIT]}\n{plan}")
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """Worst shapes by total_ms, max_ms or count"""
+        with self._lock:
+            entries = sorted(self._shapes.values(), key=lambda e: getattr(e, order_by), reverse=True)[:limit]
+            return [entry.to_dict() for entry in entries]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+_slow_query_log: Optional[SlowQueryLog] = None
+_init_lock = threading.Lock()
+
+
+def get_slow_query_log() -> Optional[SlowQueryLog]:
+    """Process-wide slow query log (created on first use), None when disabled"""
+    global _slow_query_log
+    if not settings.SLOW_QUERY_ENABLED:
+        return None
+    if _slow_query_log is None:
+        with _init_lock:
+            if _slow_query_log is None:
+                _slow_query_log = SlowQueryLog(
+                    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+                    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+                    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+                    explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+                    max_shapes=settings.SLOW_QUERY_MAX_SHAPES,
+                )
+    return _slow_query_log
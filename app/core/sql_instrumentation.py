@@ -0,0 +1,177 @@
+"""
+SQL Instrumentation
+Per-request statement counts, DB time and N+1 detection from SQLAlchemy
+engine events
+
+instrument_engine() attaches cursor listeners to an engine.
+SQLInstrumentationMiddleware opens a RequestQueryStats for each request in
+a context variable (copied into the threadpool that runs sync endpoints),
+adds a Server-Timing header and logs a summary tagged with the request ID
+set by RequestIDMiddleware. Statements run outside a request (background
+tasks, scripts) are not recorded.
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from atams.logging import get_logger
+
+logger = get_logger(__name__)
+
+_STATEMENT_SHAPE_LIMIT = 300  # chars of a statement shape kept in log messages
+
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):[A-Za-z_]\w*")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with parameters and literals replaced by ?, IN lists collapsed"""
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _LIST_RE.sub("(?...)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class RequestQueryStats:
+    """Statements executed while handling one request"""
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than `threshold` times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("sql_request_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being handled, None outside a request"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    # Drop the start time of a failed statement so the stack stays balanced
+    conn = exception_context.connection
+    if conn is not None and _current_stats.get() is not None:
+        starts = conn.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the cursor listeners to an engine (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def server_timing_header(stats: RequestQueryStats, total: float) -> str:
+    """Server-Timing value with DB time/count and total handler time (ms)"""
+    return (
+        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={total * 1000:.1f}"
+    )
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Track SQL statements per request
+
+    Must run inside RequestIDMiddleware to see the request ID. The
+    Server-Timing header covers statements executed before the response
+    starts; the log summary covers the whole request, including streamed
+    bodies.
+
+    Example:
+        app.add_middleware(SQLInstrumentationMiddleware, n_plus_one_threshold=10)
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10, server_timing: bool = True) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state: Dict = scope.get("state") or {}
+        stats = RequestQueryStats(state.get("request_id"))
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing_header(stats, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats, time.perf_counter() - started)
+
+    def _report(self, scope: Scope, stats: RequestQueryStats, total: float) -> None:
+        extra = {
+            "request_id": stats.request_id or "N/A",
+            "extra_data": {
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "query_count": stats.count,
+                "db_time_ms": round(stats.duration * 1000, 1),
+                "total_time_ms": round(total * 1000, 1),
+            },
+        }
+        logger.debug(
+            f"[{extra['request_id']}] SQL: {stats.count} queries in {stats.duration * 1000:.1f}ms for {scope.get('method')} {scope.get('path')}",
+            extra=extra,
+        )
+        for shape, n in stats.repeated(self.n_plus_one_threshold):
+            logger.warning(
+                f"[{extra['request_id']}] Possible N+1: statement executed {n} times in {scope.get('method')} {scope.get('path')}: "
+                f"{shape[:_STATEMENT_SHAPE_LIMIT]}",
+                extra={**extra, "extra_data": {**extra["extra_data"], "repeat_count": n, "statement": shape}},
+            )
@@ -0,0 +1,87 @@
+"""
+Connection Pool Accounting
+Counts the DBAPI connections an engine holds open in this process
+
+QueuePool can report its own state, NullPool cannot, so open and
+checked-out connections are counted from pool events for every pool class.
+The listeners survive engine.dispose(), which recreates the pool.
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class ConnectionStats:
+    """Open and checked-out connection counters of one engine"""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.opened_total = 0
+        self._lock = threading.Lock()
+
+    def _connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.open += 1
+            self.opened_total += 1
+
+    def _close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.open -= 1
+
+    def _close_detached(self, dbapi_connection):
+        with self._lock:
+            self.open -= 1
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checked_out += 1
+
+    def _checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out -= 1
+
+
+def track_connections(engine: Engine) -> ConnectionStats:
+    """Attach the counters to an engine (idempotent)"""
+    stats = connection_stats(engine)
+    if stats is not None:
+        return stats
+    stats = ConnectionStats()
+    event.listen(engine, "connect", stats._connect)
+    event.listen(engine, "close", stats._close)
+    event.listen(engine, "close_detached", stats._close_detached)
+    event.listen(engine, "checkout", stats._checkout)
+    event.listen(engine, "checkin", stats._checkin)
+    engine._atask_connection_stats = stats
+    return stats
+
+
+def connection_stats(engine: Engine) -> Optional[ConnectionStats]:
+    """Counters attached by track_connections, None if not tracked"""
+    return getattr(engine, "_atask_connection_stats", None)
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Pool class, limits and connection counts of an engine in this process"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pid": os.getpid(), "pool": type(pool).__name__}
+    stats = connection_stats(engine)
+    if stats is not None:
+        status.update(
+            open_connections=stats.open,
+            checked_out=stats.checked_out,
+            opened_total=stats.opened_total,
+        )
+    if hasattr(pool, "size") and hasattr(pool, "_max_overflow"):
+        unbounded = pool._max_overflow < 0  # max_overflow=-1
+        status.update(
+            pool_size=pool.size(),
+            max_overflow=pool._max_overflow,
+            max_connections=None if unbounded else pool.size() + pool._max_overflow,
+            checked_in=pool.checkedin(),
+        )
+    return status
@@ -0,0 +1,134 @@
+"""
+Query Budgets
+Per-request statement_timeout / lock_timeout and a cap on statement count
+
+QueryBudgetMiddleware gives every request the default budget; the
+apply_route_budget dependency narrows it for routes listed in
+DB_ROUTE_BUDGETS (e.g. "POST /api/v1/tasks/search"). The timeouts are
+applied with SET LOCAL when a session starts a transaction, so they end
+with the transaction and never leak to the next user of a pooled
+connection (also safe behind PgBouncer in transaction mode). Timed-out
+statements become 504/503 responses in app/core/exception_handlers.py.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from atams.exceptions import ServiceUnavailableException
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+
+class QueryBudget:
+    """Limits of the current request (0 disables a limit)"""
+    __slots__ = ("statement_timeout_ms", "lock_timeout_ms", "max_queries", "count")
+
+    def __init__(self, statement_timeout_ms: int = 0, lock_timeout_ms: int = 0, max_queries: int = 0):
+        self.statement_timeout_ms = statement_timeout_ms
+        self.lock_timeout_ms = lock_timeout_ms
+        self.max_queries = max_queries
+        self.count = 0
+
+
+class QueryBudgetExceeded(ServiceUnavailableException):
+    """The request ran more statements than its budget allows"""
+
+    def __init__(self, max_queries: int):
+        super().__init__(
+            "Request exceeded its database query budget",
+            details={"max_queries": max_queries},
+        )
+
+
+_current_budget: ContextVar[Optional[QueryBudget]] = ContextVar("db_query_budget", default=None)
+
+
+def current_query_budget() -> Optional[QueryBudget]:
+    """Budget of the request being handled, None outside a request"""
+    return _current_budget.get()
+
+
+def _set_local_timeouts(session, transaction, connection):
+    budget = _current_budget.get()
+    if budget is None or connection.dialect.name != "postgresql":
+        return
+    if budget.statement_timeout_ms > 0:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(budget.statement_timeout_ms)}")
+    if budget.lock_timeout_ms > 0:
+        connection.exec_driver_sql(f"SET LOCAL lock_timeout = {int(budget.lock_timeout_ms)}")
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    budget = _current_budget.get()
+    if budget is None or budget.max_queries <= 0:
+        return
+    budget.count += 1
+    if budget.count > budget.max_queries:
+        raise QueryBudgetExceeded(budget.max_queries)
+
+
+def install(engine: Engine, session_factory: sessionmaker) -> None:
+    """
+    Enforce budgets on an engine and the sessions of a sessionmaker (idempotent)
+
+    Attach after the other cursor listeners, so a statement rejected here
+    is not half-recorded by them.
+    """
+    if not event.contains(session_factory, "after_begin", _set_local_timeouts):
+        event.listen(session_factory, "after_begin", _set_local_timeouts)
+    if not event.contains(engine, "before_cursor_execute", _count_statement):
+        event.listen(engine, "before_cursor_execute", _count_statement)
+
+
+_BUDGET_FIELDS = frozenset({"statement_timeout_ms", "lock_timeout_ms", "max_queries"})
+
+
+def _route_budget(method: str, route: str) -> dict:
+    overrides = settings.DB_ROUTE_BUDGETS.get(f"{method} {route}", {})
+    return {field: value for field, value in overrides.items() if field in _BUDGET_FIELDS}
+
+
+async def apply_route_budget(request: Request) -> None:
+    """
+    Router dependency: narrow the request budget to its DB_ROUTE_BUDGETS entry
+
+    Async so it runs in the request's own context (the budget object is
+    shared with the threadpool that runs sync dependencies).
+    """
+    budget = _current_budget.get()
+    if budget is None:
+        return
+    for field, value in _route_budget(request.method, route_template(request.scope)).items():
+        setattr(budget, field, value)
+
+
+class QueryBudgetMiddleware:
+    """
+    Open the default query budget for each request
+
+    Example:
+        app.add_middleware(QueryBudgetMiddleware, statement_timeout_ms=30000, lock_timeout_ms=5000, max_queries=1000)
+    """
+
+    def __init__(self, app: ASGIApp, statement_timeout_ms: int = 0, lock_timeout_ms: int = 0, max_queries: int = 0) -> None:
+        self.app = app
+        self.statement_timeout_ms = statement_timeout_ms
+        self.lock_timeout_ms = lock_timeout_ms
+        self.max_queries = max_queries
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_budget.set(QueryBudget(self.statement_timeout_ms, self.lock_timeout_ms, self.max_queries))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_budget.reset(token)
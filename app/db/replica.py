@@ -0,0 +1,204 @@
+"""
+Read Replica Routing
+Decides per request whether a read-only session may use the replica
+
+The replica is used only while it answers and lags the primary by at most
+DB_REPLICA_MAX_LAG_SECONDS (checked at most every DB_REPLICA_CHECK_INTERVAL
+seconds). A client that committed a write in the last
+DB_READ_YOUR_WRITES_SECONDS reads from the primary, so it sees its own
+changes: the marker is kept per worker by access token and sent to the
+client as a cookie, which carries it to other workers/instances.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from atams.logging import get_logger
+
+from app.core.atlas_client import token_key
+from app.core.cache import TTLCache
+
+logger = get_logger(__name__)
+
+READ_PRIMARY_COOKIE = "atask_read_primary_until"
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+# (pg_last_xact_replay_timestamp alone grows while the primary is idle)
+LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReplicaMonitor:
+    """
+    Cached health/lag state of a replica engine
+
+    Example:
+        monitor = ReplicaMonitor(read_engine, max_lag=5, check_interval=10)
+        if monitor.is_usable():
+            ...
+    """
+
+    def __init__(self, engine: Engine, max_lag: float = 5.0, check_interval: float = 10.0):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.healthy: Optional[bool] = None  # None until the first check
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def is_usable(self) -> bool:
+        """Whether reads may go to the replica (rechecked when stale)"""
+        if time.monotonic() - self.checked_at >= self.check_interval:
+            # The first check is waited for; later ones are run by one caller
+            # while the others keep using the previous result
+            if self._lock.acquire(blocking=self.healthy is None):
+                try:
+                    if time.monotonic() - self.checked_at >= self.check_interval:
+                        self.check()
+                finally:
+                    self._lock.release()
+        return bool(self.healthy)
+
+    def check(self) -> None:
+        """Measure replica lag now"""
+        try:
+            with self.engine.connect() as conn:
+                lag = conn.execute(LAG_SQL).scalar()
+            self.lag = float(lag) if lag is not None else None
+            self.error = None
+            healthy = self.lag is not None and self.lag <= self.max_lag
+            reason = f"lag {self.lag:.1f}s" if self.lag is not None else "lag unknown"
+        except Exception as e:
+            self.lag = None
+            self.error = str(e).splitlines()[0] if str(e) else type(e).__name__
+            healthy = False
+            reason = self.error
+        if healthy != self.healthy and self.healthy is not None:
+            if healthy:
+                logger.info(f"Read replica usable again ({reason})")
+            else:
+                logger.warning(f"Read replica not used, reading from the primary ({reason})")
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "max_lag_seconds": self.max_lag,
+            "error": self.error,
+        }
+
+
+def is_replica_session(db) -> bool:
+    """Whether a session reads from the replica (data may lag the primary)"""
+    return bool(db.info.get("replica"))
+
+
+class _RequestWrites:
+    """Set by the primary session when the current request commits"""
+    __slots__ = ("committed",)
+
+    def __init__(self):
+        self.committed = False
+
+
+_request_writes: ContextVar[Optional[_RequestWrites]] = ContextVar("db_request_writes", default=None)
+
+
+def mark_committed(session) -> None:
+    """after_commit listener of the primary sessionmaker"""
+    writes = _request_writes.get()
+    if writes is not None:
+        writes.committed = True
+
+
+class ReadYourWrites:
+    """
+    Read-your-writes window of clients that committed a write
+
+    Example:
+        read_your_writes = ReadYourWrites(window=5)
+        app.add_middleware(ReadYourWritesMiddleware, read_your_writes=read_your_writes)
+        read_your_writes.active(request)  # True shortly after this client wrote
+    """
+
+    def __init__(self, window: float = 5.0, max_entries: int = 10000):
+        self.window = window
+        self._recent = TTLCache(maxsize=max_entries, ttl=window)
+
+    @staticmethod
+    def _client_key(headers) -> Optional[str]:
+        authorization = headers.get("authorization")
+        return token_key(authorization) if authorization else None
+
+    def record(self, headers) -> float:
+        """Remember a write by this client, returns the end of its window (epoch seconds)"""
+        key = self._client_key(headers)
+        if key is not None:
+            self._recent.set(key, True)
+        return time.time() + self.window
+
+    def active(self, request: Request) -> bool:
+        if self.window <= 0:
+            return False
+        key = self._client_key(request.headers)
+        if key is not None and self._recent.get(key):
+            return True
+        try:
+            return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Open a read-your-writes window after a request that committed a write
+
+    Only non-GET requests whose primary session committed and that
+    succeeded (status < 400) count, so read-only POSTs such as
+    /tasks/search do not pin the client to the primary.
+    """
+
+    def __init__(self, app: ASGIApp, read_your_writes: ReadYourWrites) -> None:
+        self.app = app
+        self.read_your_writes = read_your_writes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS or self.read_your_writes.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        writes = _RequestWrites()
+        token = _request_writes.set(writes)
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and writes.committed and message["status"] < 400:
+                request_headers = Request(scope).headers
+                until = self.read_your_writes.record(request_headers)
+                window = int(self.read_your_writes.window + 0.999)
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}={until:.0f}; Max-Age={window}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            _request_writes.reset(token)
@@ -1,25 +1,128 @@
 """
 Database Session Management
+
+One engine per process, shared with atams (atams.db.session.engine /
+SessionLocal point at it), sized from DB_POOL_* settings.
+
+In serverless mode (DB_SERVERLESS, on by default when running on Vercel or
+AWS Lambda) frozen instances must not pin idle connections: the engine uses
+NullPool, or a small fixed pool when DB_SERVERLESS_POOL_SIZE > 0, and
+avoids server-side prepared statements so it can sit behind PgBouncer in
+transaction mode.
+
+With DATABASE_READ_URL set, read-only endpoints take get_read_db, which
+opens the session on the replica unless app/db/replica.py says otherwise.
 """
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import NullPool
+from typing import Any, Dict, Generator, Optional
+from starlette.requests import Request
+
+from atams.db import session as atams_session
+from atams.db.session import normalize_database_url
 
 from app.core.config import settings
+from app.core.metrics import DB_READ_SESSIONS, instrument_engine_pool
+from app.core.slow_query import get_slow_query_log
+from app.core.sql_instrumentation import instrument_engine
+from app.db import query_budget
+from app.db.pool import track_connections
+from app.db.replica import ReadYourWrites, ReplicaMonitor, mark_committed
+from app.repositories.statements import enable_prepared_statements
+
+# Environment variables set by serverless platforms
+SERVERLESS_ENV_VARS = ("VERCEL", "AWS_LAMBDA_FUNCTION_NAME")
+
+
+def is_serverless(app_settings=settings) -> bool:
+    """DB_SERVERLESS, or auto-detected from the platform when unset"""
+    if app_settings.DB_SERVERLESS is not None:
+        return app_settings.DB_SERVERLESS
+    return any(os.environ.get(name) for name in SERVERLESS_ENV_VARS)
+
+
+def create_app_engine(app_settings=settings, database_url: Optional[str] = None) -> Engine:
+    """
+    Engine configured from settings
+
+    Long-running servers get a QueuePool of DB_POOL_SIZE + DB_MAX_OVERFLOW
+    connections per process; serverless instances get NullPool (connect per
+    checkout) or DB_SERVERLESS_POOL_SIZE connections without overflow.
+    database_url defaults to DATABASE_URL.
+    """
+    url = normalize_database_url(database_url or app_settings.DATABASE_URL)
+    options: Dict[str, Any] = {"echo": app_settings.DEBUG}
+
+    if is_serverless(app_settings):
+        if make_url(url).get_driver_name() == "psycopg":
+            # psycopg 3 prepares repeated statements server-side, which breaks
+            # behind PgBouncer in transaction mode (psycopg2 never does)
+            options["connect_args"] = {"prepare_threshold": None}
+        if app_settings.DB_SERVERLESS_POOL_SIZE > 0:
+            options.update(
+                pool_size=app_settings.DB_SERVERLESS_POOL_SIZE,
+                max_overflow=0,
+                pool_recycle=app_settings.DB_POOL_RECYCLE,
+                pool_timeout=app_settings.DB_POOL_TIMEOUT,
+                pool_pre_ping=True,  # connections may have been dropped while the instance was frozen
+            )
+        else:
+            options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=app_settings.DB_POOL_SIZE,
+            max_overflow=app_settings.DB_MAX_OVERFLOW,
+            pool_recycle=app_settings.DB_POOL_RECYCLE,
+            pool_timeout=app_settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=app_settings.DB_POOL_PRE_PING,
+        )
+
+    return create_engine(url, **options)
+
+
+def _instrument(db_engine: Engine, name: str) -> Engine:
+    # Server-side prepared statements cannot be used through PgBouncer (serverless mode)
+    if settings.DB_PREPARE_HOT_STATEMENTS and not is_serverless():
+        enable_prepared_statements(db_engine)
+    track_connections(db_engine)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        instrument_engine(db_engine)
+    if settings.METRICS_ENABLED:
+        instrument_engine_pool(db_engine, name)
+    if get_slow_query_log() is not None:
+        get_slow_query_log().install(db_engine)
+    return db_engine
+
 
-# Create engine with optimized connection pooling
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=10,  # Number of permanent connections (increased from default 5)
-    max_overflow=20,  # Additional connections when pool is full (increased from default 10)
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    pool_timeout=30,  # Timeout for getting connection from pool
-    echo=settings.DEBUG,
-)
+engine = _instrument(create_app_engine(), "app")
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+event.listen(SessionLocal, "after_commit", mark_committed)
+query_budget.install(engine, SessionLocal)
+
+# Optional read replica
+read_engine: Optional[Engine] = None
+ReadSessionLocal: Optional[sessionmaker] = None
+replica_monitor: Optional[ReplicaMonitor] = None
+read_your_writes = ReadYourWrites(window=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+if settings.DATABASE_READ_URL:
+    read_engine = _instrument(create_app_engine(database_url=settings.DATABASE_READ_URL), "replica")
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={"replica": True})
+    query_budget.install(read_engine, ReadSessionLocal)
+    replica_monitor = ReplicaMonitor(
+        read_engine,
+        max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    )
+
+# atams helpers (get_db, get_pool_status, check_connection_health, ...) use the same engine
+atams_session.engine = engine
+atams_session.SessionLocal = SessionLocal
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -37,3 +140,34 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Session for read-only endpoints
+
+    Uses the replica when one is configured, it is healthy and not lagging,
+    and the client has not written recently; otherwise the primary. Never
+    write through this session.
+
+    Usage:
+        @router.get("/")
+        async def endpoint(db: Session = Depends(get_read_db)):
+            pass
+    """
+    factory = SessionLocal
+    if ReadSessionLocal is not None:
+        if read_your_writes.active(request):
+            target = "primary_recent_write"
+        elif not replica_monitor.is_usable():
+            target = "primary_replica_unavailable"
+        else:
+            target = "replica"
+            factory = ReadSessionLocal
+        DB_READ_SESSIONS.labels(target).inc()
+
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
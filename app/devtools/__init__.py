@@ -0,0 +1,4 @@
+"""
+Developer tooling (synthetic datasets, load testing)
+Not imported by the application itself
+"""
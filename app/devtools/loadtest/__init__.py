@@ -0,0 +1,7 @@
+"""
+Offline Load-Test Harness
+Drives app.main:app with local stand-ins for Atlas SSO, Cloudinary and SMTP
+
+Usage:
+    python -m app.devtools.loadtest --database-url postgresql+psycopg2://... --concurrency 32 --duration 60
+"""
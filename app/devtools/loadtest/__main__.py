@@ -0,0 +1,166 @@
+"""
+Load-test runner
+
+Starts the fake SSO, fake Cloudinary and SMTP sink in this process, boots
+the API with uvicorn in a subprocess pointed at them, runs the mixed
+workload and prints per-route p50/p95/p99 latency and throughput.
+
+Usage:
+    python -m app.devtools.loadtest --database-url postgresql+psycopg2://... \\
+        --concurrency 32 --duration 60 --mix list=30,get=25,search=20,update=15,upload=8,reminder=2
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.devtools.loadtest.fakes import BackgroundServer, SMTPSink, create_fake_sso_app, create_fake_storage_app
+from app.devtools.loadtest.workload import DEFAULT_MIX, OPERATIONS, discover, format_report, report_json, run_workload
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {name: 0.0 for name in OPERATIONS}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.devtools.loadtest", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Seeded database (default: DATABASE_URL)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users (default: 16)")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before that (default: 5)")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="Operation weights, e.g. list=30,get=25,search=20,update=15,upload=8,reminder=2")
+    parser.add_argument("--role-level", type=int, default=50, help="role_level of the fake users (default: 50)")
+    parser.add_argument("--admin-user-id", type=int, default=1, help="u_id used for discovery requests")
+    parser.add_argument("--auth", choices=["sso", "override"], default="sso",
+                        help="sso: go through atams auth against the fake SSO; override: skip the SSO round trip")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (default: 1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this file")
+    return parser
+
+
+def _wait_for_health(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API process exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not become healthy in time")
+
+
+async def _drive(base_url: str, args, cron_api_key: str):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        ctx = await discover(client, args.role_level, args.admin_user_id, cron_api_key)
+        print(f"Discovered {len(ctx.task_ids)} tasks, {len(ctx.user_ids)} users; "
+              f"running {args.concurrency} workers for {args.warmup:g}s warmup + {args.duration:g}s")
+        return await run_workload(client, ctx, args.mix, args.concurrency, args.duration, args.warmup, args.seed)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.database_url:
+        print("--database-url (or DATABASE_URL) is required", file=sys.stderr)
+        return 2
+
+    app_code = os.environ.get("ATLAS_APP_CODE", "atask")
+    cron_api_key = secrets.token_hex(16)
+    started: list = []
+    process: Optional[subprocess.Popen] = None
+    try:
+        sso = BackgroundServer(create_fake_sso_app(app_code)).start()
+        storage = BackgroundServer(create_fake_storage_app()).start()
+        started += [sso, storage]
+        sink = None
+        if args.mix.get("reminder"):
+            sink = SMTPSink().start()
+            started.append(sink)
+
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": args.database_url,
+            "ATLAS_SSO_URL": sso.url,
+            "ATLAS_APP_CODE": app_code,
+            "LOADTEST_AUTH": args.auth,
+            "LOADTEST_STORAGE_URL": storage.url,
+            "CLOUDINARY_CLOUD_NAME": env.get("CLOUDINARY_CLOUD_NAME") or "loadtest",
+            "CLOUDINARY_API_KEY": env.get("CLOUDINARY_API_KEY") or "loadtest",
+            "CLOUDINARY_API_SECRET": env.get("CLOUDINARY_API_SECRET") or "loadtest",
+            "CRON_API_KEY": cron_api_key,
+            "ENCRYPTION_ENABLED": "false",
+            "RATE_LIMIT_ENABLED": "false",
+            "LOG_TO_FILE": "false",
+        })
+        if sink is not None:
+            env.update({
+                "MAIL_SERVER": sink.host,
+                "MAIL_PORT": str(sink.port),
+                "MAIL_USERNAME": "loadtest",
+                "MAIL_PASSWORD": "loadtest",
+                "MAIL_FROM": "loadtest@example.com",
+                "MAIL_USE_TLS": "false",
+                "MAIL_USE_SSL": "false",
+            })
+
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.devtools.loadtest.server:app",
+             "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers),
+             "--log-level", "warning", "--no-access-log"],
+            env=env,
+        )
+        _wait_for_health(base_url, process)
+
+        try:
+            stats = asyncio.run(_drive(base_url, args, cron_api_key))
+        except RuntimeError as e:
+            print(f"Load test aborted: {e}", file=sys.stderr)
+            return 1
+        print()
+        print(format_report(stats, args.duration))
+        if sink is not None:
+            print(f"\nSMTP sink received {sink.messages} message(s)")
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                f.write(report_json(stats, args.duration))
+        return 0
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for server in reversed(started):
+            server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
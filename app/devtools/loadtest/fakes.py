@@ -0,0 +1,211 @@
+"""
+Local stand-ins for the external services the API talks to
+
+- Fake Atlas SSO: answers /auth/me for tokens minted by fake_token()
+- Fake Cloudinary upload API: accepts uploads/destroys and returns
+  Cloudinary-shaped JSON without storing anything
+- SMTP sink (aiosmtpd): accepts and counts messages
+
+None of these import the application, so they can be started before the
+app's settings are read.
+"""
+import itertools
+import socket
+import threading
+import time
+from pathlib import PurePosixPath
+from typing import Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+TOKEN_PREFIX = "loadtest"
+
+
+def fake_token(u_id: int, role_level: int) -> str:
+    """Bearer token understood by the fake SSO and the auth override"""
+    return f"{TOKEN_PREFIX}.{u_id}.{role_level}"
+
+
+def parse_fake_token(token: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(u_id, role_level) from a fake token, None if it is not one"""
+    parts = (token or "").split(".")
+    if len(parts) != 3 or parts[0] != TOKEN_PREFIX:
+        return None
+    try:
+        return int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+
+def fake_user_info(u_id: int, role_level: int, app_code: str) -> dict:
+    """User info in the shape Atlas /auth/me returns"""
+    return {
+        "u_id": u_id,
+        "u_username": f"loadtest.user{u_id}",
+        "u_email": f"loadtest.user{u_id}@example.com",
+        "u_full_name": f"Load Test User {u_id}",
+        "u_status": "active",
+        "roles": [{"app_code": app_code, "role_code": "LOADTEST", "role_level": role_level}],
+    }
+
+
+def create_fake_sso_app(app_code: str) -> Starlette:
+    """Atlas SSO stand-in: /auth/me for fake tokens, refresh always fails"""
+
+    async def me(request: Request) -> JSONResponse:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        parsed = parse_fake_token(token) if scheme.lower() == "bearer" else None
+        if parsed is None:
+            return JSONResponse({"success": False, "message": "Invalid token"}, status_code=401)
+        return JSONResponse({"success": True, "data": fake_user_info(*parsed, app_code)})
+
+    async def refresh(request: Request) -> JSONResponse:
+        return JSONResponse({"success": False, "message": "Refresh not supported"}, status_code=401)
+
+    return Starlette(routes=[
+        Route("/auth/me", me),
+        Route("/auth/refresh", refresh, methods=["POST"]),
+    ])
+
+
+def _sniff_format(content: bytes) -> Optional[str]:
+    """File format from magic bytes, as Cloudinary reports it"""
+    for magic, file_format in ((b"\x89PNG", "png"), (b"\xff\xd8\xff", "jpg"), (b"%PDF", "pdf")):
+        if content.startswith(magic):
+            return file_format
+    return None
+
+
+def create_fake_storage_app() -> Starlette:
+    """
+    Cloudinary upload API stand-in
+
+    Point the SDK at it with cloudinary.config(upload_prefix=<server url>).
+    Uploaded bytes are read (so request size costs are real) and discarded.
+    """
+    counter = itertools.count(1)
+
+    async def upload(request: Request) -> JSONResponse:
+        form = await request.form()
+        resource_type = request.path_params["resource_type"]
+        file = form.get("file")
+        if hasattr(file, "read"):
+            content = await file.read()
+            filename = file.filename or "file"
+        else:
+            content = (file or "").encode()
+            filename = "file"
+        stem = PurePosixPath(filename).stem
+        suffix = PurePosixPath(filename).suffix.lstrip(".") or _sniff_format(content)
+        folder = form.get("folder") or "atask"
+        public_id = form.get("public_id") or f"{folder}/{stem}_{next(counter)}"
+        cloud = request.path_params["cloud"]
+        version = int(time.time())
+        url = f"://res.cloudinary.com/{cloud}/{resource_type}/upload/v{version}/{public_id}"
+        return JSONResponse({
+            "public_id": public_id,
+            "version": version,
+            "resource_type": resource_type,
+            "type": "upload",
+            "format": suffix or None,
+            "bytes": len(content),
+            "width": 1 if resource_type == "image" else None,
+            "height": 1 if resource_type == "image" else None,
+            "url": "http" + url,
+            "secure_url": "https" + url,
+            "original_filename": stem,
+        })
+
+    async def destroy(request: Request) -> JSONResponse:
+        return JSONResponse({"result": "ok"})
+
+    return Starlette(routes=[
+        Route("/v1_1/{cloud}/{resource_type}/upload", upload, methods=["POST"]),
+        Route("/v1_1/{cloud}/{resource_type}/destroy", destroy, methods=["POST"]),
+    ])
+
+
+class BackgroundServer:
+    """
+    Runs an ASGI app with uvicorn in a daemon thread on a free local port
+
+    Example:
+        server = BackgroundServer(create_fake_sso_app("atask")).start()
+        print(server.url)
+        server.stop()
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.host = host
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "BackgroundServer":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Background server failed to start")
+            time.sleep(0.01)
+        self.port = self.server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class SMTPSink:
+    """
+    aiosmtpd server that accepts any login and counts received messages
+
+    Example:
+        sink = SMTPSink().start()
+        ...  # MAIL_SERVER=127.0.0.1, MAIL_PORT=sink.port, MAIL_USE_TLS=false
+        sink.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        try:
+            from aiosmtpd.controller import Controller
+            from aiosmtpd.smtp import AuthResult
+        except ImportError as e:
+            raise RuntimeError("aiosmtpd is required for the SMTP sink (pip install -r requirements-dev.txt)") from e
+
+        if port == 0:
+            with socket.socket() as probe:
+                probe.bind((host, 0))
+                port = probe.getsockname()[1]
+
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self._lock = threading.Lock()
+        self.controller = Controller(
+            self,
+            hostname=host,
+            port=port,
+            authenticator=lambda *args: AuthResult(success=True),
+            auth_require_tls=False,
+        )
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        with self._lock:
+            self.messages += 1
+        return "250 Message accepted"
+
+    def start(self) -> "SMTPSink":
+        self.controller.start()
+        return self
+
+    def stop(self) -> None:
+        self.controller.stop()
@@ -0,0 +1,47 @@
+"""
+Application entry point for load tests
+
+Wraps app.main:app with the harness configuration read from the environment:
+- LOADTEST_AUTH=override: resolve fake tokens in-process instead of calling
+  Atlas (the default "sso" mode sends them to the fake SSO via ATLAS_SSO_URL)
+- LOADTEST_STORAGE_URL: send Cloudinary uploads to the fake storage server
+
+Run by the harness as: uvicorn app.devtools.loadtest.server:app
+"""
+import os
+from typing import Optional
+
+import cloudinary
+from fastapi import Request
+
+from app.api.deps import get_current_user
+from app.devtools.loadtest.fakes import fake_user_info, parse_fake_token
+from app.core.config import settings
+from app.main import app
+
+if os.environ.get("LOADTEST_STORAGE_URL"):
+    cloudinary.config(upload_prefix=os.environ["LOADTEST_STORAGE_URL"])
+
+
+async def _fake_current_user(request: Request) -> Optional[dict]:
+    """get_current_user for fake tokens, without the SSO round trip"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    parsed = parse_fake_token(token) if scheme.lower() == "bearer" else None
+    if parsed is None:
+        return None
+    info = fake_user_info(*parsed, settings.ATLAS_APP_CODE)
+    return {
+        "user_id": info["u_id"],
+        "username": info["u_username"],
+        "email": info["u_email"],
+        "role_level": parsed[1],
+        "roles": info["roles"],
+        "full_name": info["u_full_name"],
+        "status": info["u_status"],
+    }
+
+
+if os.environ.get("LOADTEST_AUTH", "sso") == "override":
+    app.dependency_overrides[get_current_user] = _fake_current_user
+
+__all__ = ["app"]
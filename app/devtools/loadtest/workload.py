@@ -0,0 +1,222 @@
+"""
+Scripted mixed workload and latency statistics
+"""
+import asyncio
+import base64
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.devtools.loadtest.fakes import fake_token
+
+API = "/api/v1"
+
+# 1x1 transparent PNG, a valid image for the attachment validators
+TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+SEARCH_KEYWORDS = ["report", "api", "login", "invoice", "export", "sync", "release", "database", "email", "upload"]
+
+DEFAULT_MIX = {"list": 30, "get": 25, "search": 20, "update": 15, "upload": 8, "reminder": 2}
+
+
+@dataclass
+class WorkloadContext:
+    """Ids discovered before the run, shared by all workers"""
+    task_ids: List[int]
+    status_ids: List[int]
+    user_ids: List[int]
+    role_level: int
+    cron_api_key: str
+
+    def auth_headers(self, rng: random.Random) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {fake_token(rng.choice(self.user_ids), self.role_level)}"}
+
+
+Operation = Callable[[httpx.AsyncClient, WorkloadContext, random.Random], Awaitable[httpx.Response]]
+
+
+async def op_list(client, ctx, rng):
+    return await client.get(f"{API}/tasks/", params={"skip": rng.randrange(0, 500), "limit": 100},
+                            headers=ctx.auth_headers(rng))
+
+
+async def op_get(client, ctx, rng):
+    return await client.get(f"{API}/tasks/{rng.choice(ctx.task_ids)}", headers=ctx.auth_headers(rng))
+
+
+async def op_search(client, ctx, rng):
+    body = {"keyword": rng.choice(SEARCH_KEYWORDS), "limit": 50}
+    if ctx.status_ids and rng.random() < 0.5:
+        body["status_ids"] = rng.sample(ctx.status_ids, k=min(2, len(ctx.status_ids)))
+    return await client.post(f"{API}/tasks/search", json=body, headers=ctx.auth_headers(rng))
+
+
+async def op_update(client, ctx, rng):
+    body = {"tsk_description": f"Load test update {rng.randrange(1_000_000)}"}
+    return await client.put(f"{API}/tasks/{rng.choice(ctx.task_ids)}", json=body, headers=ctx.auth_headers(rng))
+
+
+async def op_upload(client, ctx, rng):
+    files = {"files": (f"loadtest_{rng.randrange(1_000_000)}.png", TINY_PNG, "image/png")}
+    return await client.post(f"{API}/tasks/{rng.choice(ctx.task_ids)}/attachments", files=files,
+                             headers=ctx.auth_headers(rng))
+
+
+async def op_reminder(client, ctx, rng):
+    return await client.post(f"{API}/notifications/send-daily-reminders", headers={"X-Api-Key": ctx.cron_api_key})
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "list": op_list,
+    "get": op_get,
+    "search": op_search,
+    "update": op_update,
+    "upload": op_upload,
+    "reminder": op_reminder,
+}
+
+# Route labels used in the report
+ROUTES = {
+    "list": "GET /tasks/",
+    "get": "GET /tasks/{tsk_id}",
+    "search": "POST /tasks/search",
+    "update": "PUT /tasks/{tsk_id}",
+    "upload": "POST /tasks/{tsk_id}/attachments",
+    "reminder": "POST /notifications/send-daily-reminders",
+}
+
+
+async def discover(client: httpx.AsyncClient, role_level: int, admin_u_id: int, cron_api_key: str) -> WorkloadContext:
+    """Collect task, status and user ids from the running API"""
+    headers = {"Authorization": f"Bearer {fake_token(admin_u_id, role_level)}"}
+    tasks = await client.get(f"{API}/tasks/", params={"limit": 1000}, headers=headers)
+    statuses = await client.get(f"{API}/master-statuses/", params={"limit": 100}, headers=headers)
+    for response in (tasks, statuses):
+        if response.status_code != 200:
+            raise RuntimeError(f"Discovery request {response.request.url.path} failed "
+                               f"({response.status_code}): {response.text[:200]}")
+
+    task_rows = _data(tasks)
+    if not task_rows:
+        raise RuntimeError("No tasks found; seed the database first (python -m app.devtools.synthetic_data)")
+    user_ids = sorted({row["tsk_assignee_u_id"] for row in task_rows if row.get("tsk_assignee_u_id")}
+                      | {row["tsk_reporter_u_id"] for row in task_rows})
+    return WorkloadContext(
+        task_ids=[row["tsk_id"] for row in task_rows],
+        status_ids=[row["ms_id"] for row in _data(statuses)],
+        user_ids=user_ids or [admin_u_id],
+        role_level=role_level,
+        cron_api_key=cron_api_key,
+    )
+
+
+def _data(response: httpx.Response) -> list:
+    payload = response.json()
+    if payload.get("encrypted"):
+        raise RuntimeError("Responses are encrypted; run the load test with ENCRYPTION_ENABLED=false")
+    return payload.get("data") or []
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        self.latencies.append(latency)
+        key = status if status is not None else 0
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    ctx: WorkloadContext,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    seed: int = 42,
+) -> Dict[str, RouteStats]:
+    """
+    Run `concurrency` workers picking operations by weight for `duration` seconds
+
+    Requests started during the first `warmup` seconds are not recorded.
+    """
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    stats = {name: RouteStats() for name in names}
+    started = time.monotonic()
+    record_from = started + warmup
+    stop_at = record_from + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            begin = time.monotonic()
+            if begin >= stop_at:
+                return
+            name = rng.choices(names, weights=weights)[0]
+            try:
+                response = await OPERATIONS[name](client, ctx, rng)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            if begin >= record_from:
+                stats[name].record(time.monotonic() - begin, status)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return stats
+
+
+def format_report(stats: Dict[str, RouteStats], duration: float) -> str:
+    """Per-route latency percentiles (ms) and throughput"""
+    header = f"{'route':<42} {'count':>7} {'errors':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    lines = [header, "-" * len(header)]
+    everything: List[float] = []
+    total_errors = 0
+    for name, route_stats in stats.items():
+        values = sorted(route_stats.latencies)
+        everything.extend(values)
+        total_errors += route_stats.errors
+        lines.append(_report_line(ROUTES[name], values, route_stats.errors, duration))
+    lines.append("-" * len(header))
+    lines.append(_report_line("total", sorted(everything), total_errors, duration))
+    return "\n".join(lines)
+
+
+def _report_line(label: str, values: List[float], errors: int, duration: float) -> str:
+    ms = [percentile(values, pct) * 1000 for pct in (50, 95, 99, 100)]
+    return (f"{label:<42} {len(values):>7} {errors:>6} {len(values) / duration:>8.1f} "
+            f"{ms[0]:>8.1f} {ms[1]:>8.1f} {ms[2]:>8.1f} {ms[3]:>8.1f}")
+
+
+def report_json(stats: Dict[str, RouteStats], duration: float) -> str:
+    result = {}
+    for name, route_stats in stats.items():
+        values = sorted(route_stats.latencies)
+        result[ROUTES[name]] = {
+            "count": len(values),
+            "errors": route_stats.errors,
+            "status_counts": route_stats.status_counts,
+            "throughput_rps": len(values) / duration,
+            **{f"p{pct}_ms": percentile(values, pct) * 1000 for pct in (50, 95, 99)},
+            "max_ms": percentile(values, 100) * 1000,
+        }
+    return json.dumps(result, indent=2)
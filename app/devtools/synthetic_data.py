@@ -0,0 +1,560 @@
+"""
+Synthetic Data Generator
+Populates a (local) Postgres with a realistic, reproducible atask dataset
+
+Tasks are skewed across projects and assignees (Zipf-like), and each task gets
+a random number of history entries, comments, labels, watchers and attachment
+rows. Rows are streamed to Postgres with COPY in batches, so millions of tasks
+load in minutes. The same seed and options always produce the same rows.
+
+Usage:
+    python -m app.devtools.synthetic_data --tasks 2000000 --yes
+    python -m app.devtools.synthetic_data --help
+"""
+import argparse
+import bisect
+import io
+import itertools
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Master data the application relies on (codes are referenced in SQL)
+MASTER_STATUSES = [
+    ("TODO", "To Do"),
+    ("IN_PROGRESS", "In Progress"),
+    ("IN_REVIEW", "In Review"),
+    ("DONE", "Done"),
+    ("CANCELLED", "Cancelled"),
+]
+MASTER_PRIORITIES = [
+    ("LOW", "Low", 1, "#22c55e"),
+    ("MEDIUM", "Medium", 2, "#eab308"),
+    ("HIGH", "High", 3, "#f97316"),
+    ("CRITICAL", "Critical", 4, "#ef4444"),
+]
+MASTER_TASK_TYPES = [
+    ("TASK", "Task"),
+    ("BUG", "Bug"),
+    ("FEATURE", "Feature"),
+    ("IMPROVEMENT", "Improvement"),
+    ("RESEARCH", "Research"),
+]
+
+ATTACHMENT_TYPES = [
+    ("pdf", "application/pdf", 30),
+    ("png", "image/png", 25),
+    ("jpg", "image/jpeg", 20),
+    ("docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", 10),
+    ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", 10),
+    ("txt", "text/plain", 5),
+]
+
+HISTORY_FIELDS = ["tsk_ms_id", "tsk_mp_id", "tsk_assignee_u_id", "tsk_due_date", "tsk_title"]
+
+WORDS = (
+    "report api login dashboard invoice export import sync mobile payment review "
+    "release deploy database query cache email reminder upload attachment project "
+    "customer vendor budget audit security performance layout filter search user "
+    "permission backup migration schedule meeting onboarding training checklist"
+).split()
+
+FIRST_NAMES = "Adi Budi Citra Dewi Eko Fajar Gita Hadi Indah Joko Kartika Lestari Made Nur Oka Putri Rizky Sari Tono Wulan".split()
+LAST_NAMES = "Pratama Wijaya Santoso Saputra Hidayat Kusuma Lestari Nugroho Permana Setiawan Utami Wibowo".split()
+
+# COPY order respects foreign keys
+TABLE_COLUMNS = {
+    "pt_atams_indonesia.users": ("u_id", "u_username", "u_email", "u_full_name"),
+    "atask.project": (
+        "prj_id", "prj_code", "prj_name", "prj_description", "prj_start_date", "prj_end_date",
+        "prj_u_id", "prj_is_active", "created_by", "created_at",
+    ),
+    "atask.label": ("lbl_id", "lbl_name", "lbl_color", "lbl_description", "created_by", "created_at"),
+    "atask.task": (
+        "tsk_id", "tsk_code", "tsk_title", "tsk_description", "tsk_prj_id", "tsk_ms_id", "tsk_mp_id",
+        "tsk_mtt_id", "tsk_assignee_u_id", "tsk_reporter_u_id", "tsk_start_date", "tsk_due_date",
+        "tsk_duration", "tsk_parent_tsk_id", "created_by", "created_at", "updated_by", "updated_at",
+    ),
+    "atask.task_history": (
+        "th_id", "th_tsk_id", "th_field_name", "th_old_value", "th_new_value", "th_u_id",
+        "created_by", "created_at",
+    ),
+    "atask.task_comment": ("tc_id", "tc_tsk_id", "tc_u_id", "tc_comment", "tc_parent_tc_id", "created_by", "created_at"),
+    "atask.task_label": ("tl_id", "tl_tsk_id", "tl_lbl_id", "created_by", "created_at"),
+    "atask.task_watcher": ("tw_id", "tw_tsk_id", "tw_u_id", "created_by", "created_at"),
+    "atask.task_attachment": (
+        "ta_id", "ta_tsk_id", "ta_file_name", "ta_file_path", "ta_file_size", "ta_file_type",
+        "created_by", "created_at",
+    ),
+}
+
+# Serial primary key of each table (users are keyed by Atlas, no sequence)
+PRIMARY_KEYS = {
+    "pt_atams_indonesia.users": "u_id",
+    "atask.project": "prj_id",
+    "atask.label": "lbl_id",
+    "atask.task": "tsk_id",
+    "atask.task_history": "th_id",
+    "atask.task_comment": "tc_id",
+    "atask.task_label": "tl_id",
+    "atask.task_watcher": "tw_id",
+    "atask.task_attachment": "ta_id",
+}
+
+USERS_TABLE_DDL = """
+    CREATE SCHEMA IF NOT EXISTS pt_atams_indonesia;
+    CREATE TABLE IF NOT EXISTS pt_atams_indonesia.users (
+        u_id BIGINT PRIMARY KEY,
+        u_username VARCHAR(100) NOT NULL,
+        u_email VARCHAR(255),
+        u_full_name VARCHAR(255)
+    );
+"""
+
+
+@dataclass
+class DatasetConfig:
+    """Size and shape of the generated dataset"""
+    seed: int = 42
+    users: int = 5_000
+    projects: int = 500
+    tasks: int = 1_000_000
+    labels: int = 60
+    # Zipf exponents: 0 = uniform, ~1 = a few projects/users own most tasks
+    project_skew: float = 1.1
+    assignee_skew: float = 1.2
+    unassigned_ratio: float = 0.08
+    subtask_ratio: float = 0.15
+    # Mean number of child rows per task (Poisson distributed)
+    history_per_task: float = 4.0
+    comments_per_task: float = 2.5
+    labels_per_task: float = 1.5
+    watchers_per_task: float = 1.2
+    attachments_per_task: float = 0.6
+    # Relative weights, in MASTER_* order
+    status_weights: Tuple[float, ...] = (30, 20, 10, 35, 5)
+    priority_weights: Tuple[float, ...] = (25, 45, 22, 8)
+    type_weights: Tuple[float, ...] = (50, 25, 15, 7, 3)
+    # Tasks are created within `days` before end_date, biased towards recent
+    days: int = 730
+    end_date: datetime = field(default_factory=lambda: datetime(2025, 6, 30, tzinfo=timezone.utc))
+    batch_size: int = 20_000
+
+
+class ZipfSampler:
+    """
+    Draws indexes 0..n-1 with probability proportional to 1 / rank**skew
+
+    Ranks are shuffled with the generator, so the "popular" entities are not
+    simply the lowest ids.
+    """
+
+    def __init__(self, n: int, skew: float, rng: random.Random):
+        weights = [1.0 / (rank ** skew) for rank in range(1, n + 1)]
+        self.cum_weights = list(itertools.accumulate(weights))
+        self.total = self.cum_weights[-1]
+        self.order = list(range(n))
+        rng.shuffle(self.order)
+        self.rng = rng
+
+    def sample(self) -> int:
+        return self.order[bisect.bisect_left(self.cum_weights, self.rng.random() * self.total)]
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Poisson variate (Knuth; fine for the small means used here)"""
+    if mean <= 0:
+        return 0
+    limit = math.exp(-mean)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_COPY_ENCODERS = {
+    type(None): lambda value: "\\N",
+    bool: lambda value: "t" if value else "f",
+    datetime: datetime.isoformat,
+    str: lambda value: value.translate(_COPY_ESCAPES),
+}
+
+
+def _copy_value(value) -> str:
+    """Encode a value for COPY ... FORMAT text"""
+    encoder = _COPY_ENCODERS.get(type(value))
+    return encoder(value) if encoder else str(value)
+
+
+def copy_rows(cursor, table: str, rows: Sequence[tuple]) -> int:
+    """COPY rows into table (columns from TABLE_COLUMNS) with a psycopg2 cursor"""
+    if not rows:
+        return 0
+    buffer = io.StringIO()
+    buffer.writelines("\t".join(map(_copy_value, row)) + "\n" for row in rows)
+    buffer.seek(0)
+    columns = ", ".join(TABLE_COLUMNS[table])
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT text)", buffer)
+    return len(rows)
+
+
+class SyntheticDataGenerator:
+    """
+    Produces the rows of one dataset; ids continue after `id_start`
+
+    Example:
+        generator = SyntheticDataGenerator(DatasetConfig(tasks=1000), master_ids, id_start)
+        users = generator.users()
+        for batch in generator.task_batches():
+            ...  # {"atask.task": [...], "atask.task_comment": [...], ...}
+    """
+
+    def __init__(
+        self,
+        config: DatasetConfig,
+        master_ids: Dict[str, List[int]],
+        id_start: Dict[str, int],
+        existing_user_ids: Optional[List[int]] = None,
+    ):
+        self.config = config
+        self.master_ids = master_ids
+        self.next_id = dict(id_start)
+        self.rng = random.Random(config.seed)
+        self.start_date = config.end_date - timedelta(days=config.days)
+        self.user_ids: List[int] = list(existing_user_ids or [])
+        self.project_ids: List[int] = []
+        self.label_ids: List[int] = []
+        self.project_created: Dict[int, datetime] = {}
+        self.project_task_count: Dict[int, int] = {}
+        self.project_recent_tasks: Dict[int, List[int]] = {}
+        self.type_codes = {
+            type_id: code[:3] for type_id, (code, _) in zip(master_ids["task_type"], MASTER_TASK_TYPES)
+        }
+
+    def _take_id(self, table: str) -> int:
+        value = self.next_id[table]
+        self.next_id[table] = value + 1
+        return value
+
+    def _words(self, low: int, high: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def _recent_timestamp(self, not_before: datetime) -> datetime:
+        """Timestamp in [not_before, end_date], biased towards end_date"""
+        span = (self.config.end_date - not_before).total_seconds()
+        return self.config.end_date - timedelta(seconds=span * self.rng.random() ** 2)
+
+    def _after(self, moment: datetime) -> datetime:
+        """Timestamp between moment and end_date (uniform)"""
+        span = (self.config.end_date - moment).total_seconds()
+        return moment + timedelta(seconds=span * self.rng.random())
+
+    def users(self) -> List[tuple]:
+        rows = []
+        for _ in range(self.config.users):
+            u_id = self._take_id("pt_atams_indonesia.users")
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            username = f"{first}.{last}.{u_id}".lower()
+            rows.append((u_id, username, f"{username}@example.com", f"{first} {last}"))
+            self.user_ids.append(u_id)
+        return rows
+
+    def projects(self) -> List[tuple]:
+        rows = []
+        for _ in range(self.config.projects):
+            prj_id = self._take_id("atask.project")
+            created_at = self.start_date + timedelta(days=self.rng.random() * self.config.days * 0.5)
+            owner = self.rng.choice(self.user_ids)
+            rows.append((
+                prj_id, f"SYN-{prj_id:06d}", f"Project {self._words(1, 3).title()} {prj_id}",
+                self._words(5, 30), created_at.date(), (created_at + timedelta(days=self.rng.randint(60, 720))).date(),
+                owner, self.rng.random() < 0.9, str(owner), created_at,
+            ))
+            self.project_ids.append(prj_id)
+            self.project_created[prj_id] = created_at
+        return rows
+
+    def labels(self) -> List[tuple]:
+        rows = []
+        for _ in range(self.config.labels):
+            lbl_id = self._take_id("atask.label")
+            rows.append((
+                lbl_id, f"{self.rng.choice(WORDS)}-{lbl_id}", f"#{self.rng.randrange(0x1000000):06x}",
+                self._words(3, 8), "system", self.start_date,
+            ))
+            self.label_ids.append(lbl_id)
+        return rows
+
+    def task_batches(self) -> Iterable[Dict[str, List[tuple]]]:
+        """Tasks with their child rows, config.batch_size tasks at a time"""
+        config, rng = self.config, self.rng
+        project_sampler = ZipfSampler(len(self.project_ids), config.project_skew, rng)
+        user_sampler = ZipfSampler(len(self.user_ids), config.assignee_skew, rng)
+        label_sampler = ZipfSampler(len(self.label_ids), 1.0, rng) if self.label_ids else None
+        status_cum = list(itertools.accumulate(config.status_weights))
+        priority_cum = list(itertools.accumulate(config.priority_weights))
+        type_cum = list(itertools.accumulate(config.type_weights))
+        attachment_cum = list(itertools.accumulate(weight for _, _, weight in ATTACHMENT_TYPES))
+
+        remaining = config.tasks
+        while remaining > 0:
+            count = min(config.batch_size, remaining)
+            remaining -= count
+            batch = {table: [] for table in TABLE_COLUMNS if table.startswith("atask.task")}
+            for _ in range(count):
+                self._task(batch, project_sampler, user_sampler, label_sampler,
+                           status_cum, priority_cum, type_cum, attachment_cum)
+            yield batch
+
+    def _task(self, batch, project_sampler, user_sampler, label_sampler,
+              status_cum, priority_cum, type_cum, attachment_cum) -> None:
+        config, rng = self.config, self.rng
+        tsk_id = self._take_id("atask.task")
+        prj_id = self.project_ids[project_sampler.sample()]
+        ms_id = rng.choices(self.master_ids["status"], cum_weights=status_cum)[0]
+        mp_id = rng.choices(self.master_ids["priority"], cum_weights=priority_cum)[0]
+        mtt_id = rng.choices(self.master_ids["task_type"], cum_weights=type_cum)[0]
+        assignee = None if rng.random() < config.unassigned_ratio else self.user_ids[user_sampler.sample()]
+        reporter = self.user_ids[user_sampler.sample()]
+        created_at = self._recent_timestamp(self.project_created[prj_id])
+        start_date = created_at + timedelta(days=rng.randint(0, 7))
+        updated_at = self._after(created_at) if rng.random() < 0.7 else None
+
+        recent = self.project_recent_tasks.setdefault(prj_id, [])
+        parent = rng.choice(recent) if recent and rng.random() < config.subtask_ratio else None
+        recent.append(tsk_id)
+        if len(recent) > 50:
+            del recent[0]
+
+        number = self.project_task_count.get(prj_id, 0) + 1
+        self.project_task_count[prj_id] = number
+
+        batch["atask.task"].append((
+            tsk_id, f"{prj_id:03d}/{self.type_codes[mtt_id]}/{number:03d}",
+            f"{self._words(2, 8).capitalize()}", self._words(0, 60) or None,
+            prj_id, ms_id, mp_id, mtt_id, assignee, reporter,
+            start_date, start_date + timedelta(days=rng.randint(1, 45)),
+            Decimal(rng.randint(1, 160)) / 4, parent,
+            str(reporter), created_at, str(assignee or reporter) if updated_at else None, updated_at,
+        ))
+
+        for _ in range(poisson(rng, config.history_per_task)):
+            field_name = rng.choice(HISTORY_FIELDS)
+            batch["atask.task_history"].append((
+                self._take_id("atask.task_history"), tsk_id, field_name,
+                str(rng.randint(1, 5)), str(rng.randint(1, 5)), assignee or reporter,
+                str(assignee or reporter), self._after(created_at),
+            ))
+
+        comment_ids: List[int] = []
+        for _ in range(poisson(rng, config.comments_per_task)):
+            tc_id = self._take_id("atask.task_comment")
+            author = rng.choice((assignee or reporter, reporter, self.user_ids[user_sampler.sample()]))
+            reply_to = rng.choice(comment_ids) if comment_ids and rng.random() < 0.3 else None
+            batch["atask.task_comment"].append((
+                tc_id, tsk_id, author, self._words(3, 40).capitalize() + ".", reply_to,
+                str(author), self._after(created_at),
+            ))
+            comment_ids.append(tc_id)
+
+        if label_sampler is not None:
+            label_count = min(poisson(rng, config.labels_per_task), len(self.label_ids))
+            for lbl_index in {label_sampler.sample() for _ in range(label_count)}:
+                batch["atask.task_label"].append((
+                    self._take_id("atask.task_label"), tsk_id, self.label_ids[lbl_index],
+                    str(reporter), created_at,
+                ))
+
+        watcher_count = min(poisson(rng, config.watchers_per_task), len(self.user_ids))
+        for u_index in {user_sampler.sample() for _ in range(watcher_count)}:
+            batch["atask.task_watcher"].append((
+                self._take_id("atask.task_watcher"), tsk_id, self.user_ids[u_index],
+                str(reporter), self._after(created_at),
+            ))
+
+        for _ in range(poisson(rng, config.attachments_per_task)):
+            ta_id = self._take_id("atask.task_attachment")
+            extension, content_type, _ = rng.choices(ATTACHMENT_TYPES, cum_weights=attachment_cum)[0]
+            size = min(int(rng.lognormvariate(11.5, 1.3)), 10 * 1024 * 1024)
+            batch["atask.task_attachment"].append((
+                ta_id, tsk_id, f"{rng.choice(WORDS)}_{ta_id}.{extension}",
+                f"atask/task-{tsk_id}/synthetic_{ta_id}", size, content_type,
+                str(reporter), self._after(created_at),
+            ))
+
+
+def _prepare_database(engine, create_users_table: bool) -> Dict[str, List[int]]:
+    """Create missing tables and master data; return master ids in MASTER_* order"""
+    from sqlalchemy import text
+
+    import app.models  # noqa: F401 - registers the tables on Base.metadata
+    from atams.db import Base
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS atask"))
+        if create_users_table:
+            conn.exec_driver_sql(USERS_TABLE_DDL)
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        for code, name in MASTER_STATUSES:
+            conn.execute(text(
+                "INSERT INTO atask.master_status (ms_code, ms_name, ms_is_active, created_by) "
+                "VALUES (:code, :name, true, 'system') ON CONFLICT (ms_code) DO NOTHING"
+            ), {"code": code, "name": name})
+        for code, name, level, color in MASTER_PRIORITIES:
+            conn.execute(text(
+                "INSERT INTO atask.master_priority (mp_code, mp_name, mp_level, mp_color, mp_is_active, created_by) "
+                "VALUES (:code, :name, :level, :color, true, 'system') ON CONFLICT (mp_code) DO NOTHING"
+            ), {"code": code, "name": name, "level": level, "color": color})
+        for code, name in MASTER_TASK_TYPES:
+            conn.execute(text(
+                "INSERT INTO atask.master_task_type (mtt_code, mtt_name, mtt_is_active, created_by) "
+                "VALUES (:code, :name, true, 'system') ON CONFLICT (mtt_code) DO NOTHING"
+            ), {"code": code, "name": name})
+
+        def ids(table: str, id_column: str, code_column: str, codes: List[str]) -> List[int]:
+            rows = dict(conn.execute(text(f"SELECT {code_column}, {id_column} FROM atask.{table}")).all())
+            return [rows[code] for code in codes]
+
+        return {
+            "status": ids("master_status", "ms_id", "ms_code", [c for c, _ in MASTER_STATUSES]),
+            "priority": ids("master_priority", "mp_id", "mp_code", [c for c, *_ in MASTER_PRIORITIES]),
+            "task_type": ids("master_task_type", "mtt_id", "mtt_code", [c for c, _ in MASTER_TASK_TYPES]),
+        }
+
+
+def _next_ids(conn) -> Dict[str, int]:
+    from sqlalchemy import text
+
+    return {
+        table: conn.execute(text(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}")).scalar()
+        for table, column in PRIMARY_KEYS.items()
+    }
+
+
+def populate(engine, config: DatasetConfig, generate_users: bool = True, log=print) -> Dict[str, int]:
+    """
+    Generate the dataset and COPY it into the database behind engine
+
+    Returns the number of rows loaded per table. Existing rows are kept;
+    new ids continue after the current maximum and serial sequences are
+    moved past them afterwards.
+    """
+    from sqlalchemy import text
+
+    master_ids = _prepare_database(engine, create_users_table=generate_users)
+    with engine.connect() as conn:
+        id_start = _next_ids(conn)
+        existing_users = [] if generate_users else [
+            row[0] for row in conn.execute(text("SELECT u_id FROM pt_atams_indonesia.users ORDER BY u_id"))
+        ]
+    if not generate_users and not existing_users:
+        raise SystemExit("pt_atams_indonesia.users is empty; run without --skip-users")
+
+    generator = SyntheticDataGenerator(config, master_ids, id_start, existing_users)
+    loaded = {table: 0 for table in TABLE_COLUMNS}
+    started = time.monotonic()
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if generate_users:
+            loaded["pt_atams_indonesia.users"] += copy_rows(cursor, "pt_atams_indonesia.users", generator.users())
+        loaded["atask.project"] += copy_rows(cursor, "atask.project", generator.projects())
+        loaded["atask.label"] += copy_rows(cursor, "atask.label", generator.labels())
+        raw.commit()
+
+        for batch in generator.task_batches():
+            for table, rows in batch.items():
+                loaded[table] += copy_rows(cursor, table, rows)
+            raw.commit()
+            done = loaded["atask.task"]
+            log(f"  {done:,}/{config.tasks:,} tasks ({done / (time.monotonic() - started):,.0f}/s)")
+
+        for table, column in PRIMARY_KEYS.items():
+            if table == "pt_atams_indonesia.users":
+                continue
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                f"(SELECT COALESCE(MAX({column}), 1) FROM {table}))"
+            )
+        raw.commit()
+
+        raw.autocommit = True
+        for table in TABLE_COLUMNS:
+            cursor.execute(f"ANALYZE {table}")
+    finally:
+        raw.close()
+
+    log(f"Loaded in {time.monotonic() - started:,.1f}s")
+    return loaded
+
+
+def _weights(value: str) -> Tuple[float, ...]:
+    return tuple(float(part) for part in value.split(","))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    defaults = DatasetConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.devtools.synthetic_data",
+        description="Load a reproducible synthetic atask dataset into Postgres with COPY.",
+    )
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: DATABASE_URL setting)")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--skip-users", action="store_true",
+                        help="Use the existing pt_atams_indonesia.users rows instead of generating users")
+    for item in fields(DatasetConfig):
+        if item.name in ("end_date",):
+            continue
+        default = getattr(defaults, item.name)
+        flag = "--" + item.name.replace("_", "-")
+        if isinstance(default, tuple):
+            parser.add_argument(flag, type=_weights, default=default,
+                                help=f"comma separated weights (default: {','.join(f'{w:g}' for w in default)})")
+        else:
+            parser.add_argument(flag, type=type(default), default=default, help=f"(default: {default})")
+    parser.add_argument("--end-date", type=datetime.fromisoformat, default=defaults.end_date,
+                        help="Latest created_at, ISO date (default: 2025-06-30)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    config = DatasetConfig(**{item.name: getattr(args, item.name) for item in fields(DatasetConfig)})
+    if config.end_date.tzinfo is None:
+        config.end_date = config.end_date.replace(tzinfo=timezone.utc)
+
+    from sqlalchemy import create_engine
+
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        from app.core.config import settings
+        database_url = settings.DATABASE_URL
+
+    engine = create_engine(database_url)
+    target = engine.url.render_as_string(hide_password=True)
+    print(f"Target: {target}")
+    print(f"Dataset: {config.users if not args.skip_users else 'existing'} users, {config.projects} projects, "
+          f"{config.tasks:,} tasks (seed {config.seed})")
+    if not args.yes and input("Load synthetic data into this database? [y/N] ").strip().lower() != "y":
+        print("Aborted")
+        return 1
+
+    loaded = populate(engine, config, generate_users=not args.skip_users)
+    for table, count in loaded.items():
+        print(f"  {table}: {count:,} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
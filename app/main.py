@@ -1,23 +1,52 @@
 """
 atask - AURA Application
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.exc import IntegrityError
-from atams.db import init_database
-from atams.logging import setup_logging_from_settings
+from sqlalchemy.exc import IntegrityError, OperationalError, TimeoutError as PoolTimeoutError
+from atams.logging import get_logger, setup_logging_from_settings
 from atams.middleware import RequestIDMiddleware
 from atams.exceptions import setup_exception_handlers
 
 from app.core.config import settings
-from app.core.exception_handlers import custom_integrity_exception_handler
+from app.core.exception_handlers import (
+    custom_integrity_exception_handler,
+    operational_exception_handler,
+    pool_timeout_exception_handler,
+)
+from app.core.http_client import close_http_client
+from app.core.download_cache import get_download_cache
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware
+from app.db.pool import pool_status
+from app.db.query_budget import QueryBudgetMiddleware
+from app.db.replica import ReadYourWritesMiddleware
+from app.db.session import engine, is_serverless, read_engine, read_your_writes, replica_monitor
 from app.api.v1.api import api_router
+from app.api.deps import verify_cron_api_key, verify_metrics_api_key
 
 # Setup logging
 setup_logging_from_settings(settings)
 
-# Initialize database
-init_database(settings.DATABASE_URL, settings.DEBUG)
+# Database engine (app/db/session.py, shared with atams.db)
+_pool = pool_status(engine)
+get_logger(__name__).info(
+    f"Database pool: {_pool['pool']}{' (serverless)' if is_serverless() else ''}, "
+    f"max connections per process: {_pool.get('max_connections') or 'unbounded'}"
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared resources on shutdown"""
+    yield
+    await close_http_client()
+    engine.dispose()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -28,6 +57,7 @@ app = FastAPI(
     swagger_ui_parameters={
         "persistAuthorization": True,
     },
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -39,15 +69,53 @@ app.add_middleware(
     allow_headers=settings.cors_headers_list,
 )
 
+# Statement/lock timeouts and query cap per request (narrowed per route in app/api/v1/api.py)
+app.add_middleware(
+    QueryBudgetMiddleware,
+    statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+    lock_timeout_ms=settings.DB_LOCK_TIMEOUT_MS,
+    max_queries=settings.DB_MAX_QUERIES_PER_REQUEST,
+)
+
+# Read-your-writes cookie for clients that just wrote (only needed with a read replica)
+if read_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware, read_your_writes=read_your_writes)
+
+# SQL instrumentation (inside RequestIDMiddleware, which sets the request ID it logs)
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+        server_timing=settings.SQL_SERVER_TIMING_ENABLED,
+    )
+
 # Request ID middleware
 app.add_middleware(RequestIDMiddleware)
 
+# Response compression (outermost, so it sees the final body)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        cache_max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+    )
+
+# Route latency/status metrics (outermost, so the timing includes every middleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Exception handlers
 setup_exception_handlers(app)
 
 # Override IntegrityError handler with custom one for better error messages
 app.add_exception_handler(IntegrityError, custom_integrity_exception_handler)
 
+# Statement/lock timeouts and pool exhaustion as 504/503 instead of a generic 500
+app.add_exception_handler(OperationalError, operational_exception_handler)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_exception_handler)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -62,3 +130,28 @@ async def root():
 async def health():
     """Health check endpoint"""
     return {"status": "ok"}
+
+
+@app.get("/health/download-cache", tags=["Health"], dependencies=[Depends(verify_cron_api_key)])
+async def download_cache_health():
+    """Attachment download cache counters of this worker"""
+    download_cache = get_download_cache()
+    if download_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **download_cache.stats()}
+
+
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_health():
+    """Database connections held by this worker process"""
+    status = {"serverless": is_serverless(), **pool_status(engine)}
+    if read_engine is not None:
+        status["replica"] = {**pool_status(read_engine), **replica_monitor.status()}
+    return status
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", tags=["Health"], include_in_schema=False, dependencies=[Depends(verify_metrics_api_key)])
+    async def metrics():
+        """Prometheus metrics of this worker"""
+        return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
@@ -1,7 +1,7 @@
 """
 Task Model
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, BigInteger, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, DateTime, Text, BigInteger, ForeignKey, Numeric, Index
 from sqlalchemy.sql import func
 from atams.db import Base
 
@@ -9,7 +9,14 @@ from atams.db import Base
 class Task(Base):
     """Task model for atask schema - Table: atask.task"""
     __tablename__ = "task"
-    __table_args__ = {"schema": "atask"}
+    __table_args__ = (
+        # Per-user lookups (dashboard, "my tasks") must not scan the whole table
+        Index("ix_task_assignee_u_id", "tsk_assignee_u_id"),
+        Index("ix_task_reporter_u_id", "tsk_reporter_u_id"),
+        # Each level of the subtree CTE (get_task_tree) looks up children by parent
+        Index("ix_task_parent_tsk_id", "tsk_parent_tsk_id"),
+        {"schema": "atask"}
+    )
 
     tsk_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     tsk_code = Column(String(50), nullable=False, unique=True)
@@ -1,7 +1,7 @@
 """
 Task Attachment Model
 """
-from sqlalchemy import Column, Integer, String, DateTime, BigInteger, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from atams.db import Base
 
@@ -9,7 +9,11 @@ from atams.db import Base
 class TaskAttachment(Base):
     """Task Attachment model for atask schema - Table: atask.task_attachment"""
     __tablename__ = "task_attachment"
-    __table_args__ = {"schema": "atask"}
+    __table_args__ = (
+        # One attachment per stored file: concurrent confirms of a direct upload get a 409
+        Index("uq_task_attachment_file_path", "ta_file_path", unique=True),
+        {"schema": "atask"}
+    )
 
     ta_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     ta_tsk_id = Column(Integer, ForeignKey("atask.task.tsk_id", ondelete="CASCADE"), nullable=False)
@@ -6,9 +6,10 @@ from sqlalchemy.orm import Session
 
 from atams.db import BaseRepository
 from app.models.project import Project
+from app.repositories.statements import StatementMixin, statement_registry
 
 
-class ProjectRepository(BaseRepository[Project]):
+class ProjectRepository(StatementMixin, BaseRepository[Project]):
     def __init__(self):
         super().__init__(Project)
 
@@ -17,7 +18,7 @@ class ProjectRepository(BaseRepository[Project]):
         Get projects with owner data in single query (optimized for performance)
         This eliminates N+1 query problem by using JOIN
         """
-        query = """
+        query = statement_registry.register("project.list", """
             SELECT
                 p.prj_id, p.prj_code, p.prj_name, p.prj_description,
                 p.prj_start_date, p.prj_end_date, p.prj_u_id, p.prj_is_active,
@@ -28,11 +29,23 @@ class ProjectRepository(BaseRepository[Project]):
             LEFT JOIN pt_atams_indonesia.users u ON p.prj_u_id = u.u_id
             ORDER BY p.created_at DESC
             LIMIT :limit OFFSET :skip
-        """
+        """)
 
         params = {"skip": skip, "limit": limit}
         return self.execute_raw_sql_dict(db, query, params)
 
+    def get_project_version(self, db: Session, prj_id: int) -> Dict[str, Any]:
+        """Cheap version probe for conditional GET of a single project"""
+        query = statement_registry.register("project.version", """
+            SELECT p.created_at, p.updated_at, u.u_full_name as owner_name
+            FROM atask.project p
+            LEFT JOIN pt_atams_indonesia.users u ON p.prj_u_id = u.u_id
+            WHERE p.prj_id = :prj_id
+        """)
+
+        result = self.execute_raw_sql_dict(db, query, {"prj_id": prj_id})
+        return result[0] if result else None
+
     def get_by_code(self, db: Session, prj_code: str) -> Project:
         """Get project by code"""
         return db.query(Project).filter(Project.prj_code == prj_code).first()
@@ -41,7 +54,7 @@ class ProjectRepository(BaseRepository[Project]):
         """
         Get project statistics including task counts by status, priority, and type
         """
-        query = """
+        query = statement_registry.register("project.statistics", """
             SELECT
                 p.prj_id,
                 p.prj_name,
@@ -68,7 +81,7 @@ class ProjectRepository(BaseRepository[Project]):
             LEFT JOIN atask.master_task_type mtt ON t.tsk_mtt_id = mtt.mtt_id
             WHERE p.prj_id = :prj_id
             GROUP BY p.prj_id, p.prj_name
-        """
+        """)
 
         result = self.execute_raw_sql_dict(db, query, {"prj_id": prj_id})
 
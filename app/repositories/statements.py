@@ -0,0 +1,103 @@
+"""
+Statement Registry
+Prebuilt text() statements for the raw-SQL repositories
+
+Repositories used to concatenate SQL strings and wrap them in text() on
+every call, re-parsing the bind parameters each time. Statements are now
+built once per filter combination and reused, so every call hands
+SQLAlchemy the same TextClause and its compiled cache is hit directly.
+
+Hot statements (task list, search, dashboard, reminder selection) are
+registered with prepare=True. With the psycopg 3 driver and
+DB_PREPARE_HOT_STATEMENTS they are executed as server-side prepared
+statements from the first call (psycopg would otherwise only prepare after
+prepare_threshold executions); psycopg2 has no prepared statements and
+ignores the flag.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Union
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+PREPARE_OPTION = "prepare"
+
+
+class StatementRegistry:
+    """
+    TextClause objects by key, built on first use
+
+    Example:
+        TASK_BY_ID = statement_registry.register("task.by_id", "SELECT ... WHERE tsk_id = :tsk_id")
+        search = statement_registry.get(("task.search", active_filters), lambda: build_sql(active_filters))
+    """
+
+    def __init__(self):
+        self._statements: Dict[Hashable, TextClause] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: Hashable, sql: str, prepare: bool = False) -> TextClause:
+        """Build and keep a fixed statement"""
+        return self.get(key, lambda: sql, prepare=prepare)
+
+    def get(self, key: Hashable, build: Callable[[], str], prepare: bool = False) -> TextClause:
+        """Statement for key, calling build() for its SQL only the first time"""
+        statement = self._statements.get(key)
+        if statement is None:
+            with self._lock:
+                statement = self._statements.get(key)
+                if statement is None:
+                    statement = text(build())
+                    if prepare:
+                        statement = statement.execution_options(**{PREPARE_OPTION: True})
+                    self._statements[key] = statement
+        return statement
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+statement_registry = StatementRegistry()
+
+
+class StatementMixin:
+    """
+    Lets execute_raw_sql_dict take a registered TextClause as well as a string
+
+    Example:
+        class TaskRepository(StatementMixin, BaseRepository[Task]):
+            ...
+    """
+
+    def execute_raw_sql_dict(
+        self,
+        db: Session,
+        query: Union[str, TextClause],
+        params: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        statement = query if isinstance(query, TextClause) else text(query)
+        result = db.execute(statement, params or {})
+        columns = result.keys()
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+
+
+def _execute_prepared(cursor, statement, parameters, context):
+    if context is not None and context.execution_options.get(PREPARE_OPTION):
+        cursor.execute(statement, parameters, prepare=True)
+        return True  # executed here, skip the dialect's own execute
+    return None
+
+
+def enable_prepared_statements(engine: Engine) -> bool:
+    """
+    Run prepare=True statements as server-side prepared statements
+
+    Only for the psycopg (3) driver; returns whether it was enabled.
+    """
+    if engine.dialect.driver != "psycopg":
+        return False
+    if not event.contains(engine, "do_execute", _execute_prepared):
+        event.listen(engine, "do_execute", _execute_prepared)
+    return True
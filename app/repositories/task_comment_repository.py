@@ -4,9 +4,10 @@ Task Comment Repository
 from sqlalchemy.orm import Session
 from atams.db import BaseRepository
 from app.models.task_comment import TaskComment
+from app.repositories.statements import StatementMixin, statement_registry
 
 
-class TaskCommentRepository(BaseRepository[TaskComment]):
+class TaskCommentRepository(StatementMixin, BaseRepository[TaskComment]):
     def __init__(self):
         super().__init__(TaskComment)
 
@@ -15,7 +16,7 @@ class TaskCommentRepository(BaseRepository[TaskComment]):
         Get comments with all related data in single query (optimized for performance)
         This eliminates N+1 query problem by using JOINs
         """
-        query = """
+        query = statement_registry.register("task_comment.list", """
             SELECT
                 tc.tc_id, tc.tc_tsk_id, tc.tc_u_id, tc.tc_comment, tc.tc_parent_tc_id,
                 tc.created_by, tc.created_at, tc.updated_by, tc.updated_at,
@@ -28,7 +29,7 @@ class TaskCommentRepository(BaseRepository[TaskComment]):
             LEFT JOIN pt_atams_indonesia.users u ON tc.tc_u_id = u.u_id
             ORDER BY tc.created_at DESC
             LIMIT :limit OFFSET :skip
-        """
+        """)
 
         params = {"skip": skip, "limit": limit}
         return self.execute_raw_sql_dict(db, query, params)
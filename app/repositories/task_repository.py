@@ -1,14 +1,41 @@
 """
 Task Repository
 """
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from sqlalchemy.orm import Session
 
 from atams.db import BaseRepository
 from app.models.task import Task
+from app.repositories.statements import StatementMixin, statement_registry
 
+# advanced_search filters: (filter key, SQL condition), applied in this order
+SEARCH_FILTERS = (
+    ("keyword", " AND (t.tsk_title ILIKE :keyword OR t.tsk_description ILIKE :keyword)"),
+    ("project_ids", " AND t.tsk_prj_id = ANY(:project_ids)"),
+    ("status_ids", " AND t.tsk_ms_id = ANY(:status_ids)"),
+    ("priority_ids", " AND t.tsk_mp_id = ANY(:priority_ids)"),
+    ("assignee_ids", " AND t.tsk_assignee_u_id = ANY(:assignee_ids)"),
+    ("reporter_ids", " AND t.tsk_reporter_u_id = ANY(:reporter_ids)"),
+    ("type_ids", " AND t.tsk_mtt_id = ANY(:type_ids)"),
+    ("date_from", " AND t.created_at >= :date_from"),
+    ("date_to", " AND t.created_at <= :date_to"),
+)
 
-class TaskRepository(BaseRepository[Task]):
+
+def _search_filters(filters: Dict[str, Any]) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+    """Names of the filters that are set (the statement key) and their parameters"""
+    active = tuple(name for name, _ in SEARCH_FILTERS if filters.get(name))
+    params = {name: filters[name] for name in active}
+    if "keyword" in params:
+        params["keyword"] = f"%{params['keyword']}%"
+    return active, params
+
+
+def _search_conditions(active: Tuple[str, ...]) -> str:
+    return "".join(condition for name, condition in SEARCH_FILTERS if name in active)
+
+
+class TaskRepository(StatementMixin, BaseRepository[Task]):
     def __init__(self):
         super().__init__(Task)
 
@@ -17,7 +44,7 @@ class TaskRepository(BaseRepository[Task]):
         Get tasks with all related data in single query (optimized for performance)
         This eliminates N+1 query problem by using JOINs
         """
-        query = """
+        query = statement_registry.register("task.list", """
             SELECT
                 t.tsk_id, t.tsk_code, t.tsk_title, t.tsk_description,
                 t.tsk_prj_id, t.tsk_ms_id, t.tsk_mp_id, t.tsk_mtt_id,
@@ -42,22 +69,103 @@ class TaskRepository(BaseRepository[Task]):
             LEFT JOIN pt_atams_indonesia.users u_reporter ON t.tsk_reporter_u_id = u_reporter.u_id
             ORDER BY t.created_at DESC
             LIMIT :limit OFFSET :skip
-        """
+        """, prepare=True)
 
         params = {"skip": skip, "limit": limit}
         return self.execute_raw_sql_dict(db, query, params)
 
+    def get_task_version(self, db: Session, tsk_id: int) -> Dict[str, Any]:
+        """
+        Cheap version probe for conditional GET of a single task
+        Returns the row timestamps plus the joined display values (master
+        tables carry no updated_at), all via primary-key lookups
+        """
+        query = statement_registry.register("task.version", """
+            SELECT
+                t.created_at, t.updated_at,
+                p.prj_name, ms.ms_name, mp.mp_name, mp.mp_color, mtt.mtt_name,
+                u_assignee.u_full_name as assignee_name,
+                u_reporter.u_full_name as reporter_name
+            FROM atask.task t
+            LEFT JOIN atask.project p ON t.tsk_prj_id = p.prj_id
+            LEFT JOIN atask.master_status ms ON t.tsk_ms_id = ms.ms_id
+            LEFT JOIN atask.master_priority mp ON t.tsk_mp_id = mp.mp_id
+            LEFT JOIN atask.master_task_type mtt ON t.tsk_mtt_id = mtt.mtt_id
+            LEFT JOIN pt_atams_indonesia.users u_assignee ON t.tsk_assignee_u_id = u_assignee.u_id
+            LEFT JOIN pt_atams_indonesia.users u_reporter ON t.tsk_reporter_u_id = u_reporter.u_id
+            WHERE t.tsk_id = :tsk_id
+        """)
+
+        result = self.execute_raw_sql_dict(db, query, {"tsk_id": tsk_id})
+        return result[0] if result else None
+
+    def get_task_tree(self, db: Session, tsk_id: int, max_depth: int, max_nodes: int):
+        """
+        Task and its subtasks down to max_depth levels, in one query
+        A recursive CTE walks tsk_parent_tsk_id (ix_task_parent_tsk_id) carrying
+        only ids, depth and path; the path also stops it on a parent cycle.
+        Rows come in depth-first order with the joined display values;
+        has_more_children marks nodes at max_depth that have subtasks.
+        At most max_nodes + 1 rows are returned so callers can detect overflow.
+        """
+        query = statement_registry.register("task.tree", """
+            WITH RECURSIVE tree AS (
+                SELECT tsk_id, 0 AS depth, ARRAY[tsk_id] AS path
+                FROM atask.task
+                WHERE tsk_id = :tsk_id
+                UNION ALL
+                SELECT c.tsk_id, tree.depth + 1, tree.path || c.tsk_id
+                FROM tree
+                JOIN atask.task c ON c.tsk_parent_tsk_id = tree.tsk_id
+                WHERE tree.depth < :max_depth
+                  AND c.tsk_id <> ALL(tree.path)
+            )
+            SELECT
+                tree.depth,
+                t.tsk_id, t.tsk_code, t.tsk_title, t.tsk_description,
+                t.tsk_prj_id, t.tsk_ms_id, t.tsk_mp_id, t.tsk_mtt_id,
+                t.tsk_assignee_u_id, t.tsk_reporter_u_id,
+                t.tsk_start_date, t.tsk_due_date, t.tsk_duration,
+                t.tsk_parent_tsk_id, t.tsk_thumbnail,
+                t.created_by, t.created_at, t.updated_by, t.updated_at,
+                -- Joined data
+                p.prj_name as tsk_project_name,
+                ms.ms_code as tsk_status_code,
+                ms.ms_name as tsk_status_name,
+                mp.mp_name as tsk_priority_name,
+                mp.mp_color as tsk_priority_color,
+                mtt.mtt_name as tsk_type_name,
+                u_assignee.u_full_name as tsk_assignee_name,
+                u_reporter.u_full_name as tsk_reporter_name,
+                CASE WHEN tree.depth = :max_depth THEN EXISTS (
+                    SELECT 1 FROM atask.task c WHERE c.tsk_parent_tsk_id = t.tsk_id
+                ) ELSE FALSE END as has_more_children
+            FROM tree
+            JOIN atask.task t ON t.tsk_id = tree.tsk_id
+            LEFT JOIN atask.project p ON t.tsk_prj_id = p.prj_id
+            LEFT JOIN atask.master_status ms ON t.tsk_ms_id = ms.ms_id
+            LEFT JOIN atask.master_priority mp ON t.tsk_mp_id = mp.mp_id
+            LEFT JOIN atask.master_task_type mtt ON t.tsk_mtt_id = mtt.mtt_id
+            LEFT JOIN pt_atams_indonesia.users u_assignee ON t.tsk_assignee_u_id = u_assignee.u_id
+            LEFT JOIN pt_atams_indonesia.users u_reporter ON t.tsk_reporter_u_id = u_reporter.u_id
+            ORDER BY tree.path
+            LIMIT :row_limit
+        """, prepare=True)
+
+        params = {"tsk_id": tsk_id, "max_depth": max_depth, "row_limit": max_nodes + 1}
+        return self.execute_raw_sql_dict(db, query, params)
+
     def get_next_task_number_for_project(self, db: Session, project_id: int, task_type_code: str) -> str:
         """
         Generate next task code for a project
         Format: <PRJ_ID_3DIGIT>/<MTT_CODE_3CHAR>/<COUNT_3DIGIT>
         """
         # Get the count of existing tasks in this project
-        query = """
+        query = statement_registry.register("task.count_by_project", """
             SELECT COUNT(*) as count
             FROM atask.task
             WHERE tsk_prj_id = :project_id
-        """
+        """)
         result = self.execute_raw_sql_dict(db, query, {"project_id": project_id})
         count = result[0]["count"] if result else 0
 
@@ -68,9 +176,39 @@ class TaskRepository(BaseRepository[Task]):
 
         return f"{prj_id_str}/{type_code}/{count_str}"
 
+    def get_user_dashboard(self, db: Session, u_id: int) -> Dict[str, Any]:
+        """
+        Get dashboard counters for a single user
+        The WHERE clause restricts the scan to the user's own rows, so Postgres
+        can combine ix_task_assignee_u_id and ix_task_reporter_u_id (BitmapOr)
+        instead of scanning the whole task table
+        """
+        query = statement_registry.register("task.user_dashboard", """
+            SELECT
+                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id) as assigned_total,
+                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'TODO') as assigned_todo,
+                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'IN_PROGRESS') as assigned_in_progress,
+                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'IN_REVIEW') as assigned_in_review,
+                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'DONE') as assigned_done,
+                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND tsk_due_date < NOW() AND ms.ms_code NOT IN ('DONE', 'CANCELLED')) as assigned_overdue,
+                COUNT(*) FILTER (WHERE tsk_reporter_u_id = :u_id) as reported_total,
+                COUNT(*) FILTER (WHERE tsk_reporter_u_id = :u_id AND ms.ms_code NOT IN ('DONE', 'CANCELLED')) as reported_pending,
+                COUNT(*) FILTER (WHERE tsk_reporter_u_id = :u_id AND ms.ms_code IN ('DONE', 'CANCELLED')) as reported_completed
+            FROM atask.task t
+            LEFT JOIN atask.master_status ms ON t.tsk_ms_id = ms.ms_id
+            WHERE t.tsk_assignee_u_id = :u_id OR t.tsk_reporter_u_id = :u_id
+        """, prepare=True)
+
+        result = self.execute_raw_sql_dict(db, query, {"u_id": u_id})
+        return result[0] if result else {}
+
     def advanced_search(self, db: Session, filters: Dict[str, Any], skip: int = 0, limit: int = 100):
         """Advanced task search with multiple filters and JOINs"""
-        query = """
+        active, params = _search_filters(filters)
+        params.update(skip=skip, limit=limit)
+
+        # One prebuilt statement per combination of filters that are set
+        query = statement_registry.get(("task.advanced_search", active), lambda: """
             SELECT t.*,
                    p.prj_name as project_name,
                    ms.ms_name as status_name,
@@ -82,105 +220,19 @@ class TaskRepository(BaseRepository[Task]):
             LEFT JOIN atask.master_priority mp ON t.tsk_mp_id = mp.mp_id
             LEFT JOIN atask.master_task_type mtt ON t.tsk_mtt_id = mtt.mtt_id
             WHERE 1=1
-        """
-
-        params = {"skip": skip, "limit": limit}
-
-        # Keyword search in title and description
-        if filters.get("keyword"):
-            query += " AND (t.tsk_title ILIKE :keyword OR t.tsk_description ILIKE :keyword)"
-            params["keyword"] = f"%{filters['keyword']}%"
-
-        # Filter by project IDs
-        if filters.get("project_ids"):
-            query += " AND t.tsk_prj_id = ANY(:project_ids)"
-            params["project_ids"] = filters["project_ids"]
-
-        # Filter by status IDs
-        if filters.get("status_ids"):
-            query += " AND t.tsk_ms_id = ANY(:status_ids)"
-            params["status_ids"] = filters["status_ids"]
-
-        # Filter by priority IDs
-        if filters.get("priority_ids"):
-            query += " AND t.tsk_mp_id = ANY(:priority_ids)"
-            params["priority_ids"] = filters["priority_ids"]
-
-        # Filter by assignee IDs
-        if filters.get("assignee_ids"):
-            query += " AND t.tsk_assignee_u_id = ANY(:assignee_ids)"
-            params["assignee_ids"] = filters["assignee_ids"]
-
-        # Filter by reporter IDs
-        if filters.get("reporter_ids"):
-            query += " AND t.tsk_reporter_u_id = ANY(:reporter_ids)"
-            params["reporter_ids"] = filters["reporter_ids"]
-
-        # Filter by task type IDs
-        if filters.get("type_ids"):
-            query += " AND t.tsk_mtt_id = ANY(:type_ids)"
-            params["type_ids"] = filters["type_ids"]
-
-        # Filter by date range (created_at)
-        if filters.get("date_from"):
-            query += " AND t.created_at >= :date_from"
-            params["date_from"] = filters["date_from"]
-
-        if filters.get("date_to"):
-            query += " AND t.created_at <= :date_to"
-            params["date_to"] = filters["date_to"]
-
-        # Order by created_at descending
-        query += " ORDER BY t.created_at DESC LIMIT :limit OFFSET :skip"
+        """ + _search_conditions(active) + " ORDER BY t.created_at DESC LIMIT :limit OFFSET :skip", prepare=True)
 
         return self.execute_raw_sql_dict(db, query, params)
 
     def count_advanced_search(self, db: Session, filters: Dict[str, Any]) -> int:
-        """Count results for advanced search"""
-        query = """
+        """Count results for advanced search (same filters as advanced_search)"""
+        active, params = _search_filters(filters)
+
+        query = statement_registry.get(("task.count_advanced_search", active), lambda: """
             SELECT COUNT(*) as count
             FROM atask.task t
             WHERE 1=1
-        """
-
-        params = {}
-
-        # Apply same filters as advanced_search
-        if filters.get("keyword"):
-            query += " AND (t.tsk_title ILIKE :keyword OR t.tsk_description ILIKE :keyword)"
-            params["keyword"] = f"%{filters['keyword']}%"
-
-        if filters.get("project_ids"):
-            query += " AND t.tsk_prj_id = ANY(:project_ids)"
-            params["project_ids"] = filters["project_ids"]
-
-        if filters.get("status_ids"):
-            query += " AND t.tsk_ms_id = ANY(:status_ids)"
-            params["status_ids"] = filters["status_ids"]
-
-        if filters.get("priority_ids"):
-            query += " AND t.tsk_mp_id = ANY(:priority_ids)"
-            params["priority_ids"] = filters["priority_ids"]
-
-        if filters.get("assignee_ids"):
-            query += " AND t.tsk_assignee_u_id = ANY(:assignee_ids)"
-            params["assignee_ids"] = filters["assignee_ids"]
-
-        if filters.get("reporter_ids"):
-            query += " AND t.tsk_reporter_u_id = ANY(:reporter_ids)"
-            params["reporter_ids"] = filters["reporter_ids"]
-
-        if filters.get("type_ids"):
-            query += " AND t.tsk_mtt_id = ANY(:type_ids)"
-            params["type_ids"] = filters["type_ids"]
-
-        if filters.get("date_from"):
-            query += " AND t.created_at >= :date_from"
-            params["date_from"] = filters["date_from"]
-
-        if filters.get("date_to"):
-            query += " AND t.created_at <= :date_to"
-            params["date_to"] = filters["date_to"]
+        """ + _search_conditions(active), prepare=True)
 
         result = self.execute_raw_sql_dict(db, query, params)
         return result[0]["count"] if result else 0
@@ -6,9 +6,10 @@ from sqlalchemy.orm import Session
 
 from atams.db import BaseRepository
 from app.models.task_watcher import TaskWatcher
+from app.repositories.statements import StatementMixin, statement_registry
 
 
-class TaskWatcherRepository(BaseRepository[TaskWatcher]):
+class TaskWatcherRepository(StatementMixin, BaseRepository[TaskWatcher]):
     def __init__(self):
         super().__init__(TaskWatcher)
 
@@ -21,7 +22,8 @@ class TaskWatcherRepository(BaseRepository[TaskWatcher]):
         status_id: Optional[int] = None
     ):
         """Get tasks watched by specific user with JOIN"""
-        query = """
+        by_status = bool(status_id)
+        query = statement_registry.get(("task_watcher.watched_tasks", by_status), lambda: """
             SELECT t.*, tw.created_at as watched_at,
                    ms.ms_name as status_name,
                    mp.mp_name as priority_name,
@@ -34,16 +36,13 @@ class TaskWatcherRepository(BaseRepository[TaskWatcher]):
             LEFT JOIN atask.project p ON t.tsk_prj_id = p.prj_id
             LEFT JOIN atask.master_task_type mtt ON t.tsk_mtt_id = mtt.mtt_id
             WHERE tw.tw_u_id = :u_id
-        """
+        """ + (" AND t.tsk_ms_id = :status_id" if by_status else "")
+          + " ORDER BY tw.created_at DESC LIMIT :limit OFFSET :skip")
 
         params = {"u_id": u_id, "skip": skip, "limit": limit}
-
-        if status_id:
-            query += " AND t.tsk_ms_id = :status_id"
+        if by_status:
             params["status_id"] = status_id
 
-        query += " ORDER BY tw.created_at DESC LIMIT :limit OFFSET :skip"
-
         return self.execute_raw_sql_dict(db, query, params)
 
     def count_watched_tasks_by_user(
@@ -53,17 +52,16 @@ class TaskWatcherRepository(BaseRepository[TaskWatcher]):
         status_id: Optional[int] = None
     ) -> int:
         """Count watched tasks by user"""
-        query = """
+        by_status = bool(status_id)
+        query = statement_registry.get(("task_watcher.count_watched_tasks", by_status), lambda: """
             SELECT COUNT(*) as count
             FROM atask.task_watcher tw
             JOIN atask.task t ON tw.tw_tsk_id = t.tsk_id
             WHERE tw.tw_u_id = :u_id
-        """
+        """ + (" AND t.tsk_ms_id = :status_id" if by_status else ""))
 
         params = {"u_id": u_id}
-
-        if status_id:
-            query += " AND t.tsk_ms_id = :status_id"
+        if by_status:
             params["status_id"] = status_id
 
         result = self.execute_raw_sql_dict(db, query, params)
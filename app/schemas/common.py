@@ -1,10 +1,19 @@
 """
 Common Response Schemas
 """
+import re
 from pydantic import BaseModel
-from typing import Generic, TypeVar, Optional, List
+from typing import Any, Dict, Generic, TypeVar, Optional, List, Tuple, Type
 
 T = TypeVar("T")
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# "+07" style offsets returned by PostgreSQL need ":00" to parse as ISO 8601
+_TZ_HOUR_OFFSET = re.compile(r'([+-]\d{2})$')
+
+_MISSING = object()
+_object_setattr = object.__setattr__
+_projection_specs: Dict[type, Tuple[Tuple[str, ...], Dict[str, Any]]] = {}
 
 
 class ResponseBase(BaseModel):
@@ -22,3 +31,66 @@ class PaginationResponse(ResponseBase, Generic[T]):
     page: int
     size: int
     pages: int
+
+
+def normalize_datetime(v: Any) -> Any:
+    """Shared body of the schemas' fix_datetime_timezone validators"""
+    if v == '' or v is None:
+        return None
+    if isinstance(v, str) and _TZ_HOUR_OFFSET.search(v):
+        v = v + ':00'
+    return v
+
+
+def _projection_spec(model_cls: Type[BaseModel]) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+    """Field names and static defaults of a response model (computed once per class)"""
+    spec = _projection_specs.get(model_cls)
+    if spec is None:
+        fields = model_cls.model_fields
+        defaults = {
+            name: field.default
+            for name, field in fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+        spec = (tuple(fields), defaults)
+        _projection_specs[model_cls] = spec
+    return spec
+
+
+def construct_model(model_cls: Type[ModelT], db_obj: Any, **extra: Any) -> ModelT:
+    """
+    Build a response model from a trusted ORM instance without validation
+
+    Column attributes declared on model_cls are read straight off db_obj,
+    extra keyword arguments add/override fields (e.g. joined names).
+    Values must already have the field's type - use model_validate for
+    anything user supplied, and for dict rows from execute_raw_sql_dict
+    (a single model_validate on a dict is already cheaper than any
+    Python-side construction).
+
+    Same result as model_construct, minus its per-call field/alias/default
+    bookkeeping. Only for plain response schemas: no private attributes,
+    extra fields or default factories.
+
+    Example:
+        task = construct_model(Task, db_task, tsk_project_name="Atask")
+    """
+    names, defaults = _projection_spec(model_cls)
+    values = {}
+    fields_set = set()
+    # Keep declaration order: the serializer emits keys in __dict__ order
+    for name in names:
+        value = extra[name] if name in extra else getattr(db_obj, name, _MISSING)
+        if value is _MISSING:
+            if name in defaults:
+                values[name] = defaults[name]
+            continue
+        values[name] = value
+        fields_set.add(name)
+
+    obj = model_cls.__new__(model_cls)
+    _object_setattr(obj, "__dict__", values)
+    _object_setattr(obj, "__pydantic_fields_set__", fields_set)
+    _object_setattr(obj, "__pydantic_extra__", None)
+    _object_setattr(obj, "__pydantic_private__", None)
+    return obj
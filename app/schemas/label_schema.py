@@ -5,6 +5,8 @@ from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, field_validator
 
+from app.schemas.common import normalize_datetime
+
 
 class LabelBase(BaseModel):
     lbl_name: str
@@ -34,15 +36,7 @@ class LabelInDB(LabelBase):
     @field_validator('created_at', 'updated_at', mode='before')
     @classmethod
     def fix_datetime_timezone(cls, v):
-        if v == '' or v is None:
-            return None
-        if isinstance(v, str):
-            import re
-            pattern = r'([+-]\d{2})$'
-            match = re.search(pattern, v)
-            if match:
-                v = v + ':00'
-        return v
+        return normalize_datetime(v)
 
 
 class Label(LabelInDB):
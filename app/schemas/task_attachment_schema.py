@@ -1,10 +1,12 @@
 """
 Task Attachment Schema
 """
-from typing import Optional
+from typing import Any, Dict, Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, field_validator
 
+from app.schemas.common import normalize_datetime
+
 
 class TaskAttachmentBase(BaseModel):
     ta_tsk_id: int
@@ -45,16 +47,39 @@ class TaskAttachmentInDB(TaskAttachmentBase):
     @field_validator('created_at', 'updated_at', mode='before')
     @classmethod
     def fix_datetime_timezone(cls, v):
-        if v == '' or v is None:
-            return None
-        if isinstance(v, str):
-            import re
-            pattern = r'([+-]\d{2})$'
-            match = re.search(pattern, v)
-            if match:
-                v = v + ':00'
-        return v
+        return normalize_datetime(v)
 
 
 class TaskAttachment(TaskAttachmentInDB):
     ta_file_url: Optional[str] = None  # Public URL for file access
+
+
+class TaskAttachmentUploadRequest(BaseModel):
+    """File info declared by the client to scope a direct upload signature"""
+    file_name: str
+    content_type: str
+    file_size: Optional[int] = None
+
+
+class TaskAttachmentUploadSignature(BaseModel):
+    """
+    Signed parameters for a direct client -> Cloudinary upload
+
+    The client POSTs the file as multipart/form-data to upload_url with
+    api_key, timestamp, signature and every entry of params unchanged.
+    """
+    upload_url: str
+    api_key: str
+    cloud_name: str
+    resource_type: str
+    timestamp: int
+    signature: str
+    expires_at: int
+    params: Dict[str, Any]
+
+
+class TaskAttachmentUploadConfirm(BaseModel):
+    """Cloudinary upload result sent back by the client after a direct upload"""
+    public_id: str
+    resource_type: str
+    file_name: str
@@ -1,11 +1,13 @@
 """
 Task Schema
 """
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel, ConfigDict, field_validator
 
+from app.schemas.common import normalize_datetime
+
 
 class TaskBase(BaseModel):
     tsk_code: str
@@ -68,15 +70,7 @@ class TaskInDB(TaskBase):
     @field_validator('tsk_start_date', 'tsk_due_date', 'created_at', 'updated_at', mode='before')
     @classmethod
     def fix_datetime_timezone(cls, v):
-        if v == '' or v is None:
-            return None
-        if isinstance(v, str):
-            import re
-            pattern = r'([+-]\d{2})$'
-            match = re.search(pattern, v)
-            if match:
-                v = v + ':00'
-        return v
+        return normalize_datetime(v)
 
 
 class Task(TaskInDB):
@@ -88,4 +82,21 @@ class Task(TaskInDB):
     tsk_type_name: Optional[str] = None
     tsk_assignee_name: Optional[str] = None
     tsk_reporter_name: Optional[str] = None
-    tsk_thumbnail_url: Optional[str] = None
\ No newline at end of file
+    tsk_thumbnail_url: Optional[str] = None
+    tsk_thumbnail_srcset: Optional[str] = None
+
+
+class TaskTreeRollup(BaseModel):
+    """Totals over a task and its subtasks (down to the requested depth)"""
+    total_tasks: int
+    by_status: Dict[str, int]  # status code -> count
+    total_duration: Decimal  # hours, tasks without a duration count as 0
+    earliest_start_date: Optional[datetime] = None
+    latest_due_date: Optional[datetime] = None
+
+
+class TaskTreeNode(Task):
+    depth: int  # 0 for the requested task
+    has_more_children: bool = False  # subtasks exist below the depth limit
+    rollup: TaskTreeRollup
+    children: List["TaskTreeNode"] = []
@@ -0,0 +1,373 @@
+"""
+Attachment Download Service
+Streams attachment files from Cloudinary through the API without buffering them
+"""
+import asyncio
+import io
+import os
+import zipfile
+from typing import AsyncIterator, List, Mapping, Optional
+from urllib.parse import quote
+
+import httpx
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from app.core.config import settings
+from app.core.container import container
+from app.core.download_cache import CacheWriter, CachedFile, get_download_cache
+from app.core.etag import etag_matches
+from app.core.http_client import get_http_client
+from app.schemas.task_attachment_schema import TaskAttachment
+from app.services.task_attachment_service import TaskAttachmentService
+from atams.exceptions import NotFoundException, ServiceUnavailableException
+
+
+# Conditional / partial request headers forwarded to Cloudinary
+FORWARDED_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+
+# Upstream headers describing the (partial) body, relayed to the client
+FORWARDED_RESPONSE_HEADERS = (
+    "content-length", "content-range", "content-encoding",
+    "accept-ranges", "etag", "last-modified",
+)
+
+# Upstream statuses relayed as-is (full, partial, not modified, bad range)
+PASSTHROUGH_STATUSES = {200, 206, 304, 416}
+
+# Already compressed formats, stored as-is in archives (deflate gains nothing)
+STORED_CONTENT_TYPES = ("application/pdf", "image/")
+
+# Marks the end of one attachment's chunks in its prefetch queue
+_END_OF_FILE = object()
+
+
+def content_disposition(file_name: str, disposition: str = "attachment") -> str:
+    """
+    Build a Content-Disposition header value (RFC 6266)
+
+    Non-ASCII names are sent as RFC 5987 filename* with an ASCII
+    filename fallback for old clients.
+    """
+    printable = "".join(ch for ch in file_name if ch.isprintable())
+    fallback = printable.encode("ascii", "ignore").decode("ascii")
+    fallback = fallback.replace("\\", "_").replace('"', "_").strip() or "download"
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(printable, safe='')}"
+
+
+async def _iter_upstream(
+    upstream: httpx.Response,
+    chunk_size: int,
+    cache_writer: Optional[CacheWriter] = None
+) -> AsyncIterator[bytes]:
+    """
+    Relay upstream bytes in fixed-size chunks, releasing the connection when done
+
+    With a cache_writer every chunk is also teed to disk; the cache entry is
+    only published if the whole body went through.
+    """
+    completed = False
+    try:
+        async for chunk in upstream.aiter_raw(chunk_size):
+            if cache_writer is not None:
+                try:
+                    cache_writer.write(chunk)
+                except OSError:
+                    cache_writer.abort()
+                    cache_writer = None
+            yield chunk
+        completed = True
+    finally:
+        await upstream.aclose()
+        if cache_writer is not None:
+            if completed:
+                cache_writer.commit(
+                    etag=upstream.headers.get("etag"),
+                    last_modified=upstream.headers.get("last-modified")
+                )
+            else:
+                cache_writer.abort()
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink for zipfile: collects written bytes until drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_names(attachments: List[TaskAttachment]) -> List[str]:
+    """Flat, unique entry names: "spec.pdf", "spec (2).pdf", ..."""
+    names = []
+    used = set()
+    for attachment in attachments:
+        name = os.path.basename(attachment.ta_file_name.replace("\\", "/")) or f"attachment-{attachment.ta_id}"
+        stem, ext = os.path.splitext(name)
+        candidate = name
+        counter = 2
+        while candidate.lower() in used:
+            candidate = f"{stem} ({counter}){ext}"
+            counter += 1
+        used.add(candidate.lower())
+        names.append(candidate)
+    return names
+
+
+def _zip_info(name: str, attachment: TaskAttachment) -> zipfile.ZipInfo:
+    """Entry header: upload time as mtime, store mode for compressed formats"""
+    created_at = attachment.created_at
+    date_time = created_at.timetuple()[:6] if created_at and created_at.year >= 1980 else (1980, 1, 1, 0, 0, 0)
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    file_type = (attachment.ta_file_type or "").lower()
+    if file_type.startswith(STORED_CONTENT_TYPES):
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+class AttachmentDownloadService:
+    """Proxy attachment downloads (Range / If-None-Match aware)"""
+
+    def __init__(self):
+        self.attachment_service = container.get(TaskAttachmentService)
+
+    async def download(
+        self,
+        db: Session,
+        tsk_id: int,
+        ta_id: int,
+        current_user_role_level: int,
+        request_headers: Mapping[str, str]
+    ) -> Response:
+        """
+        Stream an attachment of a task from Cloudinary
+
+        Range and conditional headers are forwarded, so resumable downloads
+        (206) and cache revalidation (304) are answered by Cloudinary and
+        relayed unchanged. At most one chunk is held in memory.
+
+        Complete downloads are kept in the local download cache; hits are
+        served from disk with FileResponse (sendfile, Range support).
+
+        Args:
+            db: Database session
+            tsk_id: Task ID the attachment must belong to
+            ta_id: Attachment ID
+            current_user_role_level: Current user's role level
+            request_headers: Incoming request headers
+
+        Returns:
+            StreamingResponse (200/206) or empty Response (304/416)
+
+        Raises:
+            ForbiddenException: If user lacks permission
+            NotFoundException: If attachment (or stored file) not found
+            ServiceUnavailableException: If Cloudinary cannot be reached or fails
+        """
+        attachment, url = self.attachment_service.get_download_url(
+            db,
+            ta_id,
+            current_user_role_level=current_user_role_level
+        )
+        if attachment.ta_tsk_id != tsk_id:
+            raise NotFoundException(f"Task attachment with ID {ta_id} not found")
+
+        cache = get_download_cache()
+        if cache is not None:
+            cached = cache.get(attachment.ta_file_path)
+            if cached is not None:
+                return self._cached_response(attachment, cached, request_headers)
+
+        headers = {
+            name: request_headers[name]
+            for name in FORWARDED_REQUEST_HEADERS
+            if name in request_headers
+        }
+        # Byte ranges and Content-Length must refer to the stored bytes
+        headers["accept-encoding"] = "identity"
+
+        client = get_http_client()
+        try:
+            upstream = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+        except httpx.HTTPError as e:
+            raise ServiceUnavailableException(f"Failed to fetch attachment from storage: {str(e)}")
+
+        if upstream.status_code not in PASSTHROUGH_STATUSES:
+            await upstream.aclose()
+            if upstream.status_code == 404:
+                raise NotFoundException(f"File of task attachment {ta_id} not found in storage")
+            raise ServiceUnavailableException(
+                f"Storage returned HTTP {upstream.status_code} for task attachment {ta_id}"
+            )
+
+        response_headers = {
+            name: upstream.headers[name]
+            for name in FORWARDED_RESPONSE_HEADERS
+            if name in upstream.headers
+        }
+        response_headers["content-disposition"] = content_disposition(attachment.ta_file_name)
+        # Authenticated content: never cache in shared caches, revalidate via ETag
+        response_headers["cache-control"] = "private, no-cache"
+
+        if upstream.status_code in (304, 416):
+            await upstream.aclose()
+            return Response(status_code=upstream.status_code, headers=response_headers)
+
+        # Only complete, unencoded bodies can be served from disk later
+        cache_writer = None
+        if (
+            cache is not None
+            and upstream.status_code == 200
+            and "content-encoding" not in upstream.headers
+        ):
+            content_length = upstream.headers.get("content-length")
+            cache_writer = cache.open_writer(
+                attachment.ta_file_path,
+                expected_size=int(content_length) if content_length and content_length.isdigit() else None
+            )
+
+        return StreamingResponse(
+            _iter_upstream(upstream, settings.DOWNLOAD_CHUNK_SIZE, cache_writer),
+            status_code=upstream.status_code,
+            headers=response_headers,
+            media_type=attachment.ta_file_type or upstream.headers.get("content-type"),
+            background=BackgroundTask(upstream.aclose)
+        )
+
+    def archive(
+        self,
+        db: Session,
+        tsk_id: int,
+        current_user_role_level: int
+    ) -> StreamingResponse:
+        """
+        Stream a ZIP of all attachments of a task
+
+        Attachments are fetched concurrently (ARCHIVE_CONCURRENCY) into
+        small bounded queues (ARCHIVE_PREFETCH_CHUNKS chunks each) and
+        written to the archive in order as their bytes arrive, so memory
+        stays bounded regardless of archive size. Files that cannot be
+        fetched are listed in ERRORS.txt inside the archive, since the
+        response status is already sent by then.
+
+        Raises:
+            ForbiddenException: If user lacks permission
+            NotFoundException: If task not found
+        """
+        attachments = self.attachment_service.get_attachments_by_task_id(
+            db,
+            task_id=tsk_id,
+            current_user_role_level=current_user_role_level
+        )
+        if not attachments and not self.attachment_service.task_repository.get(db, tsk_id):
+            raise NotFoundException(f"Task with ID {tsk_id} not found")
+
+        return StreamingResponse(
+            self._stream_archive(attachments),
+            media_type="application/zip",
+            headers={
+                "content-disposition": content_disposition(f"task-{tsk_id}-attachments.zip"),
+                "cache-control": "private, no-store",
+            }
+        )
+
+    async def _prefetch(self, url: str, queue: asyncio.Queue, semaphore: asyncio.Semaphore) -> None:
+        """Download one attachment into its queue (chunks, then _END_OF_FILE or the error)"""
+        try:
+            async with semaphore:
+                client = get_http_client()
+                async with client.stream("GET", url, headers={"accept-encoding": "identity"}) as upstream:
+                    if upstream.status_code != 200:
+                        raise ServiceUnavailableException(f"Storage returned HTTP {upstream.status_code}")
+                    async for chunk in upstream.aiter_raw(settings.DOWNLOAD_CHUNK_SIZE):
+                        await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_END_OF_FILE)
+
+    async def _stream_archive(self, attachments: List[TaskAttachment]) -> AsyncIterator[bytes]:
+        """Write the ZIP to an unseekable sink (data descriptors) and yield it as it grows"""
+        semaphore = asyncio.Semaphore(settings.ARCHIVE_CONCURRENCY)
+        queues = [asyncio.Queue(maxsize=settings.ARCHIVE_PREFETCH_CHUNKS) for _ in attachments]
+        # Tasks acquire the semaphore in order, so the entry being written always
+        # holds a slot while later ones wait on their full queues
+        tasks = [
+            asyncio.create_task(self._prefetch(attachment.ta_file_url, queue, semaphore))
+            for attachment, queue in zip(attachments, queues)
+        ]
+        errors = []
+        sink = _ZipSink()
+        try:
+            with zipfile.ZipFile(sink, mode="w") as archive:
+                for attachment, name, queue in zip(attachments, _archive_names(attachments), queues):
+                    item = await queue.get()
+                    if isinstance(item, Exception):
+                        errors.append(f"{name}: not included ({str(item)})")
+                        continue
+
+                    with archive.open(_zip_info(name, attachment), mode="w") as entry:
+                        while item is not _END_OF_FILE:
+                            if isinstance(item, Exception):
+                                errors.append(f"{name}: incomplete ({str(item)})")
+                                break
+                            entry.write(item)
+                            data = sink.drain()
+                            if data:
+                                yield data
+                            item = await queue.get()
+
+                    yield sink.drain()
+
+                if errors:
+                    archive.writestr("ERRORS.txt", "\n".join(errors) + "\n")
+            # Central directory is written on close
+            yield sink.drain()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _cached_response(
+        self,
+        attachment,
+        cached: CachedFile,
+        request_headers: Mapping[str, str]
+    ) -> Response:
+        """Serve a cache hit: 304 on matching If-None-Match, else the file from disk"""
+        headers = {
+            "content-disposition": content_disposition(attachment.ta_file_name),
+            "cache-control": "private, no-cache",
+        }
+        if cached.etag:
+            headers["etag"] = cached.etag
+        if cached.last_modified:
+            headers["last-modified"] = cached.last_modified
+
+        if etag_matches(request_headers.get("if-none-match"), cached.etag):
+            cached.release()
+            return Response(status_code=304, headers=headers)
+
+        # FileResponse handles Range/If-Range itself and uses sendfile where available;
+        # it reads the pinned link, which eviction by another worker does not remove
+        return FileResponse(
+            cached.path,
+            headers=headers,
+            media_type=attachment.ta_file_type or "application/octet-stream",
+            background=BackgroundTask(cached.release)
+        )
@@ -5,11 +5,21 @@ Handles file upload, deletion, and URL generation for Cloudinary storage
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
-from typing import Dict, Optional
+import cloudinary.exceptions
+import cloudinary.utils
+import hashlib
+import hmac
+import re
+import secrets
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 from fastapi import UploadFile
 import os
 
 from app.core.config import settings
+from app.core.metrics import CLOUDINARY_DURATION, CLOUDINARY_ERRORS, track
 from atams.exceptions import BadRequestException
 
 
@@ -23,6 +33,69 @@ MAX_DOCUMENT_SIZE = 10 * 1024 * 1024  # 10 MB in bytes
 ALLOWED_IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg"]
 ALLOWED_DOCUMENT_EXTENSIONS = [".pdf"]
 
+# Image formats as reported by Cloudinary for direct uploads (-> stored content type)
+ALLOWED_IMAGE_FORMATS = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
+
+# Tag of direct uploads that have not been confirmed yet (removed on confirm)
+PENDING_UPLOAD_TAG = "atask_pending_upload"
+
+# Tolerated clock difference between this server and Cloudinary, in seconds
+UPLOAD_CLOCK_SKEW = 60
+
+# Thumbnail derivatives: square crop, Cloudinary picks the quality per image
+THUMBNAIL_TRANSFORMATION = {"crop": "fill", "quality": "auto"}
+
+# Public IDs that Cloudinary delivers verbatim (no escaping, no version/URL detection)
+_PLAIN_PUBLIC_ID = re.compile(r"^(?!v\d+/)[A-Za-z0-9_\-./]+$")
+_URL_PROBE_PUBLIC_ID = "probe/public_id"
+
+
+@lru_cache(maxsize=8192)
+def _build_cloudinary_url(public_id: str, resource_type: str, transformation: Optional[tuple]) -> str:
+    """
+    Build a delivery URL with the Cloudinary SDK (memoized)
+
+    transformation is the frozen form of the transformation dict
+    (sorted item tuple) so it can be part of the cache key.
+    """
+    if resource_type == "raw":
+        # For raw files (documents, etc), use raw delivery
+        return cloudinary.CloudinaryResource(public_id, resource_type="raw").url
+
+    # For images/videos, apply transformation if provided
+    return cloudinary.CloudinaryImage(public_id).build_url(
+        transformation=dict(transformation) if transformation else None,
+        secure=True
+    )
+
+
+def _plain_delivery_prefix(resource_type: str) -> Optional[str]:
+    """
+    Derive "https://res.cloudinary.com/<cloud>/<type>/upload/" from the SDK
+
+    Returns None when the SDK output does not follow the plain pattern
+    (private CDN, CNAME, URL suffix, signed URLs, ...), which disables
+    the string fast path for that resource type.
+    """
+    probe_url = _build_cloudinary_url(_URL_PROBE_PUBLIC_ID, resource_type, None)
+    suffix = "v1/" + _URL_PROBE_PUBLIC_ID
+    if not probe_url.endswith(suffix):
+        return None
+    prefix = probe_url[:-len(suffix)]
+    if _build_cloudinary_url("probe", resource_type, None) != prefix + "probe":
+        return None
+    return prefix
+
+
+def _parse_created_at(value: Optional[str]) -> Optional[float]:
+    """Cloudinary's created_at ("2025-01-01T12:00:00Z") as epoch seconds"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
 
 class CloudinaryService:
     """Service for handling Cloudinary operations"""
@@ -45,6 +118,11 @@ class CloudinaryService:
             api_secret=settings.CLOUDINARY_API_SECRET,
             secure=True
         )
+        # Plain delivery URL prefix per resource type, see get_file_url
+        self._url_prefixes = {
+            resource_type: _plain_delivery_prefix(resource_type)
+            for resource_type in ("image", "raw")
+        }
 
     def validate_file(self, file: UploadFile) -> tuple[str, str]:
         """
@@ -62,8 +140,26 @@ class CloudinaryService:
         if not file.filename:
             raise BadRequestException("No file provided")
 
+        return self.validate_file_info(file.filename, file.content_type)
+
+    def validate_file_info(self, filename: str, content_type: Optional[str]) -> tuple[str, str]:
+        """
+        Validate file type from its name and content type
+
+        Shared by multipart uploads and direct upload signatures.
+
+        Args:
+            filename: Original file name
+            content_type: Declared content type
+
+        Returns:
+            tuple: (resource_type, file_category) where file_category is 'image' or 'document'
+
+        Raises:
+            BadRequestException: If file type is not allowed
+        """
         # Get file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
+        file_extension = os.path.splitext(filename)[1].lower()
 
         # Determine file category and validate extension
         is_image = file_extension in ALLOWED_IMAGE_EXTENSIONS
@@ -76,7 +172,7 @@ class CloudinaryService:
             )
 
         # Validate content type
-        content_type = file.content_type or ""
+        content_type = content_type or ""
 
         if is_image:
             if content_type not in ALLOWED_IMAGE_TYPES:
@@ -111,13 +207,24 @@ class CloudinaryService:
         Raises:
             BadRequestException: If file size exceeds limit
         """
-        # Read file content to check size
-        file_content = await file.read()
-        file_size = len(file_content)
+        # Use the size Starlette recorded while spooling the upload,
+        # or measure the spooled file without reading it into memory
+        file_size = file.size
+        if file_size is None:
+            file.file.seek(0, os.SEEK_END)
+            file_size = file.file.tell()
+            await file.seek(0)
+
+        self.check_file_size(file_size, file_category)
+        return file_size
 
-        # Reset file position for later reading
-        await file.seek(0)
+    def check_file_size(self, file_size: int, file_category: str) -> None:
+        """
+        Check file size against the limit of its category
 
+        Raises:
+            BadRequestException: If file size exceeds limit
+        """
         # Check size limits
         if file_category == "image":
             max_size = MAX_IMAGE_SIZE
@@ -133,14 +240,13 @@ class CloudinaryService:
                 f"Current file size: {current_size_mb:.2f}MB"
             )
 
-        return file_size
-
     async def upload_file(
         self,
         file: UploadFile,
         folder: Optional[str] = None,
         public_id: Optional[str] = None,
-        resource_type: str = "auto"
+        resource_type: str = "auto",
+        eager: Optional[List[Dict]] = None
     ) -> Dict:
         """
         Upload file to Cloudinary with validation
@@ -150,6 +256,8 @@ class CloudinaryService:
             folder: Folder path in Cloudinary (default: settings.CLOUDINARY_FOLDER)
             public_id: Custom public ID (optional)
             resource_type: Type of file (image, video, raw, auto)
+            eager: Transformations to generate right after upload (optional),
+                processed asynchronously so the upload is not slowed down
 
         Returns:
             Dict containing upload result with keys:
@@ -186,11 +294,16 @@ class CloudinaryService:
             if public_id:
                 upload_options["public_id"] = public_id
 
+            if eager:
+                upload_options["eager"] = eager
+                upload_options["eager_async"] = True
+
             # Upload to Cloudinary
-            result = cloudinary.uploader.upload(
-                file_content,
-                **upload_options
-            )
+            with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "upload"):
+                result = cloudinary.uploader.upload(
+                    file_content,
+                    **upload_options
+                )
 
             return {
                 "public_id": result.get("public_id"),
@@ -222,10 +335,11 @@ class CloudinaryService:
             Dict containing deletion result
         """
         try:
-            result = cloudinary.uploader.destroy(
-                public_id,
-                resource_type=resource_type
-            )
+            with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "destroy"):
+                result = cloudinary.uploader.destroy(
+                    public_id,
+                    resource_type=resource_type
+                )
             return result
         except Exception as e:
             raise BadRequestException(f"Failed to delete file from Cloudinary: {str(e)}")
@@ -247,23 +361,236 @@ class CloudinaryService:
         Returns:
             Secure URL to the file
         """
+        # Fast path: untransformed delivery URL of a plain public_id is pure string
+        # concatenation ("v1/" is Cloudinary's default version for foldered IDs)
+        if not transformation or resource_type == "raw":
+            prefix = self._url_prefixes.get(resource_type)
+            if prefix and _PLAIN_PUBLIC_ID.match(public_id):
+                return prefix + ("v1/" + public_id if "/" in public_id else public_id)
+
         try:
-            if resource_type == "raw":
-                # For raw files (documents, etc), use raw delivery
-                url = cloudinary.CloudinaryResource(
-                    public_id,
-                    resource_type="raw"
-                ).url
+            if not transformation or resource_type == "raw":
+                return _build_cloudinary_url(public_id, resource_type, None)
+
+            frozen = tuple(sorted(transformation.items()))
+            try:
+                hash(frozen)
+            except TypeError:
+                # Nested transformation values (lists/dicts) can't be cache keys
+                return _build_cloudinary_url.__wrapped__(public_id, resource_type, frozen)
+            return _build_cloudinary_url(public_id, resource_type, frozen)
+        except Exception as e:
+            raise BadRequestException(f"Failed to generate file URL: {str(e)}")
+
+    @staticmethod
+    def _upload_token_mac(folder: str, token: str) -> str:
+        key = (settings.CLOUDINARY_API_SECRET or "").encode("utf-8")
+        return hmac.new(key, f"{folder}/{token}".encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+    def upload_issued_at(self, public_id: str, folder: str) -> Optional[int]:
+        """
+        Issue time of a public_id made by generate_upload_signature for folder
+
+        Returns None for public_ids this server did not sign for the folder.
+        """
+        name = public_id
+        if "/" in public_id:
+            # Fixed folder mode: Cloudinary prefixes the public_id with the folder
+            if not public_id.startswith(f"{folder}/"):
+                return None
+            name = public_id[len(folder) + 1:]
+        name = os.path.splitext(name)[0]  # raw public_ids keep the extension
+
+        parts = name.split("-")
+        if len(parts) != 3 or not parts[0].isdigit():
+            return None
+        timestamp, nonce, mac = parts
+        if not hmac.compare_digest(mac, self._upload_token_mac(folder, f"{timestamp}-{nonce}")):
+            return None
+        return int(timestamp)
+
+    def generate_upload_signature(self, folder: str, resource_type: str, extension: str = "") -> Dict[str, Any]:
+        """
+        Sign a direct client -> Cloudinary upload of one file into a folder
+
+        Only the signed params are accepted by Cloudinary, so the client
+        cannot change the target folder, the server-generated public_id (or,
+        for images, the formats). overwrite=false keeps the signature from
+        replacing the file once uploaded, and the pending tag lets
+        cleanup_unconfirmed find uploads that are never confirmed.
+
+        Args:
+            folder: Folder the upload must land in
+            resource_type: image or raw (see validate_file_info)
+            extension: File extension kept in raw public_ids (e.g. ".pdf")
+
+        Returns:
+            Dict matching TaskAttachmentUploadSignature
+        """
+        timestamp = int(time.time())
+        token = f"{timestamp}-{secrets.token_hex(8)}"
+        public_id = f"{token}-{self._upload_token_mac(folder, token)}"
+        if resource_type == "raw":
+            public_id += extension
+
+        params: Dict[str, Any] = {
+            "folder": folder,
+            "public_id": public_id,
+            "overwrite": "false",
+            "tags": PENDING_UPLOAD_TAG,
+        }
+        if resource_type == "image":
+            params["allowed_formats"] = ",".join(ALLOWED_IMAGE_FORMATS)
+
+        signed = cloudinary.utils.sign_request({**params, "timestamp": timestamp}, {})
+
+        return {
+            "upload_url": cloudinary.utils.cloudinary_api_url("upload", resource_type=resource_type),
+            "api_key": signed["api_key"],
+            "cloud_name": cloudinary.config().cloud_name,
+            "resource_type": resource_type,
+            "timestamp": timestamp,
+            "signature": signed["signature"],
+            "expires_at": timestamp + settings.UPLOAD_SIGNATURE_MAX_AGE,
+            "params": params,
+        }
+
+    def verify_direct_upload(self, public_id: str, resource_type: str, folder: str, issued_at: int) -> Dict[str, Any]:
+        """
+        Verify a direct upload against the storage metadata
+
+        Applies the same rules as validate_file/validate_file_size, using
+        what Cloudinary actually stored instead of client-declared values.
+        Cloudinary accepts a signature for an hour, so uploads made later
+        than UPLOAD_SIGNATURE_MAX_AGE after issued_at are rejected here.
+        Uploads inside the folder that fail validation are deleted.
+
+        Args:
+            public_id: Public ID returned by Cloudinary to the client
+            resource_type: image or raw
+            folder: Folder the upload signature was scoped to
+            issued_at: Signature timestamp (see upload_issued_at)
+
+        Returns:
+            Dict with bytes and content_type of the stored file
+
+        Raises:
+            BadRequestException: If the upload is missing, outside the folder or invalid
+        """
+        if resource_type not in ("image", "raw"):
+            raise BadRequestException(f"Invalid resource type: {resource_type}")
+
+        try:
+            with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "resource"):
+                resource = cloudinary.api.resource(public_id, resource_type=resource_type)
+        except cloudinary.exceptions.NotFound:
+            raise BadRequestException(f"Uploaded file '{public_id}' not found in storage")
+        except Exception as e:
+            raise BadRequestException(f"Failed to get resource info: {str(e)}")
+
+        in_folder = public_id.startswith(f"{folder}/") or resource.get("asset_folder") == folder
+        if not in_folder:
+            # Not ours to delete: signatures are always scoped to the task folder
+            raise BadRequestException(f"Uploaded file is not in folder '{folder}'")
+
+        file_format = (resource.get("format") or "").lower()
+        file_size = resource.get("bytes") or 0
+        try:
+            uploaded_at = _parse_created_at(resource.get("created_at"))
+            deadline = issued_at + settings.UPLOAD_SIGNATURE_MAX_AGE + UPLOAD_CLOCK_SKEW
+            if uploaded_at is None or uploaded_at > deadline:
+                raise BadRequestException("Upload signature expired before the file was uploaded")
+
+            if resource_type == "image":
+                if file_format not in ALLOWED_IMAGE_FORMATS:
+                    raise BadRequestException(
+                        f"Invalid image format. Only PNG and JPEG images are allowed. "
+                        f"Received: {file_format}"
+                    )
+                content_type = ALLOWED_IMAGE_FORMATS[file_format]
+                self.check_file_size(file_size, "image")
             else:
-                # For images/videos, apply transformation if provided
-                url = cloudinary.CloudinaryImage(public_id).build_url(
-                    transformation=transformation,
-                    secure=True
-                )
+                # Raw uploads have no format, the extension is kept in the public_id
+                file_extension = os.path.splitext(public_id)[1].lower()
+                if file_extension not in ALLOWED_DOCUMENT_EXTENSIONS:
+                    raise BadRequestException(
+                        f"File type not allowed. Only PDF documents are supported as raw files. "
+                        f"Received: {file_extension}"
+                    )
+                content_type = "application/pdf"
+                self.check_file_size(file_size, "document")
+        except BadRequestException:
+            try:
+                self.delete_file(public_id, resource_type=resource_type)
+            except Exception as e:
+                print(f"Warning: Failed to delete rejected upload from Cloudinary: {str(e)}")
+            raise
+
+        return {"bytes": file_size, "content_type": content_type}
 
-            return url
+    def list_unconfirmed_uploads(self, older_than: float) -> List[Dict[str, Any]]:
+        """
+        Direct uploads still tagged as pending, uploaded before older_than (epoch seconds)
+
+        Returns:
+            List of {"public_id", "resource_type"}
+        """
+        uploads = []
+        for resource_type in ("image", "raw"):
+            next_cursor = None
+            while True:
+                options: Dict[str, Any] = {"resource_type": resource_type, "max_results": 500}
+                if next_cursor:
+                    options["next_cursor"] = next_cursor
+                try:
+                    with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "resources_by_tag"):
+                        result = cloudinary.api.resources_by_tag(PENDING_UPLOAD_TAG, **options)
+                except Exception as e:
+                    raise BadRequestException(f"Failed to list pending uploads: {str(e)}")
+                for resource in result.get("resources", []):
+                    uploaded_at = _parse_created_at(resource.get("created_at"))
+                    if uploaded_at is not None and uploaded_at < older_than:
+                        uploads.append({"public_id": resource["public_id"], "resource_type": resource_type})
+                next_cursor = result.get("next_cursor")
+                if not next_cursor:
+                    break
+        return uploads
+
+    def mark_upload_confirmed(self, public_id: str, resource_type: str) -> None:
+        """Remove the pending tag, so cleanup_unconfirmed leaves the file alone"""
+        try:
+            with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "remove_tag"):
+                cloudinary.uploader.remove_tag(PENDING_UPLOAD_TAG, [public_id], resource_type=resource_type)
         except Exception as e:
-            raise BadRequestException(f"Failed to generate file URL: {str(e)}")
+            raise BadRequestException(f"Failed to update uploaded file: {str(e)}")
+
+    def thumbnail_transformations(self) -> List[Dict]:
+        """Eager transformations for the configured THUMBNAIL_SIZES"""
+        return [
+            {"width": size, "height": size, **THUMBNAIL_TRANSFORMATION}
+            for size in settings.THUMBNAIL_SIZES
+        ]
+
+    def get_thumbnail_srcset(self, public_id: str) -> Optional[str]:
+        """
+        Build an HTML srcset of the thumbnail derivatives
+
+        URLs use the same transformations as the eager upload, so Cloudinary
+        serves the pre-generated derivatives.
+
+        Args:
+            public_id: Cloudinary public ID of the original image
+
+        Returns:
+            e.g. "https://.../c_fill,h_64,q_auto,w_64/v1/... 64w, ..." or None
+        """
+        if not settings.THUMBNAIL_SIZES:
+            return None
+
+        return ", ".join(
+            f"{self.get_file_url(public_id=public_id, transformation=transformation)} {transformation['width']}w"
+            for transformation in self.thumbnail_transformations()
+        )
 
     def extract_public_id_from_url(self, url: str) -> Optional[str]:
         """
@@ -312,10 +639,11 @@ class CloudinaryService:
             Dict containing resource information
         """
         try:
-            result = cloudinary.api.resource(
-                public_id,
-                resource_type=resource_type
-            )
+            with track(CLOUDINARY_DURATION, CLOUDINARY_ERRORS, "resource"):
+                result = cloudinary.api.resource(
+                    public_id,
+                    resource_type=resource_type
+                )
             return result
         except Exception as e:
             raise BadRequestException(f"Failed to get resource info: {str(e)}")
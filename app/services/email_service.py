@@ -8,9 +8,9 @@ from email.mime.multipart import MIMEMultipart
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
-from jinja2 import Template
 
 from app.core.config import settings
+from app.core.metrics import SMTP_SEND_DURATION, SMTP_SEND_FAILURES, track
 from atams.exceptions import BadRequestException
 
 
@@ -33,6 +33,20 @@ class EmailService:
                 "MAIL_USERNAME, MAIL_PASSWORD, and MAIL_FROM in environment variables."
             )
 
+    def _deliver(self, message) -> None:
+        """Send a message over SMTP (timed in the SMTP metrics)"""
+        with track(SMTP_SEND_DURATION, SMTP_SEND_FAILURES):
+            if self.use_ssl:
+                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
+                    server.login(self.username, self.password)
+                    server.send_message(message)
+            else:
+                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                    if self.use_tls:
+                        server.starttls()
+                    server.login(self.username, self.password)
+                    server.send_message(message)
+
     def _render_template(self, template_name: str, context: Dict) -> str:
         """Render email template with context"""
         template_path = Path(__file__).parent.parent / "templates" / template_name
@@ -43,6 +57,8 @@ class EmailService:
         with open(template_path, 'r', encoding='utf-8') as f:
             template_content = f.read()
 
+        from jinja2 import Template  # imported on first email, not at app startup
+
         template = Template(template_content)
         return template.render(**context)
 
@@ -95,16 +111,7 @@ class EmailService:
             message.attach(html_part)
 
             # Send email
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    server.login(self.username, self.password)
-                    server.send_message(message)
-            else:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    server.login(self.username, self.password)
-                    server.send_message(message)
+            self._deliver(message)
 
             return True
 
@@ -150,16 +157,7 @@ class EmailService:
             message["From"] = f"{self.from_name} <{self.from_email}>"
             message["To"] = to_email
 
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    server.login(self.username, self.password)
-                    server.send_message(message)
-            else:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    server.login(self.username, self.password)
-                    server.send_message(message)
+            self._deliver(message)
 
             return True
 
@@ -2,12 +2,14 @@
 Project Service
 Business logic layer with role-based permission validation
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from app.repositories.project_repository import ProjectRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.project_schema import ProjectCreate, ProjectUpdate, Project
+from app.schemas.common import construct_model
+from app.core.etag import make_etag
 from atams.exceptions import NotFoundException, ForbiddenException, ConflictException
 
 
@@ -16,6 +18,16 @@ class ProjectService:
         self.repository = ProjectRepository()
         self.user_repository = UserRepository()
 
+    def _populate_owner_name(self, db: Session, db_project) -> Project:
+        """Populate project with owner name from users table"""
+        joins = {}
+        if db_project.prj_u_id:
+            owner = self.user_repository.get_user_by_id(db, db_project.prj_u_id)
+            if owner:
+                joins["prj_owner_name"] = owner.get("u_full_name")
+
+        return construct_model(Project, db_project, **joins)
+
     def get_project(
         self,
         db: Session,
@@ -31,14 +43,22 @@ class ProjectService:
         if not db_project:
             raise NotFoundException(f"Project with ID {prj_id} not found")
 
-        # Get owner name from users table
-        project_dict = Project.model_validate(db_project).model_dump()
-        if db_project.prj_u_id:
-            owner = self.user_repository.get_user_by_id(db, db_project.prj_u_id)
-            if owner:
-                project_dict["prj_owner_name"] = owner.get("u_full_name")
+        return self._populate_owner_name(db, db_project)
 
-        return Project.model_validate(project_dict)
+    def get_project_etag(
+        self,
+        db: Session,
+        prj_id: int,
+        current_user_role_level: int
+    ) -> Optional[str]:
+        """ETag for get_project without loading the project (None if it does not exist)"""
+        if current_user_role_level < 10:
+            raise ForbiddenException("Insufficient permission to view project")
+
+        version = self.repository.get_project_version(db, prj_id)
+        if not version:
+            return None
+        return make_etag("project", prj_id, *version.values())
 
     def get_projects(
         self,
@@ -83,14 +103,7 @@ class ProjectService:
 
         db_project = self.repository.create(db, data)
 
-        # Get owner name from users table
-        project_dict = Project.model_validate(db_project).model_dump()
-        if db_project.prj_u_id:
-            owner = self.user_repository.get_user_by_id(db, db_project.prj_u_id)
-            if owner:
-                project_dict["prj_owner_name"] = owner.get("u_full_name")
-
-        return Project.model_validate(project_dict)
+        return self._populate_owner_name(db, db_project)
 
     def update_project(
         self,
@@ -122,14 +135,7 @@ class ProjectService:
 
         db_project = self.repository.update(db, db_project, update_data)
 
-        # Get owner name from users table
-        project_dict = Project.model_validate(db_project).model_dump()
-        if db_project.prj_u_id:
-            owner = self.user_repository.get_user_by_id(db, db_project.prj_u_id)
-            if owner:
-                project_dict["prj_owner_name"] = owner.get("u_full_name")
-
-        return Project.model_validate(project_dict)
+        return self._populate_owner_name(db, db_project)
 
     def delete_project(
         self,
@@ -2,24 +2,44 @@
 Task Attachment Service
 Business logic layer with role-based permission validation and Cloudinary integration
 """
-from typing import List
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 
 from app.repositories.task_attachment_repository import TaskAttachmentRepository
-from app.schemas.task_attachment_schema import TaskAttachmentCreate, TaskAttachmentUpdate, TaskAttachment
-from app.services.cloudinary_service import CloudinaryService
+from app.repositories.task_repository import TaskRepository
+from app.schemas.task_attachment_schema import (
+    TaskAttachmentCreate,
+    TaskAttachmentUpdate,
+    TaskAttachment,
+    TaskAttachmentUploadRequest,
+    TaskAttachmentUploadConfirm,
+)
+from app.schemas.common import construct_model
+from app.core.config import settings
+from app.core.container import get_cloudinary_service
+from app.core.download_cache import get_download_cache
 from atams.exceptions import NotFoundException, ForbiddenException, BadRequestException
 
+if TYPE_CHECKING:
+    from app.services.cloudinary_service import CloudinaryService
+
 
 class TaskAttachmentService:
     def __init__(self):
         self.repository = TaskAttachmentRepository()
-        self.cloudinary_service = CloudinaryService()
+        self.task_repository = TaskRepository()
+
+    @property
+    def cloudinary_service(self) -> "CloudinaryService":
+        # Shared instance, created (and the Cloudinary SDK imported) on first use
+        return get_cloudinary_service()
 
-    def _populate_attachment_url(self, db_attachment) -> dict:
+    def _populate_attachment_url(self, db_attachment) -> TaskAttachment:
         """Populate attachment with public URL"""
-        attachment_dict = TaskAttachment.model_validate(db_attachment).model_dump()
+        joins = {}
         # Generate public URL from public_id stored in ta_file_path
         if db_attachment.ta_file_path:
             # Determine resource type from file type
@@ -27,11 +47,11 @@ class TaskAttachmentService:
             if db_attachment.ta_file_type and "image" in db_attachment.ta_file_type.lower():
                 resource_type = "image"
 
-            attachment_dict["ta_file_url"] = self.cloudinary_service.get_file_url(
+            joins["ta_file_url"] = self.cloudinary_service.get_file_url(
                 public_id=db_attachment.ta_file_path,
                 resource_type=resource_type
             )
-        return attachment_dict
+        return construct_model(TaskAttachment, db_attachment, **joins)
 
     def get_task_attachment(
         self,
@@ -48,8 +68,7 @@ class TaskAttachmentService:
         if not db_task_attachment:
             raise NotFoundException(f"Task attachment with ID {ta_id} not found")
 
-        attachment_dict = self._populate_attachment_url(db_task_attachment)
-        return TaskAttachment.model_validate(attachment_dict)
+        return self._populate_attachment_url(db_task_attachment)
 
     def get_task_attachments(
         self,
@@ -65,8 +84,7 @@ class TaskAttachmentService:
         db_task_attachments = self.repository.get_multi(db, skip=skip, limit=limit)
         attachments = []
         for ta in db_task_attachments:
-            attachment_dict = self._populate_attachment_url(ta)
-            attachments.append(TaskAttachment.model_validate(attachment_dict))
+            attachments.append(self._populate_attachment_url(ta))
         return attachments
 
     def get_attachments_by_task_id(
@@ -82,8 +100,7 @@ class TaskAttachmentService:
         db_attachments = self.repository.get_by_task_id(db, task_id)
         attachments = []
         for ta in db_attachments:
-            attachment_dict = self._populate_attachment_url(ta)
-            attachments.append(TaskAttachment.model_validate(attachment_dict))
+            attachments.append(self._populate_attachment_url(ta))
         return attachments
 
     async def upload_attachment(
@@ -142,8 +159,124 @@ class TaskAttachmentService:
         data["created_by"] = str(current_user_id)
 
         db_task_attachment = self.repository.create(db, data)
-        attachment_dict = self._populate_attachment_url(db_task_attachment)
-        return TaskAttachment.model_validate(attachment_dict)
+        return self._populate_attachment_url(db_task_attachment)
+
+    def create_upload_signature(
+        self,
+        db: Session,
+        task_id: int,
+        upload: TaskAttachmentUploadRequest,
+        current_user_role_level: int
+    ) -> Dict[str, Any]:
+        """
+        Phase 1 of a direct upload: sign a Cloudinary upload scoped to atask/task-{task_id}
+
+        The file bytes go straight from the client to Cloudinary,
+        see confirm_upload for phase 2.
+
+        Raises:
+            ForbiddenException: If user lacks permission
+            NotFoundException: If task not found
+            BadRequestException: If declared file type/size is not allowed
+        """
+        if current_user_role_level < 10:
+            raise ForbiddenException("Insufficient permission to upload attachment")
+
+        if not self.task_repository.get(db, task_id):
+            raise NotFoundException(f"Task with ID {task_id} not found")
+
+        # Reject early on declared values, the real file is verified on confirm
+        resource_type, file_category = self.cloudinary_service.validate_file_info(
+            upload.file_name, upload.content_type
+        )
+        if upload.file_size is not None:
+            self.cloudinary_service.check_file_size(upload.file_size, file_category)
+
+        return self.cloudinary_service.generate_upload_signature(
+            folder=f"atask/task-{task_id}",
+            resource_type=resource_type,
+            extension=os.path.splitext(upload.file_name)[1].lower()
+        )
+
+    def confirm_upload(
+        self,
+        db: Session,
+        task_id: int,
+        confirm: TaskAttachmentUploadConfirm,
+        current_user_role_level: int,
+        current_user_id: int
+    ) -> TaskAttachment:
+        """
+        Phase 2 of a direct upload: verify the stored file and create the attachment record
+
+        Only public_ids issued by create_upload_signature for this task are
+        accepted. Size and type come from Cloudinary's metadata, not from
+        the client. A second confirm of the same upload violates
+        uq_task_attachment_file_path (IntegrityError -> 409).
+
+        Raises:
+            ForbiddenException: If user lacks permission
+            BadRequestException: If the uploaded file is missing, misplaced, late or invalid
+        """
+        if current_user_role_level < 10:
+            raise ForbiddenException("Insufficient permission to upload attachment")
+
+        folder = f"atask/task-{task_id}"
+        issued_at = self.cloudinary_service.upload_issued_at(confirm.public_id, folder)
+        if issued_at is None:
+            raise BadRequestException(f"Upload '{confirm.public_id}' was not issued for task {task_id}")
+
+        stored = self.cloudinary_service.verify_direct_upload(
+            public_id=confirm.public_id,
+            resource_type=confirm.resource_type,
+            folder=folder,
+            issued_at=issued_at
+        )
+
+        attachment_data = TaskAttachmentCreate(
+            ta_tsk_id=task_id,
+            ta_file_name=confirm.file_name,
+            ta_file_path=confirm.public_id,
+            ta_file_size=stored["bytes"],
+            ta_file_type=stored["content_type"]
+        )
+
+        data = attachment_data.model_dump()
+        data["created_by"] = str(current_user_id)
+
+        db_task_attachment = self.repository.create(db, data)
+
+        try:
+            self.cloudinary_service.mark_upload_confirmed(confirm.public_id, confirm.resource_type)
+        except BadRequestException as e:
+            # cleanup_unconfirmed_uploads checks the attachment rows before deleting
+            print(f"Warning: Failed to untag confirmed upload: {str(e)}")
+
+        return self._populate_attachment_url(db_task_attachment)
+
+    def cleanup_unconfirmed_uploads(self, db: Session) -> Dict[str, Any]:
+        """
+        Delete direct uploads that were never confirmed
+
+        Uploads still tagged as pending UPLOAD_UNCONFIRMED_TTL seconds after
+        they were made are removed from Cloudinary, unless an attachment row
+        references them (confirmed, but untagging failed).
+
+        Returns:
+            Summary with checked, deleted and kept counts
+        """
+        pending = self.cloudinary_service.list_unconfirmed_uploads(
+            older_than=time.time() - settings.UPLOAD_UNCONFIRMED_TTL
+        )
+        deleted = kept = 0
+        for upload in pending:
+            if self.repository.first(db, filters={"ta_file_path": upload["public_id"]}):
+                self.cloudinary_service.mark_upload_confirmed(upload["public_id"], upload["resource_type"])
+                kept += 1
+            else:
+                self.cloudinary_service.delete_file(upload["public_id"], resource_type=upload["resource_type"])
+                deleted += 1
+        return {"checked": len(pending), "deleted": deleted, "kept": kept}
 
     def update_task_attachment(
         self,
@@ -165,8 +298,7 @@ class TaskAttachmentService:
         update_data["updated_by"] = str(current_user_id)
 
         db_task_attachment = self.repository.update(db, db_task_attachment, update_data)
-        attachment_dict = self._populate_attachment_url(db_task_attachment)
-        return TaskAttachment.model_validate(attachment_dict)
+        return self._populate_attachment_url(db_task_attachment)
 
     def delete_task_attachment(
         self,
@@ -199,6 +331,11 @@ class TaskAttachmentService:
             # Log error but continue with database deletion
             print(f"Warning: Failed to delete file from Cloudinary: {str(e)}")
 
+        # Drop the locally cached download (see AttachmentDownloadService)
+        download_cache = get_download_cache()
+        if download_cache is not None:
+            download_cache.invalidate(db_attachment.ta_file_path)
+
         # Delete from database
         deleted = self.repository.delete(db, ta_id)
         if not deleted:
@@ -9,6 +9,7 @@ from app.repositories.task_comment_repository import TaskCommentRepository
 from app.repositories.task_repository import TaskRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.task_comment_schema import TaskCommentCreate, TaskCommentUpdate, TaskComment
+from app.schemas.common import construct_model
 from atams.exceptions import NotFoundException, ForbiddenException
 
 
@@ -18,24 +19,24 @@ class TaskCommentService:
         self.task_repository = TaskRepository()
         self.user_repository = UserRepository()
 
-    def _populate_comment_joins(self, db: Session, db_comment) -> dict:
+    def _populate_comment_joins(self, db: Session, db_comment) -> TaskComment:
         """Populate task comment with joined data from related tables"""
-        comment_dict = TaskComment.model_validate(db_comment).model_dump()
+        joins = {}
 
         # Get task title
         if db_comment.tc_tsk_id:
             task = self.task_repository.get(db, db_comment.tc_tsk_id)
             if task:
-                comment_dict["tc_task_title"] = task.tsk_title
+                joins["tc_task_title"] = task.tsk_title
 
         # Get user name and email
         if db_comment.tc_u_id:
             user = self.user_repository.get_user_by_id(db, db_comment.tc_u_id)
             if user:
-                comment_dict["tc_user_name"] = user.get("u_full_name")
-                comment_dict["tc_user_email"] = user.get("u_email")
+                joins["tc_user_name"] = user.get("u_full_name")
+                joins["tc_user_email"] = user.get("u_email")
 
-        return comment_dict
+        return construct_model(TaskComment, db_comment, **joins)
 
     def get_task_comment(
         self,
@@ -53,8 +54,7 @@ class TaskCommentService:
             raise NotFoundException(f"Task comment with ID {tc_id} not found")
 
         # Populate joined data
-        comment_dict = self._populate_comment_joins(db, db_task_comment)
-        return TaskComment.model_validate(comment_dict)
+        return self._populate_comment_joins(db, db_task_comment)
 
     def get_task_comments(
         self,
@@ -92,8 +92,7 @@ class TaskCommentService:
         db_task_comment = self.repository.create(db, data)
 
         # Populate joined data
-        comment_dict = self._populate_comment_joins(db, db_task_comment)
-        return TaskComment.model_validate(comment_dict)
+        return self._populate_comment_joins(db, db_task_comment)
 
     def update_task_comment(
         self,
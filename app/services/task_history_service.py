@@ -15,6 +15,7 @@ from app.repositories.task_history_repository import TaskHistoryRepository
 from app.repositories.task_repository import TaskRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.task_history_schema import TaskHistoryCreate, TaskHistoryUpdate, TaskHistory
+from app.schemas.common import construct_model
 from atams.exceptions import NotFoundException, ForbiddenException
 
 
@@ -24,23 +25,23 @@ class TaskHistoryService:
         self.task_repository = TaskRepository()
         self.user_repository = UserRepository()
 
-    def _populate_history_joins(self, db: Session, db_history) -> dict:
+    def _populate_history_joins(self, db: Session, db_history) -> TaskHistory:
         """Populate task history with joined data from related tables"""
-        history_dict = TaskHistory.model_validate(db_history).model_dump()
+        joins = {}
 
         # Get task title
         if db_history.th_tsk_id:
             task = self.task_repository.get(db, db_history.th_tsk_id)
             if task:
-                history_dict["th_task_title"] = task.tsk_title
+                joins["th_task_title"] = task.tsk_title
 
         # Get user name
         if db_history.th_u_id:
             user = self.user_repository.get_user_by_id(db, db_history.th_u_id)
             if user:
-                history_dict["th_user_name"] = user.get("u_full_name")
+                joins["th_user_name"] = user.get("u_full_name")
 
-        return history_dict
+        return construct_model(TaskHistory, db_history, **joins)
 
     def get_task_history(
         self,
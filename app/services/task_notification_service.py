@@ -2,14 +2,17 @@
 Task Notification Service
 Business logic for sending task notifications
 """
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 from datetime import date
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
-from app.services.email_service import EmailService
+from app.core.container import get_email_service
+from app.repositories.statements import statement_registry
 from atams.exceptions import BadRequestException
 
+if TYPE_CHECKING:
+    from app.services.email_service import EmailService
+
 
 class NotificationSummary:
     """Summary of notification send operation"""
@@ -31,8 +34,10 @@ class NotificationSummary:
 
 
 class TaskNotificationService:
-    def __init__(self):
-        self.email_service = EmailService()
+    @property
+    def email_service(self) -> "EmailService":
+        # Shared instance, created (and Jinja2 imported) on first use
+        return get_email_service()
 
     def get_tasks_for_daily_reminder(self, db: Session):
         """
@@ -40,7 +45,7 @@ class TaskNotificationService:
         1. Start today (tsk_start_date = today)
         2. Have an assignee (tsk_assignee_u_id is not null)
         """
-        query = """
+        query = statement_registry.register("notification.daily_reminder_tasks", """
             SELECT DISTINCT
                 t.tsk_id,
                 t.tsk_code,
@@ -68,9 +73,9 @@ class TaskNotificationService:
               AND t.tsk_assignee_u_id IS NOT NULL
               AND u_assignee.u_email IS NOT NULL
             ORDER BY t.tsk_id
-        """
+        """, prepare=True)
         today = date.today()
-        result = db.execute(text(query), {"today": today})
+        result = db.execute(query, {"today": today})
         return [dict(row._mapping) for row in result]
 
     def send_daily_reminders(self, db: Session) -> NotificationSummary:
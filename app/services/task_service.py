@@ -2,7 +2,11 @@
 Task Service
 Business logic layer with role-based permission validation
 """
-from typing import List
+import itertools
+import threading
+import time
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 
@@ -13,10 +17,37 @@ from app.repositories.master_priority_repository import MasterPriorityRepository
 from app.repositories.master_task_type_repository import MasterTaskTypeRepository
 from app.repositories.task_history_repository import TaskHistoryRepository
 from app.repositories.user_repository import UserRepository
-from app.schemas.task_schema import TaskCreate, TaskUpdate, Task
-from app.services.cloudinary_service import CloudinaryService
+from app.schemas.task_schema import TaskCreate, TaskUpdate, Task, TaskTreeNode
+from app.schemas.common import construct_model
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.container import get_cloudinary_service
+from app.core.etag import make_etag
+from app.db.replica import is_replica_session
 from atams.exceptions import NotFoundException, ForbiddenException, BadRequestException
 
+if TYPE_CHECKING:
+    from app.services.cloudinary_service import CloudinaryService
+
+
+# Per-user dashboard results (u_id -> dict), invalidated whenever a task write
+# touches a task where the user is the old or new assignee/reporter.
+# Each invalidation stamps the user with a never-reused sequence number: a read
+# that raced with a write sees a different stamp and does not cache its result;
+# replica reads are not cached while the replica may not have the write yet.
+# Stamps only matter while a read is in flight or the replica may lag, so they
+# expire like cache entries and are bounded the same way.
+dashboard_cache = TTLCache(
+    maxsize=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=settings.DASHBOARD_CACHE_TTL
+)
+_dashboard_invalidations = TTLCache(  # u_id -> (sequence, monotonic time)
+    maxsize=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=max(settings.DASHBOARD_CACHE_TTL, settings.DB_REPLICA_MAX_LAG_SECONDS)
+)
+_dashboard_sequence = itertools.count(1)
+_dashboard_lock = threading.Lock()
+
 
 class TaskService:
     def __init__(self):
@@ -27,57 +58,74 @@ class TaskService:
         self.master_task_type_repository = MasterTaskTypeRepository()
         self.history_repository = TaskHistoryRepository()
         self.user_repository = UserRepository()
-        self.cloudinary_service = CloudinaryService()
 
-    def _populate_task_joins(self, db: Session, db_task) -> dict:
+    @property
+    def cloudinary_service(self) -> "CloudinaryService":
+        # Shared instance, created (and the Cloudinary SDK imported) on first use
+        return get_cloudinary_service()
+
+    def _populate_task_joins(self, db: Session, db_task) -> Task:
         """Populate task with joined data from related tables"""
-        task_dict = Task.model_validate(db_task).model_dump()
+        joins = {}
 
         # Get project name
         if db_task.tsk_prj_id:
             project = self.project_repository.get(db, db_task.tsk_prj_id)
             if project:
-                task_dict["tsk_project_name"] = project.prj_name
+                joins["tsk_project_name"] = project.prj_name
 
         # Get status name
         if db_task.tsk_ms_id:
             status = self.status_repository.get(db, db_task.tsk_ms_id)
             if status:
-                task_dict["tsk_status_name"] = status.ms_name
+                joins["tsk_status_name"] = status.ms_name
 
         # Get priority name and color
         if db_task.tsk_mp_id:
             priority = self.priority_repository.get(db, db_task.tsk_mp_id)
             if priority:
-                task_dict["tsk_priority_name"] = priority.mp_name
-                task_dict["tsk_priority_color"] = priority.mp_color
+                joins["tsk_priority_name"] = priority.mp_name
+                joins["tsk_priority_color"] = priority.mp_color
 
         # Get task type name
         if db_task.tsk_mtt_id:
             task_type = self.master_task_type_repository.get(db, db_task.tsk_mtt_id)
             if task_type:
-                task_dict["tsk_type_name"] = task_type.mtt_name
+                joins["tsk_type_name"] = task_type.mtt_name
 
         # Get assignee name
         if db_task.tsk_assignee_u_id:
             assignee = self.user_repository.get_user_by_id(db, db_task.tsk_assignee_u_id)
             if assignee:
-                task_dict["tsk_assignee_name"] = assignee.get("u_full_name")
+                joins["tsk_assignee_name"] = assignee.get("u_full_name")
 
         # Get reporter name
         if db_task.tsk_reporter_u_id:
             reporter = self.user_repository.get_user_by_id(db, db_task.tsk_reporter_u_id)
             if reporter:
-                task_dict["tsk_reporter_name"] = reporter.get("u_full_name")
+                joins["tsk_reporter_name"] = reporter.get("u_full_name")
 
         # Set thumbnail URL (generate from public_id stored in tsk_thumbnail)
         if db_task.tsk_thumbnail:
-            task_dict["tsk_thumbnail_url"] = self.cloudinary_service.get_file_url(
+            joins["tsk_thumbnail_url"] = self.cloudinary_service.get_file_url(
                 public_id=db_task.tsk_thumbnail,
                 resource_type="image"
             )
+            joins["tsk_thumbnail_srcset"] = self.cloudinary_service.get_thumbnail_srcset(
+                db_task.tsk_thumbnail
+            )
+
+        # Row comes straight from the DB, no need to re-validate it
+        return construct_model(Task, db_task, **joins)
 
-        return task_dict
+    def _invalidate_dashboards(self, *user_ids: Optional[int]) -> None:
+        """Drop cached dashboards for every affected assignee/reporter"""
+        with _dashboard_lock:
+            for u_id in set(user_ids):
+                if u_id is None:
+                    continue
+                _dashboard_invalidations.set(u_id, (next(_dashboard_sequence), time.monotonic()))
+                dashboard_cache.delete(u_id)
 
     def _track_changes(self, db: Session, task_id: int, old_task, new_data: dict, user_id: int):
         """Track changes to task fields and create history records"""
@@ -129,8 +177,25 @@ class TaskService:
             raise NotFoundException(f"Task with ID {tsk_id} not found")
 
         # Populate joined data
-        task_dict = self._populate_task_joins(db, db_task)
-        return Task.model_validate(task_dict)
+        return self._populate_task_joins(db, db_task)
+
+    def get_task_etag(
+        self,
+        db: Session,
+        tsk_id: int,
+        current_user_role_level: int
+    ) -> Optional[str]:
+        """
+        ETag for get_task without loading the task (None if it does not exist)
+        Lets the endpoint answer If-None-Match with 304 before the join work
+        """
+        if current_user_role_level < 10:
+            raise ForbiddenException("Insufficient permission to view task")
+
+        version = self.repository.get_task_version(db, tsk_id)
+        if not version:
+            return None
+        return make_etag("task", tsk_id, *version.values())
 
     def get_tasks(
         self,
@@ -150,16 +215,90 @@ class TaskService:
         # Process thumbnail URLs if needed
         tasks = []
         for task_dict in tasks_data:
-            # Add thumbnail URL if thumbnail exists
-            if task_dict.get("tsk_thumbnail"):
-                task_dict["tsk_thumbnail_url"] = self.cloudinary_service.get_file_url(
-                    public_id=task_dict["tsk_thumbnail"],
-                    resource_type="image"
-                )
+            self._add_thumbnail_urls(task_dict)
             tasks.append(Task.model_validate(task_dict))
 
         return tasks
 
+    def _add_thumbnail_urls(self, task_dict: Dict[str, Any]) -> None:
+        """Add thumbnail URLs to a task row if it has a thumbnail"""
+        if task_dict.get("tsk_thumbnail"):
+            task_dict["tsk_thumbnail_url"] = self.cloudinary_service.get_file_url(
+                public_id=task_dict["tsk_thumbnail"],
+                resource_type="image"
+            )
+            task_dict["tsk_thumbnail_srcset"] = self.cloudinary_service.get_thumbnail_srcset(
+                task_dict["tsk_thumbnail"]
+            )
+
+    def get_task_tree(
+        self,
+        db: Session,
+        tsk_id: int,
+        current_user_role_level: int,
+        max_depth: Optional[int] = None
+    ) -> TaskTreeNode:
+        """
+        Get a task with its nested subtasks and per-node subtree rollups
+        The whole subtree is loaded with one recursive query; rollups are
+        summed bottom-up from it
+        """
+        if current_user_role_level < 10:
+            raise ForbiddenException("Insufficient permission to view task")
+
+        if max_depth is None or max_depth > settings.TASK_TREE_MAX_DEPTH:
+            max_depth = settings.TASK_TREE_MAX_DEPTH
+        max_nodes = settings.TASK_TREE_MAX_NODES
+
+        rows = self.repository.get_task_tree(db, tsk_id, max_depth=max_depth, max_nodes=max_nodes)
+        if not rows:
+            raise NotFoundException(f"Task with ID {tsk_id} not found")
+        if len(rows) > max_nodes:
+            raise BadRequestException(
+                f"Subtree of task {tsk_id} has more than {max_nodes} tasks within {max_depth} levels, "
+                "request a smaller max_depth"
+            )
+
+        # Rows are in depth-first order, so every parent precedes its children
+        nodes = {}
+        for row in rows:
+            self._add_thumbnail_urls(row)
+            row["children"] = []
+            nodes[row["tsk_id"]] = row
+        for row in rows[1:]:
+            nodes[row["tsk_parent_tsk_id"]]["children"].append(row)
+
+        # Children follow their parent, so walking backwards sees them first
+        for row in reversed(rows):
+            row["rollup"] = self._subtree_rollup(row)
+
+        return TaskTreeNode.model_validate(rows[0])
+
+    @staticmethod
+    def _subtree_rollup(node: Dict[str, Any]) -> Dict[str, Any]:
+        """Rollup of a tree node from its own row and its children's rollups"""
+        status_code = node.pop("tsk_status_code", None)
+        rollup = {
+            "total_tasks": 1,
+            "by_status": {status_code: 1} if status_code else {},
+            "total_duration": node["tsk_duration"] or Decimal(0),
+            "earliest_start_date": node["tsk_start_date"],
+            "latest_due_date": node["tsk_due_date"],
+        }
+        for child in node["children"]:
+            child_rollup = child["rollup"]
+            rollup["total_tasks"] += child_rollup["total_tasks"]
+            for code, count in child_rollup["by_status"].items():
+                rollup["by_status"][code] = rollup["by_status"].get(code, 0) + count
+            rollup["total_duration"] += child_rollup["total_duration"]
+            start = child_rollup["earliest_start_date"]
+            if start is not None and (rollup["earliest_start_date"] is None or start < rollup["earliest_start_date"]):
+                rollup["earliest_start_date"] = start
+            due = child_rollup["latest_due_date"]
+            if due is not None and (rollup["latest_due_date"] is None or due > rollup["latest_due_date"]):
+                rollup["latest_due_date"] = due
+        return rollup
+
     def create_task(
         self,
         db: Session,
@@ -197,10 +336,10 @@ class TaskService:
         data["tsk_duration"] = None
 
         db_task = self.repository.create(db, data)
+        self._invalidate_dashboards(db_task.tsk_assignee_u_id, db_task.tsk_reporter_u_id)
 
         # Populate joined data
-        task_dict = self._populate_task_joins(db, db_task)
-        return Task.model_validate(task_dict)
+        return self._populate_task_joins(db, db_task)
 
     def update_task(
         self,
@@ -250,11 +389,12 @@ class TaskService:
         # Track changes before updating
         self._track_changes(db, tsk_id, db_task, update_data, current_user_id)
 
+        old_user_ids = (db_task.tsk_assignee_u_id, db_task.tsk_reporter_u_id)
         db_task = self.repository.update(db, db_task, update_data)
+        self._invalidate_dashboards(*old_user_ids, db_task.tsk_assignee_u_id, db_task.tsk_reporter_u_id)
 
         # Populate joined data
-        task_dict = self._populate_task_joins(db, db_task)
-        return Task.model_validate(task_dict)
+        return self._populate_task_joins(db, db_task)
 
     def delete_task(
         self,
@@ -279,6 +419,8 @@ class TaskService:
         if not deleted:
             raise NotFoundException(f"Task with ID {tsk_id} not found")
 
+        self._invalidate_dashboards(db_task.tsk_assignee_u_id, db_task.tsk_reporter_u_id)
+
     def get_total_tasks(self, db: Session) -> int:
         """Get total count of tasks"""
         return self.repository.count(db)
@@ -288,24 +430,28 @@ class TaskService:
         if current_user_role_level < 10:
             raise ForbiddenException("Insufficient permission")
 
-        # Use native SQL to get dashboard data
-        query = """
-            SELECT
-                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id) as assigned_total,
-                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'TODO') as assigned_todo,
-                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'IN_PROGRESS') as assigned_in_progress,
-                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'IN_REVIEW') as assigned_in_review,
-                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND ms.ms_code = 'DONE') as assigned_done,
-                COUNT(*) FILTER (WHERE tsk_assignee_u_id = :u_id AND tsk_due_date < NOW() AND ms.ms_code NOT IN ('DONE', 'CANCELLED')) as assigned_overdue,
-                COUNT(*) FILTER (WHERE tsk_reporter_u_id = :u_id) as reported_total,
-                COUNT(*) FILTER (WHERE tsk_reporter_u_id = :u_id AND ms.ms_code NOT IN ('DONE', 'CANCELLED')) as reported_pending,
-                COUNT(*) FILTER (WHERE tsk_reporter_u_id = :u_id AND ms.ms_code IN ('DONE', 'CANCELLED')) as reported_completed
-            FROM atask.task t
-            LEFT JOIN atask.master_status ms ON t.tsk_ms_id = ms.ms_id
-        """
+        if settings.DASHBOARD_CACHE_TTL <= 0:
+            return self.repository.get_user_dashboard(db, u_id)
+
+        # Copies in and out: callers must not be able to change the cached dict
+        cached = dashboard_cache.get(u_id)
+        if cached is not None:
+            return dict(cached)
 
-        result = self.repository.execute_raw_sql_dict(db, query, {"u_id": u_id})
-        return result[0] if result else {}
+        stamp = _dashboard_invalidations.get(u_id)
+
+        # Index-driven query: only the user's assigned/reported rows are read
+        dashboard = self.repository.get_user_dashboard(db, u_id)
+
+        with _dashboard_lock:
+            current = _dashboard_invalidations.get(u_id)
+            replica_may_lag = is_replica_session(db) and current is not None and (
+                time.monotonic() - current[1] < settings.DB_REPLICA_MAX_LAG_SECONDS
+            )
+            if current == stamp and not replica_may_lag:
+                dashboard_cache.set(u_id, dict(dashboard))
+
+        return dashboard
 
     def bulk_update_status(self, db: Session, task_ids: List[int], ms_id: int, current_user_role_level: int, current_user_id: int):
         """Bulk update task status"""
@@ -357,6 +503,11 @@ class TaskService:
         # Bulk update
         self.repository.bulk_update(db, updated_tasks)
 
+        affected_user_ids = []
+        for task in updated_tasks:
+            affected_user_ids.extend([task.tsk_assignee_u_id, task.tsk_reporter_u_id])
+        self._invalidate_dashboards(*affected_user_ids)
+
         return {
             "updated_count": len(updated_tasks),
             "task_ids": task_ids
@@ -413,7 +564,8 @@ class TaskService:
         upload_result = await self.cloudinary_service.upload_file(
             file=file,
             folder=folder,
-            resource_type="image"
+            resource_type="image",
+            eager=self.cloudinary_service.thumbnail_transformations()
         )
 
         # Update task thumbnail path (store public_id, not full URL)
@@ -425,8 +577,7 @@ class TaskService:
         db_task = self.repository.update(db, db_task, update_data)
 
         # Populate joined data
-        task_dict = self._populate_task_joins(db, db_task)
-        return Task.model_validate(task_dict)
+        return self._populate_task_joins(db, db_task)
 
     def delete_thumbnail(
         self,
@@ -477,5 +628,4 @@ class TaskService:
         db_task = self.repository.update(db, db_task, update_data)
 
         # Populate joined data
-        task_dict = self._populate_task_joins(db, db_task)
-        return Task.model_validate(task_dict)
+        return self._populate_task_joins(db, db_task)
@@ -0,0 +1,65 @@
+"""
+Email rendering and advanced search query building benchmarks
+"""
+from datetime import datetime
+
+import pytest
+
+from app.repositories.task_repository import TaskRepository
+from app.services.email_service import EmailService
+
+REMINDER_CONTEXT = {
+    "assignee_name": "User 101",
+    "task_code": "001/TSK/042",
+    "task_title": "Prepare quarterly report",
+    "description": "Lorem ipsum dolor sit amet " * 10,
+    "project_name": "Project 1",
+    "project_code": "PRJ-001",
+    "status_name": "In Progress",
+    "priority_name": "High",
+    "priority_class": "priority-high",
+    "task_type": "Task",
+    "reporter_name": "User 120",
+    "start_date": "01 June 2025",
+    "year": 2025,
+}
+
+SEARCH_FILTERS = {
+    "keyword": "report",
+    "project_ids": [1, 2, 3],
+    "status_ids": [1, 2],
+    "priority_ids": [3, 4],
+    "assignee_ids": [101, 102, 103, 104],
+    "reporter_ids": [120],
+    "type_ids": [1, 2, 3],
+    "date_from": datetime(2025, 1, 1),
+    "date_to": datetime(2025, 12, 31),
+}
+
+
+def test_render_reminder_template(benchmark):
+    """EmailService._render_template for the daily reminder email"""
+    html = benchmark(EmailService()._render_template, "email.html", REMINDER_CONTEXT)
+    assert "001/TSK/042" in html
+
+
+@pytest.fixture
+def search_repository():
+    """TaskRepository that records the built query instead of executing it"""
+    repository = TaskRepository()
+    repository.built = []
+    repository.execute_raw_sql_dict = lambda db, query, params: repository.built.append((query, params)) or []
+    return repository
+
+
+def test_advanced_search_query_building(benchmark, search_repository):
+    """advanced_search + count_advanced_search statement lookup with every filter set"""
+    def build():
+        search_repository.advanced_search(None, SEARCH_FILTERS, skip=0, limit=100)
+        search_repository.count_advanced_search(None, SEARCH_FILTERS)
+
+    benchmark(build)
+    query, params = search_repository.built[0]
+    assert "ANY(:assignee_ids)" in query.text and params["keyword"] == "%report%"
+    # The statement is built once per filter combination and reused
+    assert search_repository.built[2][0] is query
@@ -0,0 +1,48 @@
+"""
+Response rendering benchmarks: encryption of large payloads
+"""
+import pytest
+from atams.encryption import encrypt_response_data
+
+from app.core.config import settings
+from app.core.responses import ModelJSONResponse
+from app.schemas.common import PaginationResponse
+from app.schemas.task_schema import Task
+
+
+@pytest.fixture(scope="module")
+def encryption_settings():
+    return settings.model_copy(update={
+        "ENCRYPTION_ENABLED": True,
+        "ENCRYPTION_KEY": "b" * 32,
+        "ENCRYPTION_IV": "i" * 16,
+    })
+
+
+@pytest.fixture(scope="module")
+def task_page(task_dicts):
+    tasks = [Task.model_validate(row) for row in task_dicts]
+    return PaginationResponse(
+        success=True,
+        message="Tasks retrieved successfully",
+        data=tasks,
+        total=len(tasks),
+        page=1,
+        size=len(tasks),
+        pages=1,
+    )
+
+
+def test_encrypt_response_data_1000_tasks(benchmark, encryption_settings, task_page):
+    """atams encrypt_response_data on a 1000-task page (jsonable_encoder + json.dumps + AES)"""
+    result = benchmark(encrypt_response_data, task_page, encryption_settings)
+    assert result["encrypted"] is True
+
+
+def test_model_json_response_encrypted_1000_tasks(benchmark, encryption_settings, task_page, monkeypatch):
+    """ModelJSONResponse rendering of the same page, for comparison"""
+    monkeypatch.setattr(settings, "ENCRYPTION_ENABLED", True)
+    monkeypatch.setattr(settings, "ENCRYPTION_KEY", encryption_settings.ENCRYPTION_KEY)
+    monkeypatch.setattr(settings, "ENCRYPTION_IV", encryption_settings.ENCRYPTION_IV)
+    response = benchmark(ModelJSONResponse, task_page)
+    assert response.body.startswith(b'{"encrypted":true')
@@ -0,0 +1,83 @@
+"""
+Task response projection
+
+construct_model must produce the same task responses as the legacy
+validate -> dump -> validate round-trip (timings: tests/benchmarks).
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.schemas.common import construct_model, normalize_datetime
+from app.schemas.task_schema import Task
+
+
+def _make_rows(count: int) -> list:
+    """ORM-like task rows with the column types SQLAlchemy returns"""
+    now = datetime(2025, 1, 1, tzinfo=timezone(timedelta(hours=7)))
+    return [
+        SimpleNamespace(
+            tsk_id=i,
+            tsk_code=f"001/TSK/{i:03d}",
+            tsk_title=f"Task {i}",
+            tsk_description="Lorem ipsum dolor sit amet " * 4,
+            tsk_prj_id=1,
+            tsk_ms_id=1 + i % 4,
+            tsk_mp_id=1 + i % 3,
+            tsk_mtt_id=1,
+            tsk_assignee_u_id=100 + i % 20,
+            tsk_reporter_u_id=200,
+            tsk_start_date=now,
+            tsk_due_date=now + timedelta(days=i % 30),
+            tsk_duration=Decimal("1.50"),
+            tsk_parent_tsk_id=None,
+            tsk_thumbnail=None,
+            created_by="200",
+            created_at=now,
+            updated_by=None,
+            updated_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+JOINS = {
+    "tsk_project_name": "Atask",
+    "tsk_status_name": "In Progress",
+    "tsk_priority_name": "High",
+    "tsk_priority_color": "#ff0000",
+    "tsk_type_name": "Task",
+    "tsk_assignee_name": "Assignee",
+    "tsk_reporter_name": "Reporter",
+}
+
+
+def _legacy(row) -> Task:
+    task_dict = Task.model_validate(row).model_dump()
+    task_dict.update(JOINS)
+    return Task.model_validate(task_dict)
+
+
+def _projected(row) -> Task:
+    return construct_model(Task, row, **JOINS)
+
+
+def test_projection_matches_validated_output():
+    for row in _make_rows(10):
+        assert _projected(row).model_dump_json() == _legacy(row).model_dump_json()
+
+
+def test_projection_fills_defaults_for_missing_joins():
+    row = _make_rows(1)[0]
+    task = construct_model(Task, row, tsk_project_name="Atask")
+    assert task.tsk_status_name is None
+    assert task.model_dump(exclude_unset=True).keys() == Task.model_validate(
+        vars(row) | {"tsk_project_name": "Atask"}
+    ).model_dump(exclude_unset=True).keys()
+
+
+def test_normalize_datetime():
+    assert normalize_datetime("") is None
+    assert normalize_datetime("2025-01-01 10:00:00+07") == "2025-01-01 10:00:00+07:00"
+    assert normalize_datetime("2025-01-01 10:00:00+07:00") == "2025-01-01 10:00:00+07:00"
+